@@ -0,0 +1,264 @@
+'''Nodos del árbol sintáctico abstracto (AST).
+
+Cada nodo usa __slots__ para no cargar un __dict__ por instancia y guarda la
+línea de la fuente donde empieza. _fields lista los atributos que son hijos
+(nodos o listas de nodos) en el orden en que se recorren.
+
+El análisis semántico completa los atributos symbol (el Symbol al que se
+refiere un nombre) y type ('int', 'float' o 'bool' en las expresiones).
+'''
+
+
+class Node:
+    __slots__ = ('lineno',)
+    _fields = ()
+
+    def children(self):
+        '''Nodos hijos en orden'''
+        for name in self._fields:
+            child = getattr(self, name)
+            if isinstance(child, list):
+                yield from child
+            elif child is not None:
+                yield child
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Program(Node):
+    __slots__ = ('body',)
+    _fields = ('body',)
+
+    def __init__(self, body, lineno=0):
+        self.body = body
+        self.lineno = lineno
+
+
+class Block(Node):
+    '''Lista de sentencias; cada bloque abre un ámbito'''
+    __slots__ = ('statements',)
+    _fields = ('statements',)
+
+    def __init__(self, statements, lineno=0):
+        self.statements = statements
+        self.lineno = lineno
+
+
+class Declaration(Node):
+    __slots__ = ('type', 'names')
+
+    def __init__(self, type, names, lineno=0):
+        self.type = type
+        self.names = names
+        self.lineno = lineno
+
+
+class Assign(Node):
+    __slots__ = ('name', 'expr', 'symbol')
+    _fields = ('expr',)
+
+    def __init__(self, name, expr, lineno=0):
+        self.name = name
+        self.expr = expr
+        self.symbol = None
+        self.lineno = lineno
+
+
+class IncDec(Node):
+    '''x++ o x--'''
+    __slots__ = ('name', 'op', 'symbol')
+
+    def __init__(self, name, op, lineno=0):
+        self.name = name
+        self.op = op
+        self.symbol = None
+        self.lineno = lineno
+
+
+class If(Node):
+    __slots__ = ('cond', 'then', 'orelse')
+    _fields = ('cond', 'then', 'orelse')
+
+    def __init__(self, cond, then, orelse=None, lineno=0):
+        self.cond = cond
+        self.then = then
+        self.orelse = orelse
+        self.lineno = lineno
+
+
+class While(Node):
+    __slots__ = ('cond', 'body')
+    _fields = ('cond', 'body')
+
+    def __init__(self, cond, body, lineno=0):
+        self.cond = cond
+        self.body = body
+        self.lineno = lineno
+
+
+class DoUntil(Node):
+    __slots__ = ('body', 'cond')
+    _fields = ('body', 'cond')
+
+    def __init__(self, body, cond, lineno=0):
+        self.body = body
+        self.cond = cond
+        self.lineno = lineno
+
+
+class Switch(Node):
+    __slots__ = ('expr', 'cases', 'default')
+    _fields = ('expr', 'cases', 'default')
+
+    def __init__(self, expr, cases, default=None, lineno=0):
+        self.expr = expr
+        self.cases = cases
+        self.default = default
+        self.lineno = lineno
+
+
+class Case(Node):
+    __slots__ = ('value', 'body')
+    _fields = ('value', 'body')
+
+    def __init__(self, value, body, lineno=0):
+        self.value = value
+        self.body = body
+        self.lineno = lineno
+
+
+class Cin(Node):
+    __slots__ = ('name', 'symbol')
+
+    def __init__(self, name, lineno=0):
+        self.name = name
+        self.symbol = None
+        self.lineno = lineno
+
+
+class Cout(Node):
+    __slots__ = ('expr',)
+    _fields = ('expr',)
+
+    def __init__(self, expr, lineno=0):
+        self.expr = expr
+        self.lineno = lineno
+
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right', 'type')
+    _fields = ('left', 'right')
+
+    def __init__(self, op, left, right, lineno=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.type = None
+        self.lineno = lineno
+
+
+class UnaryOp(Node):
+    __slots__ = ('op', 'operand', 'type')
+    _fields = ('operand',)
+
+    def __init__(self, op, operand, lineno=0):
+        self.op = op
+        self.operand = operand
+        self.type = None
+        self.lineno = lineno
+
+
+class Num(Node):
+    '''Literal entero, real o lógico (este último solo tras el plegado)'''
+    __slots__ = ('value', 'type')
+
+    def __init__(self, value, lineno=0, type=None):
+        self.value = value
+        self.type = type or ('float' if isinstance(value, float) else 'int')
+        self.lineno = lineno
+
+
+class Var(Node):
+    __slots__ = ('name', 'symbol', 'type')
+
+    def __init__(self, name, lineno=0):
+        self.name = name
+        self.symbol = None
+        self.type = None
+        self.lineno = lineno
+
+
+def walk(node):
+    '''Recorre el árbol en preorden sin recursión'''
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(node.children())))
+
+
+# Atributos de cada clase de nodo, incluidos los heredados
+_SLOTS = {}
+
+
+def _shallow_copy(node):
+    kind = type(node)
+    names = _SLOTS.get(kind)
+    if names is None:
+        names = _SLOTS[kind] = [name for cls in kind.__mro__ for name in getattr(cls, '__slots__', ())]
+    other = kind.__new__(kind)
+    for name in names:
+        setattr(other, name, getattr(node, name))
+    return other
+
+
+def copy(node):
+    '''Copia del árbol con nodos nuevos, sin recursión.
+
+    El análisis semántico trabaja sobre una copia para no modificar el
+    árbol del parser.
+    '''
+    root = _shallow_copy(node)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for name in node._fields:
+            child = getattr(node, name)
+            if isinstance(child, list):
+                child = [_shallow_copy(item) for item in child]
+                stack.extend(child)
+            elif child is not None:
+                child = _shallow_copy(child)
+                stack.append(child)
+            setattr(node, name, child)
+    return root
+
+
+def _label(node):
+    if isinstance(node, (BinOp, UnaryOp)):
+        return f"{type(node).__name__} {node.op}"
+    if isinstance(node, Num):
+        return f"Num {node.value}"
+    if isinstance(node, (Var, Cin, Assign)):
+        return f"{type(node).__name__} {node.name}"
+    if isinstance(node, IncDec):
+        return f"IncDec {node.name}{node.op}"
+    if isinstance(node, Declaration):
+        return f"Declaration {node.type} {', '.join(node.names)}"
+    return type(node).__name__
+
+
+def dump(node):
+    '''Texto del árbol con una línea por nodo, indentado por profundidad'''
+    lines = []
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        label = _label(node)
+        if getattr(node, 'type', None) and not isinstance(node, Declaration):
+            label = f"{label} : {node.type}"
+        lines.append(f"{'  ' * depth}{label}  (línea {node.lineno})")
+        stack.extend((child, depth + 1) for child in reversed(list(node.children())))
+    return '\n'.join(lines)
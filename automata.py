@@ -0,0 +1,116 @@
+from matriz_transicion import matriz
+from lexico import reserved
+
+# Clases de carácter en el orden de las columnas de la matriz:
+# dig|letra| . | _ | ! | < | > | = | / | * | \n | + | - | % | ^ | ( | ) | { | } | , | ; | & | "|" | " " | \t | otro
+NUM_CLASSES = 26
+_SYMBOL_CLASSES = '._!<>=/*\n+-%^(){},;&| \t'
+OTHER = 25
+NEWLINE = 10
+
+# Tabla de 256 entradas: clase de cada carácter Latin-1
+CHAR_CLASS = bytearray([OTHER] * 256)
+for _c in range(256):
+    _ch = chr(_c)
+    if _ch.isdigit() and _ch.isascii():
+        CHAR_CLASS[_c] = 0
+    elif _ch.isalpha() and _ch.isascii():
+        CHAR_CLASS[_c] = 1
+for _i, _ch in enumerate(_SYMBOL_CLASSES):
+    CHAR_CLASS[ord(_ch)] = _i + 2
+
+# Acciones codificadas como enteros negativos en lugar de "d", "D", "E" y "e"
+ACCEPT = -1          # d: acepta sin consumir el carácter actual
+ACCEPT_CONSUME = -2  # D: acepta consumiendo el carácter actual
+ERROR = -3           # E: error sin consumir el carácter actual
+ERROR_CONSUME = -4   # e: error consumiendo el carácter actual
+_ACTIONS = {'d': ACCEPT, 'D': ACCEPT_CONSUME, 'E': ERROR, 'e': ERROR_CONSUME}
+
+
+def _build_table():
+    '''Aplana la matriz de transición en una lista de enteros (estado * 26 + clase).
+
+    Se ajustan algunas celdas para producir los mismos tokens que lexico.py:
+    '-' seguido de dígito no forma un número negativo (igual que '+'), '_' y
+    '!' solos son ID y NOT, y '&&'/'||' se reconocen con dos estados nuevos
+    (14 y 15).
+    '''
+    rows = [list(row) for row in matriz]
+    rows[13][0] = 'd'
+    rows[6] = ['d' if cell == 'E' else cell for cell in rows[6]]
+    rows[7] = ['D' if cls == 7 else 'd' for cls in range(NUM_CLASSES)]
+    rows[0][21], rows[0][22] = '14', '15'
+    rows.append(['D' if cls == 21 else 'E' for cls in range(NUM_CLASSES)])
+    rows.append(['D' if cls == 22 else 'E' for cls in range(NUM_CLASSES)])
+    return [_ACTIONS[cell] if cell in _ACTIONS else int(cell) for row in rows for cell in row]
+
+
+TRANSITIONS = _build_table()
+
+# Tipo de token según el estado de aceptación
+_STATE_TYPES = {2: 'NUMBER', 4: 'REAL'}
+_COMMENT_STATES = (10, 11, 12)
+_OPERATORS = {
+    '+': 'PLUS', '-': 'MINUS', '*': 'TIMES', '/': 'DIVIDE', '%': 'MODULO', '^': 'POWER',
+    '<': 'LT', '<=': 'LE', '>': 'GT', '>=': 'GE', '!=': 'NE', '=': 'EQ', '==': 'EEQ',
+    '&&': 'AND', '||': 'OR', '!': 'NOT', '(': 'LPAREN', ')': 'RPAREN', '{': 'LBRACE',
+    '}': 'RBRACE', ',': 'COMMA', ';': 'SEMICOLON', '++': 'INCREMENT', '--': 'DECREMENT',
+}
+
+# Traducción de caracteres a clases para convertir el texto de una sola vez
+_TRANSLATION = {c: chr(CHAR_CLASS[c]) for c in range(256)}
+_FIX_OTHER = bytes(OTHER if b == ord('?') else b for b in range(256))
+
+
+def scan(text):
+    '''Ejecuta el autómata sobre el texto.
+
+    Genera (tipo, inicio, fin) por cada token; los comentarios se omiten y
+    los errores se entregan con tipo ERROR. Un /* sin cerrar produce un
+    ERROR de dos caracteres y termina el análisis, como en lexico.py.
+    '''
+    # Cada carácter se convierte en su clase; los que no son Latin-1 quedan
+    # como '?' al codificar y pasan a la clase "otro"
+    classes = text.translate(_TRANSLATION).encode('latin-1', 'replace').translate(_FIX_OTHER)
+    table = TRANSITIONS
+    n = len(classes)
+    pos = 0
+    while pos < n:
+        state = 0
+        start = pos
+        while True:
+            if pos < n:
+                action = table[state * NUM_CLASSES + classes[pos]]
+            elif state == 0:
+                return
+            else:
+                # Fin de la entrada: se comporta como un salto de línea sin consumirlo
+                action = table[state * NUM_CLASSES + NEWLINE]
+                if action == ACCEPT_CONSUME:
+                    action = ACCEPT
+                elif action >= 0:
+                    # Comentario /* sin cerrar
+                    yield 'ERROR', start, start + 2
+                    return
+            if action >= 0:
+                pos += 1
+                if action == 0:
+                    # Espacios en el estado inicial
+                    start = pos
+                state = action
+                continue
+            if action == ACCEPT_CONSUME or action == ERROR_CONSUME:
+                pos += 1
+            if action <= ERROR:
+                if pos == start:
+                    pos += 1
+                yield 'ERROR', start, pos
+            elif state in _COMMENT_STATES:
+                pass
+            elif state in _STATE_TYPES:
+                yield _STATE_TYPES[state], start, pos
+            elif state == 5 or state == 6:
+                yield reserved.get(text[start:pos], 'ID'), start, pos
+            else:
+                yield _OPERATORS.get(text[start:pos], 'ERROR'), start, pos
+            break
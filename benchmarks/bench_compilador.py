@@ -0,0 +1,232 @@
+'''Mide el tiempo y la memoria de cada fase del compilador sobre programas generados.
+
+Uso:
+  python benchmarks/bench_compilador.py medir --tamaños 1K,100K,1M -o base.json
+  python benchmarks/bench_compilador.py medir --tamaños 1M --errores 0.05 -o nuevo.json
+  python benchmarks/bench_compilador.py comparar base.json nuevo.json --umbral 10
+
+medir genera con generador.generate un programa válido y otro con errores
+por cada tamaño (misma semilla, mismo texto en cada corrida) y mide cada
+fase por separado: sus entradas se preparan fuera de la medición. El
+tiempo es el mejor de varias repeticiones; la memoria (pico y memoria
+retenida por el resultado, con tracemalloc) se mide en una corrida aparte
+porque tracemalloc hace más lenta la ejecución.
+
+comparar empareja programa, tamaño y fase de dos resultados y marca como
+regresión toda fase cuyo rendimiento (MB/s) baje más que el umbral.
+'''
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+from buffer_tokens import TokenBuffer
+from sintactico import test_parser
+from semantico import check_semantics
+from codigo_intermedio import generate_intermediate_code
+from optimizacion import optimize
+from generador import generate, parse_size, format_size
+
+FORMAT_VERSION = 1
+
+
+def _parse(text):
+    ast = test_parser(TokenBuffer.from_text(text))[0]
+    return None if ast is None else (ast,)
+
+
+def _checked(text):
+    '''(ast, tabla) listos para generar código, o None si el programa tiene errores'''
+    ast, errors = test_parser(TokenBuffer.from_text(text))
+    if ast is None or errors:
+        return None
+    table, errors, ast = check_semantics(ast)
+    return None if errors else (ast, table)
+
+
+def _intermediate(text):
+    checked = _checked(text)
+    return None if checked is None else (generate_intermediate_code(*checked),)
+
+
+# Cada fase: (preparar(texto) -> argumentos o None si no aplica, ejecutar(*argumentos)).
+# Ninguna fase modifica sus argumentos, así que se preparan una vez para
+# todas las repeticiones.
+PHASES = {
+    'lexico': (lambda text: (text,), lambda text: lexico.test_lexer(text)),
+    'sintactico': (lambda text: (TokenBuffer.from_text(text),), test_parser),
+    'semantico': (_parse, check_semantics),
+    'intermedio': (_checked, generate_intermediate_code),
+    'optimizacion': (_intermediate, optimize),
+}
+
+
+def measure_time(text, prepare, run, repetitions):
+    '''Mejor tiempo de varias repeticiones, o None si la fase no aplica'''
+    args = prepare(text)
+    if args is None:
+        return None
+    best = None
+    for _ in range(repetitions):
+        gc.collect()
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_memory(text, prepare, run):
+    '''(pico, retenida) en bytes de una corrida con tracemalloc'''
+    args = prepare(text)
+    if args is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, current
+
+
+def benchmark(sizes, seed, errors, repetitions, memory, phases, log):
+    results = []
+    programs = [('valido', 0.0)] + ([('errores', errors)] if errors else [])
+    for size in sizes:
+        for name, rate in programs:
+            start = time.perf_counter()
+            text = generate(size, seed, rate)
+            log(f"{name} {format_size(size)}: generado en {time.perf_counter() - start:.1f} s")
+            entry = {'programa': name, 'tamaño': format_size(size), 'bytes': len(text), 'fases': {}}
+            for phase in phases:
+                prepare, run = PHASES[phase]
+                seconds = measure_time(text, prepare, run, repetitions)
+                if seconds is None:
+                    entry['fases'][phase] = {'omitida': "el programa tiene errores que impiden la fase"}
+                    log(f"  {phase:<13} omitida")
+                    continue
+                info = {'segundos': round(seconds, 6),
+                        'mb_s': round(len(text) / seconds / 1e6, 4) if seconds else None}
+                if memory:
+                    peak, retained = measure_memory(text, prepare, run)
+                    info['memoria_pico_kb'] = peak // 1024
+                    info['memoria_retenida_kb'] = retained // 1024
+                entry['fases'][phase] = info
+                memory_text = f"  pico {info['memoria_pico_kb']:>9} KB" if memory else ""
+                log(f"  {phase:<13} {seconds * 1000:10.1f} ms  {info['mb_s'] or 0:8.3f} MB/s{memory_text}")
+            results.append(entry)
+    return results
+
+
+def compare(base, new, threshold):
+    '''Filas (programa, tamaño, fase, MB/s base, MB/s nuevo, cambio %, regresión)'''
+    def index(data):
+        return {(entry['programa'], entry['tamaño'], phase): info
+                for entry in data['resultados'] for phase, info in entry['fases'].items()
+                if info.get('mb_s')}
+
+    before, after = index(base), index(new)
+    rows = []
+    for key in before:
+        if key not in after:
+            continue
+        old, current = before[key]['mb_s'], after[key]['mb_s']
+        change = (current - old) / old * 100
+        rows.append(key + (old, current, change, change < -threshold))
+    return rows
+
+
+def cmd_medir(args):
+    sizes = [parse_size(size) for size in args.tamaños.split(',')]
+    phases = args.fases.split(',') if args.fases else list(PHASES)
+    for phase in phases:
+        if phase not in PHASES:
+            sys.exit(f"fase desconocida: {phase} (opciones: {', '.join(PHASES)})")
+    if args.lexer:
+        lexico.BACKEND = args.lexer
+
+    def log(text):
+        print(text, file=sys.stderr)
+
+    data = {
+        'version': FORMAT_VERSION,
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'etiqueta': args.etiqueta,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'lexer': lexico.BACKEND,
+        'semilla': args.semilla,
+        'repeticiones': args.repeticiones,
+        'resultados': benchmark(sizes, args.semilla, args.errores, args.repeticiones,
+                                not args.sin_memoria, phases, log),
+    }
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+def cmd_comparar(args):
+    with open(args.base, encoding='utf-8') as file:
+        base = json.load(file)
+    with open(args.nuevo, encoding='utf-8') as file:
+        new = json.load(file)
+    rows = compare(base, new, args.umbral)
+    if not rows:
+        print("No hay mediciones en común entre los dos resultados")
+        return 1
+    print(f"{'Programa':<9}{'Tamaño':>8}  {'Fase':<13}{'Base MB/s':>11}{'Nuevo MB/s':>12}{'Cambio':>9}")
+    regressions = 0
+    for program, size, phase, old, current, change, regression in rows:
+        regressions += regression
+        mark = "  REGRESIÓN" if regression else ""
+        print(f"{program:<9}{size:>8}  {phase:<13}{old:11.3f}{current:12.3f}{change:8.1f}%{mark}")
+    print(f"{regressions} regresiones de más del {args.umbral:g}% en {len(rows)} mediciones")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    medir = commands.add_parser('medir', help="mide las fases y guarda los resultados en JSON")
+    medir.add_argument('--tamaños', default='1K,10K,100K,1M',
+                       help="tamaños de programa separados por comas (de 1K a 100M)")
+    medir.add_argument('--semilla', type=int, default=0)
+    medir.add_argument('--errores', type=float, default=0.05,
+                       help="fracción de sentencias con errores del segundo programa (0 = solo válidos)")
+    medir.add_argument('--repeticiones', type=int, default=3)
+    medir.add_argument('--fases', help=f"fases a medir separadas por comas ({', '.join(PHASES)})")
+    medir.add_argument('--lexer', choices=('ply', 'dfa'), help="backend del análisis léxico")
+    medir.add_argument('--sin-memoria', action='store_true', help="no medir la memoria con tracemalloc")
+    medir.add_argument('--etiqueta', help="texto libre para identificar la corrida")
+    medir.add_argument('-o', '--salida', help="archivo JSON de resultados (por defecto stdout)")
+    medir.set_defaults(run=cmd_medir)
+
+    comparar = commands.add_parser('comparar', help="compara dos resultados y marca regresiones")
+    comparar.add_argument('base')
+    comparar.add_argument('nuevo')
+    comparar.add_argument('--umbral', type=float, default=10.0,
+                          help="caída de rendimiento en %% a partir de la cual hay regresión")
+    comparar.set_defaults(run=cmd_comparar)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+'''Mide cuánto tiempo queda bloqueado el ciclo de eventos de Tk al usar el IDE.
+
+Instancia IDE sobre un programa grande generado con generador.generate y
+reproduce escenarios de uso: abrir el archivo, escribir en medio del texto,
+desplazarse y compilar. Mientras tanto un after() periódico mide con qué
+retraso lo atiende Tk; ese retraso es el tiempo en que la interfaz no
+respondía. Se reportan percentiles por escenario.
+
+Necesita un servidor X; sin pantalla sirve uno virtual.
+
+Uso:
+  xvfb-run -a python benchmarks/bench_ide.py --tamaño 1M
+  python benchmarks/bench_ide.py --xvfb --tamaño 1M -o ide.json
+'''
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import generate, parse_size
+
+# Instrucciones que puede entregar un escenario (ver Driver)
+QUIET = 'quiet'
+
+TYPED = "\n  a0 = (a1 + 25) * 3;\n  if a0 > 10 then cout a0; end\n  f0 = f1 / 2.5; // fin\n"
+
+
+class LoopMonitor:
+    '''Retraso con que Tk atiende un after() cada interval segundos.
+
+    Cada muestra es el tiempo que pasó entre el momento programado y el
+    momento en que el callback corrió: cuánto estuvo ocupado el ciclo de
+    eventos. Las muestras se agrupan por la sección activa.
+    '''
+
+    def __init__(self, root, interval=0.005, late=0.010):
+        self.root = root
+        self.interval = interval
+        self.late = late
+        self.section = None
+        self.samples = {}
+        self.last_late = time.perf_counter()
+        self._expected = None
+
+    def start(self):
+        self._schedule(time.perf_counter())
+
+    def _schedule(self, now):
+        self._expected = now + self.interval
+        self.root.after(int(self.interval * 1000), self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        lateness = max(0.0, now - self._expected)
+        if lateness > self.late:
+            self.last_late = now
+        if self.section is not None:
+            self.samples.setdefault(self.section, []).append(lateness)
+        self._schedule(now)
+
+    def quiet_for(self, seconds):
+        '''Verdadero si en los últimos seconds ningún tick llegó tarde'''
+        return time.perf_counter() - self.last_late >= seconds
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples):
+    '''Estadísticas en ms de una lista de retrasos en segundos'''
+    if not samples:
+        return {'muestras': 0}
+    ordered = sorted(samples)
+    return {
+        'muestras': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p90_ms': round(percentile(ordered, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+        'bloqueado_ms': round(sum(ordered) * 1000, 1),
+        'bloqueos_50ms': sum(1 for value in ordered if value > 0.050),
+    }
+
+
+class Driver:
+    '''Ejecuta escenarios dentro del ciclo de eventos de Tk.
+
+    Un escenario es un generador que hace una acción y luego entrega qué
+    esperar antes de la siguiente: un número de ms, una función que debe
+    volverse verdadera, o QUIET (que el ciclo de eventos quede libre). Al
+    terminar cada escenario se espera a QUIET para incluir el trabajo que
+    quedó programado (resaltado, resultados del compilador).
+    '''
+
+    POLL_MS = 20
+
+    def __init__(self, root, monitor, timeout=60.0, quiet=0.3):
+        self.root = root
+        self.monitor = monitor
+        self.timeout = timeout
+        self.quiet = quiet
+        self.results = {}
+        self._pending = []
+        self._name = None
+        self._steps = None
+        self._start = None
+
+    def run(self, scenarios):
+        self._pending = list(scenarios)
+        self.monitor.start()
+        self.root.after(0, self._next_scenario)
+        self.root.mainloop()
+        return self.results
+
+    def _next_scenario(self):
+        if not self._pending:
+            self.root.quit()
+            return
+        self._name, function = self._pending.pop(0)
+        self.monitor.section = self._name
+        self._start = time.perf_counter()
+        self._steps = function()
+        self._advance()
+
+    def _advance(self):
+        try:
+            wait = next(self._steps)
+        except StopIteration:
+            self._wait(QUIET, self._finish_scenario)
+            return
+        self._wait(wait, self._advance)
+
+    def _wait(self, wait, then):
+        if isinstance(wait, (int, float)):
+            self.root.after(int(wait), then)
+            return
+        condition = (lambda: self.monitor.quiet_for(self.quiet)) if wait == QUIET else wait
+        deadline = time.perf_counter() + self.timeout
+
+        def poll():
+            if condition() or time.perf_counter() > deadline:
+                then()
+            else:
+                self.root.after(self.POLL_MS, poll)
+        self.root.after(self.POLL_MS, poll)
+
+    def _finish_scenario(self):
+        self.monitor.section = None
+        stats = summarize(self.monitor.samples.get(self._name, []))
+        stats['duracion_s'] = round(time.perf_counter() - self._start, 3)
+        self.results[self._name] = stats
+        self.root.after(0, self._next_scenario)
+
+
+def scenarios(ide, path, keys, wheel, key_ms):
+    '''Escenarios de uso sobre el archivo path'''
+    import tkinter as tk
+    import ide as ide_module
+    editor = ide.editor
+
+    def has_text(widget):
+        return lambda: widget.index("end-1c") != "1.0"
+
+    def abrir():
+        # Sin diálogo: open_file recibe la ruta como si el usuario la eligiera
+        ide_module.filedialog.askopenfilename = lambda **options: path
+        ide.open_file()
+        yield QUIET
+
+    def escritura():
+        lines = int(editor.index("end-1c").split(".")[0])
+        editor.mark_set(tk.INSERT, f"{max(1, lines // 2)}.0")
+        editor.see(tk.INSERT)
+        # Cada tecla sigue el camino de la clase Text: insert o delete sobre
+        # el widget (pasa por CustomText._proxy) y luego KeyRelease
+        text = (TYPED * (keys // len(TYPED) + 1))[:keys]
+        for count, char in enumerate(text, 1):
+            editor.insert(tk.INSERT, char)
+            editor.see(tk.INSERT)
+            editor.event_generate("<KeyRelease>")
+            yield key_ms
+            if count % 20 == 0:
+                editor.delete(f"{tk.INSERT}-1c")
+                editor.event_generate("<KeyRelease>")
+                yield key_ms
+
+    def desplazamiento():
+        for _ in range(wheel):
+            editor.event_generate("<MouseWheel>", delta=-120)
+            yield 10
+        for _ in range(wheel // 4):
+            ide._on_scroll("scroll", 1, "pages")
+            yield 16
+        for fraction in (0.0, 0.5, 0.25, 0.75, 1.0, 0.1):
+            ide._on_scroll("moveto", fraction)
+            yield 50
+
+    def compilacion():
+        ide.compile_lexico()
+        yield lambda: ide.token_table.data.buffer is not None
+        yield QUIET
+        ide.compile_sintactico()
+        yield has_text(ide.output_sintactico)
+        yield QUIET
+        ide.compile_semantico()
+        yield has_text(ide.output_semantico)
+        yield QUIET
+        ide.compile_intermedio()
+        yield has_text(ide.output_intermedio)
+
+    return [('abrir', abrir), ('escritura', escritura),
+            ('desplazamiento', desplazamiento), ('compilacion', compilacion)]
+
+
+def start_xvfb():
+    '''Lanza Xvfb en la primera pantalla libre y ajusta DISPLAY; devuelve el proceso'''
+    if shutil.which('Xvfb') is None:
+        sys.exit("No se encontró Xvfb; instálelo o ejecute con xvfb-run")
+    for number in range(99, 140):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen(['Xvfb', f':{number}', '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ['DISPLAY'] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.kill()
+    sys.exit("No se pudo iniciar Xvfb")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamaño', default='256K', help="tamaño del programa generado (por ejemplo 1M)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--teclas', type=int, default=200, help="caracteres escritos en el escenario de escritura")
+    parser.add_argument('--intervalo-teclas', type=int, default=15, help="ms entre teclas")
+    parser.add_argument('--rueda', type=int, default=100, help="pasos de la rueda del mouse")
+    parser.add_argument('--escenarios', help="escenarios a ejecutar separados por comas (por defecto todos)")
+    parser.add_argument('--xvfb', action='store_true', help="lanzar un servidor X virtual propio")
+    parser.add_argument('-o', '--salida', help="archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    xvfb = start_xvfb() if args.xvfb else None
+    if not os.environ.get('DISPLAY') and os.name != 'nt':
+        sys.exit("No hay servidor X (DISPLAY); use --xvfb o xvfb-run")
+
+    fd, path = tempfile.mkstemp(suffix='.txt', prefix='bench-ide-')
+    text = generate(parse_size(args.tamaño), args.semilla)
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        file.write(text)
+    try:
+        import tkinter as tk
+        from ide import IDE
+        root = tk.Tk()
+        root.geometry("1280x960")
+        ide = IDE(root)
+        selected = scenarios(ide, path, args.teclas, args.rueda, args.intervalo_teclas)
+        if args.escenarios:
+            names = args.escenarios.split(',')
+            selected = [scenario for scenario in selected if scenario[0] in names]
+        monitor = LoopMonitor(root)
+        results = Driver(root, monitor).run(selected)
+        root.destroy()
+    finally:
+        os.remove(path)
+        if xvfb is not None:
+            xvfb.terminate()
+
+    print(f"{'Escenario':<16}{'p50':>8}{'p90':>8}{'p99':>9}{'máx':>9}{'>50ms':>7}{'duración':>10}   (ms)")
+    for name, stats in results.items():
+        if not stats['muestras']:
+            print(f"{name:<16}{'sin muestras':>24}")
+            continue
+        print(f"{name:<16}{stats['p50_ms']:8.1f}{stats['p90_ms']:8.1f}{stats['p99_ms']:9.1f}"
+              f"{stats['max_ms']:9.1f}{stats['bloqueos_50ms']:7}{stats['duracion_s'] * 1000:10.0f}")
+    if args.salida:
+        data = {'tamaño': args.tamaño, 'bytes': len(text), 'semilla': args.semilla, 'escenarios': results}
+        with open(args.salida, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
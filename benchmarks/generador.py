@@ -0,0 +1,188 @@
+'''Generador de programas sintéticos para los benchmarks del compilador.
+
+generate(tamaño, semilla) produce un programa válido (sin errores léxicos,
+sintácticos ni semánticos) de al menos tamaño bytes; con errores > 0 una
+fracción de las sentencias lleva un error léxico, sintáctico o semántico.
+La misma semilla produce siempre el mismo texto.
+
+Uso: python benchmarks/generador.py 1M --semilla 7 --errores 0.05 -o programa.txt
+'''
+import argparse
+import random
+import sys
+
+INTS = ['a0', 'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7']
+FLOATS = ['f0', 'f1', 'f2', 'f3']
+RELATIONAL = ['<', '<=', '>', '>=', '==', '!=']
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(text):
+    '''"512", "64K", "10M" -> bytes'''
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    for unit in ('G', 'M', 'K'):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+class ProgramGenerator:
+    '''Sentencias aleatorias que respetan las reglas de tipos del lenguaje.
+
+    Para que el plegado de constantes no desborde, cada '*' tiene una
+    variable a la izquierda y los divisores son literales distintos de cero;
+    así las subexpresiones solo de constantes quedan pequeñas.
+    '''
+
+    MAX_DEPTH = 3
+
+    def __init__(self, seed=0, errors=0.0):
+        self.random = random.Random(seed)
+        self.errors = errors
+        self.error_count = 0
+
+    # Expresiones
+    def int_expr(self, depth=0):
+        r = self.random
+        if depth >= self.MAX_DEPTH or r.random() < 0.35:
+            return r.choice(INTS) if r.random() < 0.7 else str(r.randint(0, 99))
+        op = r.choice('+-*/%+-')
+        if op in '/%':
+            return f"({self.int_expr(depth + 1)} {op} {r.randint(1, 9)})"
+        if op == '*':
+            return f"{r.choice(INTS)} * {self.int_expr(depth + 1)}"
+        if r.random() < 0.1:
+            return f"-({self.int_expr(depth + 1)})"
+        return f"({self.int_expr(depth + 1)} {op} {self.int_expr(depth + 1)})"
+
+    def float_expr(self, depth=0):
+        r = self.random
+        if depth >= self.MAX_DEPTH or r.random() < 0.35:
+            choice = r.random()
+            if choice < 0.5:
+                return r.choice(FLOATS)
+            if choice < 0.8:
+                return f"{r.randint(0, 99)}.{r.randint(0, 99)}"
+            return self.int_expr(self.MAX_DEPTH - 1)
+        op = r.choice('+-*/')
+        if op == '/':
+            return f"({self.float_expr(depth + 1)} / {r.randint(1, 9)}.5)"
+        if op == '*':
+            return f"{r.choice(FLOATS)} * {self.float_expr(depth + 1)}"
+        return f"({self.float_expr(depth + 1)} {op} {self.float_expr(depth + 1)})"
+
+    def condition(self, depth=0):
+        r = self.random
+        choice = r.random()
+        if depth < 2 and choice < 0.2:
+            return f"({self.condition(depth + 1)} {r.choice(['&&', '||'])} {self.condition(depth + 1)})"
+        if depth < 2 and choice < 0.25:
+            return f"!({self.condition(depth + 1)})"
+        if choice < 0.4:
+            return f"{self.float_expr(2)} {r.choice(RELATIONAL)} {self.float_expr(2)}"
+        return f"{self.int_expr(2)} {r.choice(RELATIONAL)} {self.int_expr(2)}"
+
+    # Sentencias
+    def statement(self, depth=0):
+        text = self._statement(depth)
+        if self.errors and self.random.random() < self.errors:
+            text = self.corrupt(text)
+        return text
+
+    def _statement(self, depth):
+        r = self.random
+        choice = r.random()
+        nested = depth < 2
+        if nested and choice < 0.08:
+            orelse = f" else {self.block(depth)}" if r.random() < 0.5 else ""
+            return f"if {self.condition()} then {self.block(depth)}{orelse} end"
+        if nested and choice < 0.13:
+            # El cuerpo de while es un bloque con su propio ámbito
+            local = f"int w; w = {self.int_expr(1)}; " if r.random() < 0.3 else ""
+            return f"while {self.condition()} {{ {local}{self.block(depth)} }}"
+        if nested and choice < 0.17:
+            return f"do {self.block(depth)} until {self.condition()};"
+        if nested and choice < 0.2:
+            labels = r.sample(range(10), r.randint(1, 3))
+            cases = ' '.join(f"case {label} {self.block(depth)}" for label in labels)
+            orelse = f" else {self.block(depth)}" if r.random() < 0.5 else ""
+            return f"switch {self.int_expr(1)} {{ {cases}{orelse} }}"
+        if choice < 0.3:
+            return f"cout {self.int_expr() if r.random() < 0.6 else self.float_expr()};"
+        if choice < 0.34:
+            return f"cin {r.choice(INTS + FLOATS)};"
+        if choice < 0.4:
+            return f"{r.choice(INTS)}{r.choice(['++', '--'])};"
+        if choice < 0.43:
+            return f"// {r.choice(INTS)} se actualiza abajo\n  {r.choice(INTS)} = {self.int_expr()};"
+        if choice < 0.45:
+            return f"/* bloque {r.randint(0, 999)} */ cout {self.condition()};"
+        if choice < 0.65:
+            return f"{r.choice(FLOATS)} = {self.float_expr()};"
+        return f"{r.choice(INTS)} = {self.int_expr()};"
+
+    def block(self, depth):
+        return ' '.join(self.statement(depth + 1) for _ in range(self.random.randint(1, 3)))
+
+    def corrupt(self, text):
+        '''Introduce un error en una sentencia'''
+        r = self.random
+        self.error_count += 1
+        kind = r.randrange(6)
+        if kind == 0:
+            return text.replace(';', ' @;', 1)                  # carácter no válido
+        if kind == 1:
+            return f"{r.choice(INTS)} = 3.4.5; {text}"          # real mal formado
+        if kind == 2:
+            return f"{text} {r.choice(INTS)} = {r.choice(INTS)} * ;"  # falta un operando
+        if kind == 3:
+            return f"{text} zz{r.randint(0, 99)} = 1;"          # variable no declarada
+        if kind == 4:
+            return f"{text} {r.choice(INTS)} = {r.choice(FLOATS)};"   # float a int
+        return f"{text} if {r.choice(INTS)} then cout 1; end"   # condición no lógica
+
+    def program(self, size):
+        '''Programa de al menos size bytes'''
+        header = (f"main {{\n  int {', '.join(INTS)};\n  float {', '.join(FLOATS)};\n"
+                  f"  // programa generado para benchmarks\n")
+        parts = [header]
+        total = len(header) + 2
+        while total < size:
+            statement = self.statement()
+            parts.append(f"  {statement}\n")
+            total += len(statement) + 3
+        parts.append("}\n")
+        return ''.join(parts)
+
+
+def generate(size, seed=0, errors=0.0):
+    '''Texto de un programa de al menos size bytes (errors = fracción de sentencias con errores)'''
+    return ProgramGenerator(seed, errors).program(size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tamaño', help="tamaño mínimo, por ejemplo 1K, 10M o 100M")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--errores', type=float, default=0.0,
+                        help="fracción de sentencias con errores (0 = programa válido)")
+    parser.add_argument('-o', '--salida', help="archivo de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    text = generate(parse_size(args.tamaño), args.semilla, args.errores)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import sys
+from array import array
+import ply.lex as lex
+import lexico
+from lexico import lexer, tokens
+from mapa_fuente import SourceMap
+
+# Código numérico de cada tipo de token (índice en lexico.tokens)
+TYPE_CODES = {name: code for code, name in enumerate(tokens)}
+_NUMBER = TYPE_CODES['NUMBER']
+_REAL = TYPE_CODES['REAL']
+_ID = TYPE_CODES['ID']
+
+
+class TokenView:
+    '''Vista ligera de un token del buffer con la interfaz de LexToken'''
+    __slots__ = ('buffer', 'index')
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return tokens[self.buffer.kinds[self.index]]
+
+    @property
+    def value(self):
+        return self.buffer.value(self.index)
+
+    @property
+    def lexeme(self):
+        return self.buffer.lexeme(self.index)
+
+    @property
+    def lexpos(self):
+        return self.buffer.offsets[self.index]
+
+    @property
+    def lineno(self):
+        return self.buffer.source_map.line(self.buffer.offsets[self.index])
+
+    @property
+    def column(self):
+        return self.buffer.source_map.position(self.buffer.offsets[self.index])[1]
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+
+class TokenBuffer:
+    '''Tokens almacenados por columnas en lugar de un LexToken por token.
+
+    kinds guarda el código del tipo (array 'H'), offsets y lengths la
+    posición y longitud del lexema en el texto (arrays 'I'). Los valores se
+    obtienen del texto solo cuando se piden, y la línea y columna con el
+    SourceMap de la fuente.
+    '''
+
+    def __init__(self, text, source_map=None):
+        self.text = text
+        self.source_map = source_map if source_map is not None else SourceMap(text)
+        self.kinds = array('H')
+        self.offsets = array('I')
+        self.lengths = array('I')
+
+    @classmethod
+    def from_text(cls, text, source_map=None, backend=None):
+        '''Tokeniza el texto con el backend indicado (por defecto lexico.BACKEND)'''
+        buffer = cls(text, source_map)
+        if (backend or lexico.BACKEND) == 'dfa':
+            from automata import scan
+            for type, start, end in scan(text):
+                buffer.kinds.append(TYPE_CODES[type])
+                buffer.offsets.append(start)
+                buffer.lengths.append(end - start)
+            return buffer
+
+        lexer_copy = lexer.clone()
+        lexer_copy.input(text)
+        next_token = lexer_copy.token
+        kinds, offsets, lengths = buffer.kinds, buffer.offsets, buffer.lengths
+        while True:
+            tok = next_token()
+            if not tok:
+                break
+            kinds.append(TYPE_CODES[tok.type])
+            offsets.append(tok.lexpos)
+            # lexpos del lexer queda justo al final del token
+            lengths.append(lexer_copy.lexpos - tok.lexpos)
+        return buffer
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("índice de token fuera de rango")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+    def type(self, index):
+        return tokens[self.kinds[index]]
+
+    def lexeme(self, index):
+        start = self.offsets[index]
+        return self.text[start:start + self.lengths[index]]
+
+    def value(self, index):
+        '''Valor del token como lo entrega el lexer (int, float o texto)'''
+        kind = self.kinds[index]
+        lexeme = self.lexeme(index)
+        if kind == _NUMBER:
+            return int(lexeme)
+        if kind == _REAL:
+            return float(lexeme)
+        if kind == _ID:
+            return sys.intern(lexeme)
+        return lexeme
+
+    def count(self, type_name):
+        '''Número de tokens de un tipo'''
+        return self.kinds.count(TYPE_CODES[type_name])
+
+    def indices_of(self, type_name):
+        '''Índices de los tokens de un tipo'''
+        code = TYPE_CODES[type_name]
+        return array('I', (i for i, kind in enumerate(self.kinds) if kind == code))
+
+    def lexer(self):
+        '''Adaptador con token() para pasar el buffer al parser de PLY'''
+        return _BufferLexer(self)
+
+
+class _BufferLexer:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.index = 0
+        self.lineno = 1
+
+    def token(self):
+        buffer = self.buffer
+        if self.index >= len(buffer.kinds):
+            return None
+        tok = lex.LexToken()
+        tok.type = buffer.type(self.index)
+        tok.value = buffer.value(self.index)
+        tok.lexpos = buffer.offsets[self.index]
+        tok.lineno = self.lineno = buffer.source_map.line(tok.lexpos)
+        tok.lexer = self
+        self.index += 1
+        return tok
@@ -1,23 +1,415 @@
+from array import array
+import arbol
 
-class ASTNode:
-    def __init__(self, type, value=None, children=None):
-        self.type = type
-        self.value = value
-        self.children = children if children else []
+# Códigos de operación de los cuádruplos
+OPCODES = [
+    'ADD', 'SUB', 'MUL', 'DIV', 'IDIV', 'MOD', 'POW', 'IPOW',
+    'LT', 'LE', 'GT', 'GE', 'NE', 'EQ',
+    'NEG', 'NOT', 'ITOF', 'COPY',
+    'LABEL', 'GOTO', 'IFFALSE', 'IFTRUE', 'READ', 'WRITE',
+]
+(ADD, SUB, MUL, DIV, IDIV, MOD, POW, IPOW,
+ LT, LE, GT, GE, NE, EQ,
+ NEG, NOT, ITOF, COPY,
+ LABEL, GOTO, IFFALSE, IFTRUE, READ, WRITE) = range(len(OPCODES))
 
-def generate_intermediate_code(tokens):
-    root = ASTNode('Program')
-    root.children.append(ASTNode('Expression', value=tokens))
-    return root
+# Operador del AST -> código de operación (DIV/POW se eligen según el tipo)
+BINARY = {
+    '+': ADD, '-': SUB, '*': MUL, '%': MOD,
+    '<': LT, '<=': LE, '>': GT, '>=': GE, '!=': NE, '==': EQ,
+}
+SYMBOLS = {
+    ADD: '+', SUB: '-', MUL: '*', DIV: '/', IDIV: 'div', MOD: '%', POW: '^', IPOW: '^',
+    LT: '<', LE: '<=', GT: '>', GE: '>=', NE: '!=', EQ: '==',
+}
+
+# Cada operando es un entero con el tipo en los 2 bits bajos y el índice
+# (dirección de la variable, número de temporal, de constante o de etiqueta)
+# en el resto; NONE indica que el campo no se usa
+VAR, TEMP, CONST, LABEL_REF = range(4)
+NONE = -1
+
+
+def operand(kind, index):
+    return index << 2 | kind
+
+
+def kind_of(value):
+    return value & 3
+
+
+def index_of(value):
+    return value >> 2
+
+
+# Tipo del resultado de una instrucción en IntermediateCode.int_results
+INT = 1
+UNKNOWN = 2
+
+
+class IntermediateCode:
+    '''Cuádruplos (op, arg1, arg2, resultado) en arreglos paralelos.
+
+    ops es un array 'B' y los tres campos arrays 'i' con operandos
+    codificados por operand(). Las constantes se guardan una sola vez en
+    constants; las variables son las direcciones de la tabla de símbolos.
+    '''
+
+    def __init__(self, symbols=()):
+        self.ops = array('B')
+        self.arg1 = array('i')
+        self.arg2 = array('i')
+        self.result = array('i')
+        self.constants = []
+        self._constant_index = {}
+        self.var_names = []
+        self.var_types = []
+        self.num_temps = 0
+        self.num_labels = 0
+        # Los nombres repetidos por ámbitos anidados se distinguen con su dirección
+        seen = set()
+        for symbol in symbols:
+            name = symbol.name if symbol.name not in seen else f"{symbol.name}@{symbol.address}"
+            seen.add(symbol.name)
+            self.var_names.append(name)
+            self.var_types.append(symbol.type)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def copy(self):
+        '''Copia independiente de las instrucciones y constantes'''
+        other = IntermediateCode()
+        for name in ('ops', 'arg1', 'arg2', 'result', 'constants', 'var_names', 'var_types'):
+            setattr(other, name, getattr(self, name)[:])
+        other._constant_index = dict(self._constant_index)
+        other.num_temps = self.num_temps
+        other.num_labels = self.num_labels
+        return other
+
+    def emit(self, op, arg1=NONE, arg2=NONE, result=NONE):
+        self.ops.append(op)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+
+    def constant(self, value):
+        # El tipo forma parte de la clave: 1, 1.0 y True son iguales en un
+        # dict, y repr distingue 0.0 de -0.0
+        key = (type(value), repr(value) if isinstance(value, float) else value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return operand(CONST, index)
+
+    def int_results(self):
+        '''Por instrucción: INT si su resultado es int, UNKNOWN si no se sabe, 0 si no.
+
+        ADD, SUB, MUL y NEG sirven para int y para float; el tipo sale de los
+        operandos, siguiendo el último tipo asignado a cada temporal en el
+        orden de las instrucciones (los temporales no pasan de una sentencia
+        a otra).
+        '''
+        var_types, constants = self.var_types, self.constants
+        temps = {}
+
+        def type_of(value):
+            kind = kind_of(value)
+            if kind == VAR:
+                return INT if var_types[index_of(value)] == 'int' else 0
+            if kind == CONST:
+                return INT if constants[index_of(value)].__class__ is int else 0
+            return temps.get(value, UNKNOWN)
+
+        results = bytearray(len(self.ops))
+        for i, op in enumerate(self.ops):
+            if op in (ADD, SUB, MUL):
+                left, right = type_of(self.arg1[i]), type_of(self.arg2[i])
+                kind = INT if left == right == INT else 0 if 0 in (left, right) else UNKNOWN
+            elif op in (NEG, COPY):
+                kind = type_of(self.arg1[i])
+            elif op in (IDIV, MOD, IPOW):
+                kind = INT
+            elif op == READ:
+                kind = type_of(self.result[i])
+            elif op in (LABEL, GOTO, IFFALSE, IFTRUE, WRITE):
+                continue
+            else:
+                kind = 0
+            if kind_of(self.result[i]) == TEMP:
+                temps[self.result[i]] = kind
+            results[i] = kind
+        return results
+
+    def new_label(self):
+        self.num_labels += 1
+        return operand(LABEL_REF, self.num_labels - 1)
+
+    def label_positions(self):
+        '''Índice de la instrucción LABEL de cada etiqueta'''
+        positions = array('i', [-1]) * self.num_labels
+        for i, op in enumerate(self.ops):
+            if op == LABEL:
+                positions[index_of(self.result[i])] = i
+        return positions
+
+    def name(self, value):
+        '''Texto de un operando'''
+        kind, index = kind_of(value), index_of(value)
+        if kind == VAR:
+            return self.var_names[index]
+        if kind == TEMP:
+            return f"t{index}"
+        if kind == LABEL_REF:
+            return f"L{index}"
+        constant = self.constants[index]
+        if isinstance(constant, bool):
+            return 'true' if constant else 'false'
+        return repr(constant)
+
+    def format(self, i):
+        '''Instrucción i en notación de tres direcciones'''
+        op, a, b, r = self.ops[i], self.arg1[i], self.arg2[i], self.result[i]
+        name = self.name
+        if op in SYMBOLS:
+            return f"{name(r)} = {name(a)} {SYMBOLS[op]} {name(b)}"
+        if op == NEG:
+            return f"{name(r)} = -{name(a)}"
+        if op == NOT:
+            return f"{name(r)} = !{name(a)}"
+        if op == ITOF:
+            return f"{name(r)} = float({name(a)})"
+        if op == COPY:
+            return f"{name(r)} = {name(a)}"
+        if op == LABEL:
+            return f"{name(r)}:"
+        if op == GOTO:
+            return f"goto {name(r)}"
+        if op in (IFFALSE, IFTRUE):
+            return f"{'if_false' if op == IFFALSE else 'if_true'} {name(a)} goto {name(r)}"
+        if op == READ:
+            return f"read {name(r)}"
+        return f"write {name(a)}"
+
+    def quadruple(self, i):
+        '''Instrucción i como tupla (op, arg1, arg2, resultado) de textos'''
+        fields = (self.arg1[i], self.arg2[i], self.result[i])
+        return (OPCODES[self.ops[i]],) + tuple('' if value == NONE else self.name(value) for value in fields)
+
+    def dump(self):
+        '''Listado legible: índice, cuádruplo y su forma de tres direcciones'''
+        lines = []
+        for i in range(len(self.ops)):
+            quad = '(' + ', '.join(self.quadruple(i)) + ')'
+            text = self.format(i)
+            lines.append(f"{i:>6}  {quad:<36}{text if self.ops[i] == LABEL else '    ' + text}")
+        lines.append(f"{len(self.ops)} cuádruplos, {self.num_temps} temporales, "
+                     f"{self.num_labels} etiquetas, {len(self.constants)} constantes")
+        return '\n'.join(lines)
+
+
+class CodeGenerator:
+    '''Traduce el AST ya comprobado a cuádruplos en un solo recorrido.
+
+    Los temporales se numeran de nuevo en cada sentencia, así que su
+    cantidad total es la de la sentencia más grande. && y || se evalúan en
+    cortocircuito.
+    '''
+
+    def __init__(self, code):
+        self.code = code
+        self._temp = 0
+
+    def new_temp(self):
+        temp = operand(TEMP, self._temp)
+        self._temp += 1
+        if self._temp > self.code.num_temps:
+            self.code.num_temps = self._temp
+        return temp
+
+    def generate(self, node):
+        self._temp = 0
+        getattr(self, f"_{type(node).__name__}")(node)
+
+    def _Program(self, node):
+        self.generate(node.body)
+
+    def _Block(self, node):
+        for statement in node.statements:
+            self.generate(statement)
+
+    def _Declaration(self, node):
+        pass
+
+    def _Assign(self, node):
+        code, symbol = self.code, node.symbol
+        target = operand(VAR, symbol.address)
+        if symbol.type == 'float' and node.expr.type == 'int':
+            if type(node.expr) is arbol.Num:
+                code.emit(COPY, code.constant(float(node.expr.value)), NONE, target)
+            else:
+                code.emit(ITOF, self.expr(node.expr), NONE, target)
+            return
+        value = self.expr(node.expr)
+        # t = a op b; x = t  ->  x = a op b
+        if kind_of(value) == TEMP and len(code) and code.result[-1] == value and code.ops[-1] != LABEL:
+            code.result[-1] = target
+        else:
+            code.emit(COPY, value, NONE, target)
+
+    def _IncDec(self, node):
+        target = operand(VAR, node.symbol.address)
+        self.code.emit(ADD if node.op == '++' else SUB, target, self.code.constant(1), target)
+
+    def _Cin(self, node):
+        self.code.emit(READ, NONE, NONE, operand(VAR, node.symbol.address))
+
+    def _Cout(self, node):
+        self.code.emit(WRITE, self.expr(node.expr))
+
+    def _If(self, node):
+        code = self.code
+        else_label = code.new_label()
+        code.emit(IFFALSE, self.expr(node.cond), NONE, else_label)
+        self.generate(node.then)
+        if node.orelse is None:
+            code.emit(LABEL, NONE, NONE, else_label)
+            return
+        end_label = code.new_label()
+        code.emit(GOTO, NONE, NONE, end_label)
+        code.emit(LABEL, NONE, NONE, else_label)
+        self.generate(node.orelse)
+        code.emit(LABEL, NONE, NONE, end_label)
+
+    def _While(self, node):
+        code = self.code
+        start, end = code.new_label(), code.new_label()
+        code.emit(LABEL, NONE, NONE, start)
+        code.emit(IFFALSE, self.expr(node.cond), NONE, end)
+        self.generate(node.body)
+        code.emit(GOTO, NONE, NONE, start)
+        code.emit(LABEL, NONE, NONE, end)
+
+    def _DoUntil(self, node):
+        code = self.code
+        start = code.new_label()
+        code.emit(LABEL, NONE, NONE, start)
+        self.generate(node.body)
+        self._temp = 0
+        code.emit(IFFALSE, self.expr(node.cond), NONE, start)
+
+    def _Switch(self, node):
+        # Primero todas las comparaciones y después los cuerpos, de modo que
+        # el valor del switch no se pierde al reutilizar los temporales
+        code = self.code
+        value = self.expr(node.expr)
+        labels = []
+        for case in node.cases:
+            label = code.new_label()
+            labels.append(label)
+            test = self.new_temp()
+            code.emit(EQ, value, code.constant(case.value.value), test)
+            code.emit(IFTRUE, test, NONE, label)
+        end = code.new_label()
+        default = code.new_label() if node.default is not None else end
+        code.emit(GOTO, NONE, NONE, default)
+        for case, label in zip(node.cases, labels):
+            code.emit(LABEL, NONE, NONE, label)
+            self.generate(case.body)
+            code.emit(GOTO, NONE, NONE, end)
+        if node.default is not None:
+            code.emit(LABEL, NONE, NONE, default)
+            self.generate(node.default)
+        code.emit(LABEL, NONE, NONE, end)
+
+    def expr(self, root):
+        '''Genera el código de una expresión y devuelve el operando con su valor.
+
+        Recorrido en postorden con pila explícita; el segundo elemento de
+        cada entrada indica la etapa (0 = por visitar, 1 = tras el operando
+        izquierdo de && o ||, 2 = tras todos los operandos).
+        '''
+        code = self.code
+        values = []
+        pending = []
+        stack = [(root, 0)]
+        while stack:
+            node, stage = stack.pop()
+            kind = type(node)
+            if kind is arbol.Num:
+                values.append(code.constant(node.value))
+            elif kind is arbol.Var:
+                values.append(operand(VAR, node.symbol.address))
+            elif stage == 0:
+                stack.append((node, 2))
+                if kind is arbol.BinOp:
+                    stack.append((node.right, 0))
+                    if node.op in ('&&', '||'):
+                        stack.append((node, 1))
+                    stack.append((node.left, 0))
+                else:
+                    stack.append((node.operand, 0))
+            elif stage == 1:
+                # Cortocircuito: t = izquierdo; si ya decide, saltar al final
+                left, label = values.pop(), code.new_label()
+                if kind_of(left) == TEMP:
+                    temp = left
+                else:
+                    temp = self.new_temp()
+                    code.emit(COPY, left, NONE, temp)
+                code.emit(IFFALSE if node.op == '&&' else IFTRUE, temp, NONE, label)
+                pending.append((temp, label))
+            elif kind is arbol.BinOp and node.op in ('&&', '||'):
+                temp, label = pending.pop()
+                right = values.pop()
+                if kind_of(right) == TEMP and code.result[-1] == right and code.ops[-1] != LABEL:
+                    code.result[-1] = temp
+                else:
+                    code.emit(COPY, right, NONE, temp)
+                code.emit(LABEL, NONE, NONE, label)
+                values.append(temp)
+            elif kind is arbol.BinOp:
+                right, left = values.pop(), values.pop()
+                if node.op == '/':
+                    op = IDIV if node.type == 'int' else DIV
+                elif node.op == '^':
+                    op = IPOW if node.type == 'int' else POW
+                else:
+                    op = BINARY[node.op]
+                temp = self.new_temp()
+                code.emit(op, left, right, temp)
+                values.append(temp)
+            elif node.op == '+':
+                pass
+            else:
+                temp = self.new_temp()
+                code.emit(NEG if node.op == '-' else NOT, values.pop(), NONE, temp)
+                values.append(temp)
+        return values.pop()
+
+
+def generate_intermediate_code(ast, table):
+    '''Cuádruplos del programa; el AST debe haber pasado el análisis semántico'''
+    code = IntermediateCode(table.symbols)
+    CodeGenerator(code).generate(ast)
+    return code
 
 # Función para probar la generación de código intermedio
 def test_intermediate_code(input_text):
-    from lexico import test_lexer
-    tokens = test_lexer(input_text)
-    return generate_intermediate_code(tokens)
+    from compilacion import Compilation
+    return Compilation(input_text).intermediate
 
 # Prueba de la generación de código intermedio
 if __name__ == "__main__":
-    data = "3 + 5 * (10 - 4)"
-    ast = test_intermediate_code(data)
-    print(f"Código intermedio generado: {ast}")
\ No newline at end of file
+    data = """main {
+  int x, y;
+  float a;
+  cin x;
+  y = 3 + 5 * (10 - 4);
+  while x > 0 && y != 0 { cout x / 2; x--; a = x; }
+  if x == 0 then cout y; else cout -y; end
+  switch x { case 1 cout 1; case 2 cout 2; else cout 0; }
+}"""
+    code = test_intermediate_code(data)
+    print(code.dump())
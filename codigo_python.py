@@ -0,0 +1,377 @@
+'''Traducción del programa a código Python.
+
+Es el segundo backend de ejecución, junto a la máquina virtual: el AST ya
+comprobado se traduce a una función de Python y compile() la convierte en
+bytecode de CPython. Los ciclos while y do ... until quedan como ciclos
+de Python y las variables como variables locales de la función, así que
+el programa corre a la velocidad del intérprete sin un ciclo de despacho
+propio.
+
+La semántica es la misma que la de maquina: división entera truncada
+hacia cero, desbordamiento de los int fuera de 32 bits, cin lee con
+maquina.read_value y cout escribe con maquina.format_value.
+'''
+import hashlib
+import time
+from collections import OrderedDict
+import arbol
+from maquina import (
+    ExecutionError, IntegerOverflow, OutputBuffer, input_reader, read_value, format_value,
+    int_mod, int_pow, float_pow, check_int,
+)
+from tipos import int_div
+
+# Profundidad de paréntesis a partir de la cual una subexpresión se guarda
+# en un temporal; el tokenizador de Python no admite más de 200 niveles
+MAX_DEPTH = 50
+
+INDENT = '    '
+
+
+def _idiv(x, y):
+    return x // y if x >= 0 < y else check_int(int_div(x, y))
+
+
+def _imod(x, y):
+    return x % y if x >= 0 < y else int_mod(x, y)
+
+
+# Funciones auxiliares que usa el código generado; se pasan a la función
+# como argumentos por omisión para que sean variables locales
+HELPERS = {
+    '_idiv': _idiv,
+    '_imod': _imod,
+    '_int_div': int_div,
+    '_int_pow': int_pow,
+    '_float_pow': float_pow,
+    '_int': check_int,
+    '_read_value': read_value,
+    '_format': format_value,
+}
+
+
+class PythonTranslator:
+    '''Traduce el AST comprobado a las líneas de una función de Python.
+
+    Cada variable del programa es la variable local v<dirección>, así que
+    las declaraciones que ocultan otra del mismo nombre no se confunden.
+    Las expresiones se traducen en postorden con pila explícita; si una
+    queda demasiado anidada, la parte ya traducida se guarda en un
+    temporal _t<n> antes de la sentencia (el "preludio"). Para no alterar
+    el cortocircuito, el preludio del operando derecho de && y || queda
+    dentro de un if que solo se ejecuta si hace falta.
+    '''
+
+    def __init__(self, table):
+        self.table = table
+        self.lines = []
+        self._indent = INDENT
+        self._temp = 0
+
+    def new_temp(self):
+        temp = f"_t{self._temp}"
+        self._temp += 1
+        return temp
+
+    def emit(self, line):
+        self.lines.append(self._indent + line)
+
+    def emit_prelude(self, prelude):
+        for line in prelude:
+            self.emit(line)
+
+    def source(self, ast):
+        '''Código fuente de la función programa(_read, _write)'''
+        self.lines = []
+        self._indent = INDENT
+        for symbol in self.table.symbols:
+            self.emit(f"v{symbol.address} = {'0.0' if symbol.type == 'float' else '0'}")
+        self.generate(ast)
+        if not self.lines:
+            self.emit("pass")
+        helpers = ', '.join(f"{name}={name}" for name in HELPERS)
+        return '\n'.join([f"def programa(_read, _write, {helpers}):"] + self.lines + [""])
+
+    def generate(self, node):
+        self._temp = 0
+        getattr(self, f"_{type(node).__name__}")(node)
+
+    def block(self, node):
+        '''Traduce node como cuerpo de un if, while o case'''
+        self._indent += INDENT
+        count = len(self.lines)
+        self.generate(node)
+        if len(self.lines) == count:
+            self.emit("pass")
+        self._indent = self._indent[:-len(INDENT)]
+
+    def _Program(self, node):
+        self.generate(node.body)
+
+    def _Block(self, node):
+        for statement in node.statements:
+            self.generate(statement)
+
+    def _Declaration(self, node):
+        pass
+
+    def _Assign(self, node):
+        code, prelude = self.expr(node.expr)
+        self.emit_prelude(prelude)
+        if node.symbol.type == 'float' and node.expr.type == 'int':
+            code = f"float({code})"
+        self.emit(f"v{node.symbol.address} = {code}")
+
+    def _IncDec(self, node):
+        name = f"v{node.symbol.address}"
+        op = '+' if node.op == '++' else '-'
+        if node.symbol.type == 'int':
+            self.emit(f"{name} = _int({name} {op} 1)")
+        else:
+            self.emit(f"{name} {op}= 1")
+
+    def _Cin(self, node):
+        is_float = node.symbol.type == 'float'
+        self.emit(f"v{node.symbol.address} = _read_value(_read, {is_float})")
+
+    def _Cout(self, node):
+        code, prelude = self.expr(node.expr)
+        self.emit_prelude(prelude)
+        self.emit(f"_write(_format({code}))")
+
+    def _If(self, node):
+        code, prelude = self.expr(node.cond)
+        self.emit_prelude(prelude)
+        self.emit(f"if {code}:")
+        self.block(node.then)
+        if node.orelse is not None:
+            self.emit("else:")
+            self.block(node.orelse)
+
+    def _While(self, node):
+        code, prelude = self.expr(node.cond)
+        if not prelude:
+            self.emit(f"while {code}:")
+            self.block(node.body)
+            return
+        # La condición necesita sentencias previas: evaluarlas en cada vuelta
+        self.emit("while True:")
+        self._indent += INDENT
+        self.emit_prelude(prelude)
+        self.emit(f"if not {code}:")
+        self.emit(INDENT + "break")
+        self._indent = self._indent[:-len(INDENT)]
+        self.block(node.body)
+
+    def _DoUntil(self, node):
+        self.emit("while True:")
+        self.block(node.body)
+        self._temp = 0
+        code, prelude = self.expr(node.cond)
+        self._indent += INDENT
+        self.emit_prelude(prelude)
+        self.emit(f"if {code}:")
+        self.emit(INDENT + "break")
+        self._indent = self._indent[:-len(INDENT)]
+
+    def _Switch(self, node):
+        code, prelude = self.expr(node.expr)
+        self.emit_prelude(prelude)
+        if not code.isidentifier():
+            value = self.new_temp()
+            self.emit(f"{value} = {code}")
+            code = value
+        test = "if"
+        for case in node.cases:
+            self.emit(f"{test} {code} == {self.literal(case.value.value)}:")
+            self.block(case.body)
+            test = "elif"
+        if node.default is not None:
+            if node.cases:
+                self.emit("else:")
+                self.block(node.default)
+            else:
+                self.generate(node.default)
+
+    @staticmethod
+    def literal(value):
+        text = repr(value)
+        return f"({text})" if text.startswith('-') else text
+
+    def expr(self, root):
+        '''(código, preludio) de una expresión.
+
+        values guarda (código, profundidad, simple) de cada operando ya
+        traducido; simple indica un nombre o un literal, que se puede
+        repetir sin volver a calcular nada. marks guarda el largo del
+        preludio al terminar el operando izquierdo de cada BinOp.
+        '''
+        prelude = []
+        values = []
+        marks = []
+        stack = [(root, 0)]
+        while stack:
+            node, stage = stack.pop()
+            kind = type(node)
+            if kind is arbol.Num:
+                values.append((self.literal(node.value), 0, True))
+            elif kind is arbol.Var:
+                values.append((f"v{node.symbol.address}", 0, True))
+            elif stage == 0:
+                stack.append((node, 2))
+                if kind is arbol.BinOp:
+                    stack.append((node.right, 0))
+                    stack.append((node, 1))
+                    stack.append((node.left, 0))
+                else:
+                    stack.append((node.operand, 0))
+            elif stage == 1:
+                marks.append(len(prelude))
+            elif kind is arbol.BinOp:
+                mark = marks.pop()
+                right, right_depth, right_simple = values.pop()
+                left, left_depth, left_simple = values.pop()
+                if node.op in ('&&', '||') and len(prelude) > mark:
+                    # El preludio del operando derecho solo corre si hace falta
+                    inner = prelude[mark:]
+                    del prelude[mark:]
+                    temp = self.new_temp()
+                    prelude.append(f"{temp} = {left}")
+                    prelude.append(f"if {temp}:" if node.op == '&&' else f"if not {temp}:")
+                    prelude.extend(INDENT + line for line in inner)
+                    prelude.append(f"{INDENT}{temp} = {right}")
+                    values.append((temp, 0, True))
+                    continue
+                if len(prelude) > mark and not left_simple:
+                    # El operando izquierdo se evalúa antes que el preludio del derecho
+                    temp = self.new_temp()
+                    prelude.insert(mark, f"{temp} = {left}")
+                    left, left_depth, left_simple = temp, 0, True
+                code = self._binop(node, left, right, left_simple and right_simple)
+                self._push(values, prelude, code, max(left_depth, right_depth) + 1)
+            else:
+                operand, depth, simple = values.pop()
+                if node.op == '+':
+                    values.append((operand, depth, simple))
+                else:
+                    if node.op != '-':
+                        code = f"(not {operand})"
+                    elif node.type == 'int':
+                        code = f"_int(-{operand})"
+                    else:
+                        code = f"(-{operand})"
+                    self._push(values, prelude, code, depth + 1)
+        code, depth, simple = values.pop()
+        return code, prelude
+
+    def _push(self, values, prelude, code, depth):
+        if depth >= MAX_DEPTH:
+            temp = self.new_temp()
+            prelude.append(f"{temp} = {code}")
+            values.append((temp, 0, True))
+        else:
+            values.append((code, depth, False))
+
+    @staticmethod
+    def _binop(node, left, right, simple):
+        op = node.op
+        if op == '&&':
+            return f"({left} and {right})"
+        if op == '||':
+            return f"({left} or {right})"
+        if op == '/' and node.type == 'int':
+            # Solo INT_MIN / -1 se sale del rango, y no da un cociente no negativo
+            if simple:
+                return f"({left} // {right} if {left} >= 0 < {right} else _int(_int_div({left}, {right})))"
+            return f"_idiv({left}, {right})"
+        if op == '%':
+            if simple:
+                return f"({left} % {right} if {left} >= 0 < {right} else _imod({left}, {right}))"
+            return f"_imod({left}, {right})"
+        if op == '^':
+            return f"{'_int_pow' if node.type == 'int' else '_float_pow'}({left}, {right})"
+        if op in ('+', '-', '*') and node.type == 'int':
+            return f"_int({left} {op} {right})"
+        return f"({left} {op} {right})"
+
+
+def source_hash(source):
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Objetos de código compilados, indexados por el hash del código Python
+# generado: editar comentarios o espacios del programa no vuelve a compilar
+_code_cache = OrderedDict()
+CODE_CACHE_SIZE = 16
+
+
+def compile_source(source):
+    '''Objeto de código del módulo que define programa(), desde la caché si se puede'''
+    key = source_hash(source)
+    code = _code_cache.get(key)
+    if code is not None:
+        _code_cache.move_to_end(key)
+        return code
+    try:
+        code = compile(source, f"<programa {key[:8]}>", 'exec')
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        # Por ejemplo, más de 20 ciclos anidados o más de 100 niveles de bloques
+        raise ExecutionError(f"el programa no se puede traducir a Python ({e.__class__.__name__}: {e}); "
+                             f"use la máquina virtual") from None
+    _code_cache[key] = code
+    if len(_code_cache) > CODE_CACHE_SIZE:
+        _code_cache.popitem(last=False)
+    return code
+
+
+class PythonProgram:
+    '''Programa traducido a Python, listo para ejecutarse varias veces'''
+
+    def __init__(self, ast, table):
+        self.source = PythonTranslator(table).source(ast)
+        self.key = source_hash(self.source)
+        self._code = None
+
+    @property
+    def code(self):
+        if self._code is None:
+            self._code = compile_source(self.source)
+        return self._code
+
+    def function(self):
+        namespace = dict(HELPERS)
+        exec(self.code, namespace)
+        return namespace['programa']
+
+
+def translate(ast, table):
+    '''PythonProgram del AST; el AST debe haber pasado el análisis semántico'''
+    return PythonProgram(ast, table)
+
+
+def run_python(program, read, write):
+    '''Ejecuta el programa con funciones read y write como las de VirtualMachine.
+
+    Devuelve (segundos, error); los errores de Python que corresponden a
+    errores del programa se devuelven como ExecutionError.
+    '''
+    error = None
+    start = time.perf_counter()
+    try:
+        program.function()(read, write)
+    except ExecutionError as e:
+        error = e
+    except ZeroDivisionError:
+        error = ExecutionError("división entre cero")
+    except IntegerOverflow:
+        error = ExecutionError("desbordamiento de entero")
+    except OverflowError:
+        error = ExecutionError("desbordamiento de real")
+    return time.perf_counter() - start, error
+
+
+def execute_python(program, input_text='', max_output=10000):
+    '''Como maquina.execute, pero con el backend de Python (steps queda en None)'''
+    output = OutputBuffer(max_output)
+    seconds, error = run_python(program, input_reader(input_text), output.write)
+    return output.result(None, seconds, error)
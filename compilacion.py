@@ -0,0 +1,245 @@
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+from buffer_tokens import TokenBuffer
+from sintactico import parse
+from semantico import check_semantics
+from codigo_intermedio import generate_intermediate_code
+from optimizacion import optimize
+from maquina import Bytecode
+from codigo_python import translate
+from rendimiento import METRICS, capture
+
+
+class CompilationError(Exception):
+    '''El programa tiene errores y no se puede continuar con la fase pedida'''
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class Compilation:
+    '''Resultados de las fases del compilador para un mismo texto.
+
+    Cada etapa se calcula la primera vez que se pide y se reutiliza después:
+    el buffer de tokens se construye una sola vez y lo comparten el parser,
+    el análisis semántico y el código intermedio. STAGES define cómo se
+    calcula cada etapa y DEPENDS de qué etapas depende, para que
+    invalidate() descarte solo la etapa indicada y las que se derivan de ella.
+    Cada etapa se registra en rendimiento.METRICS con el nombre de MEASURES.
+    '''
+
+    STAGES = {
+        'tokens': lambda c: TokenBuffer.from_text(c.text),
+        'syntax': lambda c: parse(c.tokens),
+        'semantics': lambda c: check_semantics(c.ast),
+        'intermediate': lambda c: generate_intermediate_code(c.checked_ast(), c.semantics[0]),
+        'optimized': lambda c: optimize(c.intermediate),
+        'bytecode': lambda c: Bytecode(c.optimized[0]),
+        'python': lambda c: translate(c.checked_ast(), c.semantics[0]),
+    }
+    DEPENDS = {
+        'tokens': (),
+        'syntax': ('tokens',),
+        'semantics': ('syntax',),
+        'intermediate': ('semantics',),
+        'optimized': ('intermediate',),
+        'bytecode': ('optimized',),
+        'python': ('semantics',),
+    }
+    # Cómo aparece cada etapa en las mediciones de rendimiento: nombre y
+    # contadores de su resultado, de los que se calcula el ritmo por segundo
+    MEASURES = {
+        'tokens': ('Léxico', lambda c, tokens: {'tokens': len(tokens)}),
+        'syntax': ('Sintáctico', lambda c, syntax: {'tokens': len(c.tokens)}),
+        'semantics': ('Semántico', lambda c, semantics: {'símbolos': len(semantics[0])}),
+        'intermediate': ('Código intermedio', lambda c, code: {'instrucciones': len(code)}),
+        'optimized': ('Optimización', lambda c, optimized: {'instrucciones': len(optimized[0])}),
+        'bytecode': ('Bytecode', lambda c, bytecode: {'instrucciones': len(bytecode)}),
+        'python': ('Traducción a Python', lambda c, program: {}),
+    }
+
+    def __init__(self, text, key=None):
+        self.text = text
+        self.key = key or content_hash(text)
+        self._stages = {}
+
+    def stage(self, name):
+        if name in self._stages:
+            return self._stages[name]
+        # Las etapas previas se calculan antes para que la medición de esta
+        # cuente solo su propio tiempo
+        for dependency in self.DEPENDS[name]:
+            self.stage(dependency)
+        label, counters = self.MEASURES[name]
+        with METRICS.measure(label) as timer:
+            value = self._stages[name] = self.STAGES[name](self)
+            for counter, amount in counters(self, value).items():
+                timer.count(counter, amount)
+        return value
+
+    def has(self, name):
+        return name in self._stages
+
+    def invalidate(self, name):
+        '''Descarta una etapa y todas las que dependen de ella'''
+        self._stages.pop(name, None)
+        for other, inputs in self.DEPENDS.items():
+            if name in inputs and other in self._stages:
+                self.invalidate(other)
+
+    @property
+    def tokens(self):
+        return self.stage('tokens')
+
+    @property
+    def syntax(self):
+        '''(ast, errores) del parser'''
+        return self.stage('syntax')
+
+    @property
+    def ast(self):
+        return self.syntax[0]
+
+    @property
+    def semantics(self):
+        '''(tabla de símbolos, errores, AST comprobado) del análisis semántico'''
+        return self.stage('semantics')
+
+    @property
+    def errors(self):
+        '''Errores sintácticos y semánticos del programa'''
+        errors = self.syntax[1]
+        if self.ast is not None:
+            errors = errors + self.semantics[1]
+        return errors
+
+    def checked_ast(self):
+        '''AST comprobado, listo para generar código; CompilationError si hay errores'''
+        if self.ast is None or self.errors:
+            raise CompilationError(f"el programa tiene {len(self.errors) or 1} errores sintácticos o semánticos")
+        return self.semantics[2]
+
+    @property
+    def intermediate(self):
+        return self.stage('intermediate')
+
+    @property
+    def optimized(self):
+        '''(código optimizado, OptimizationStats)'''
+        return self.stage('optimized')
+
+    @property
+    def bytecode(self):
+        '''Código optimizado ensamblado para la máquina virtual'''
+        return self.stage('bytecode')
+
+    @property
+    def python(self):
+        '''Programa traducido a Python (codigo_python.PythonProgram)'''
+        return self.stage('python')
+
+
+class CompilationCache:
+    '''Compilaciones recientes indexadas por el hash del contenido (LRU)'''
+
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def get(self, text):
+        key = content_hash(text)
+        compilation = self._items.get(key)
+        if compilation is None:
+            compilation = self._items[key] = Compilation(text, key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(key)
+        return compilation
+
+
+# Fases que el compilador puede ejecutar en segundo plano: cada una recibe
+# una Compilation (y los argumentos extra del trabajo) y devuelve lo que
+# muestra el panel correspondiente
+PHASES = {
+    'lexico': lambda c: c.tokens,
+    'sintactico': lambda c: c.syntax,
+    'semantico': lambda c: c.semantics,
+    'hash': lambda c: c.semantics[0],
+    'intermedio': lambda c: c.intermediate,
+    'optimizado': lambda c: c.optimized,
+    # Perfil de cProfile y tracemalloc de una fase sobre una compilación nueva,
+    # para que se calculen todas sus etapas en lugar de salir del caché
+    'perfil': lambda c, phase='optimizado': capture(
+        f"la fase {phase}", PHASES[phase], Compilation(c.text, c.key)),
+}
+
+
+class CompilationJob:
+    def __init__(self, revision, phase, text, args=()):
+        self.revision = revision
+        self.phase = phase
+        self.text = text
+        self.args = args
+
+
+class CompilationWorker:
+    '''Ejecuta las fases del compilador en un hilo aparte.
+
+    Cada trabajo queda marcado con la revisión del texto vigente al enviarlo.
+    cancel() avanza la revisión (por ejemplo, cuando el texto del editor
+    cambia) y los trabajos de revisiones anteriores se descartan sin
+    ejecutarse o, si ya estaban en curso, sin entregar su resultado.
+    Los resultados se leen desde el hilo de Tk con poll(). Las fases de un
+    mismo texto comparten su Compilation, así que pedir "Semántico" después
+    de "Léxico" reutiliza los tokens ya calculados.
+    '''
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._revision = 0
+        self._cache = CompilationCache()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, phase, text, *args):
+        '''Encola una fase para el texto dado; args se pasan a la fase'''
+        self._jobs.put(CompilationJob(self._revision, phase, text, args))
+
+    def cancel(self):
+        '''Descarta los trabajos pendientes y en curso'''
+        self._revision += 1
+
+    def stop(self):
+        self.cancel()
+        self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if job.revision != self._revision:
+                continue
+            try:
+                result, error = PHASES[job.phase](self._cache.get(job.text), *job.args), None
+            except Exception as e:
+                result, error = None, e
+            if job.revision == self._revision:
+                self._results.put((job, result, error))
+
+    def poll(self):
+        '''Devuelve los resultados vigentes como (fase, texto, resultado, error)'''
+        results = []
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if job.revision == self._revision:
+                results.append((job.phase, job.text, result, error))
+        return results
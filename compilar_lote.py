@@ -0,0 +1,134 @@
+'''Compilador por lotes sin interfaz gráfica.
+
+Ejecuta las fases léxica, sintáctica, semántica y de código intermedio sobre
+muchos archivos, repartidos en un pool de procesos, y escribe un resultado
+JSON por línea con los tiempos de cada fase.
+
+Uso: python compilar_lote.py pruebas/ "otros/**/*.txt" -j 8 -o resultados.jsonl
+'''
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+# Importar las fases antes de crear el pool para que los procesos hijos
+# hereden el lexer y las tablas del parser ya construidos
+from compilacion import PHASES, Compilation, CompilationError
+import arbol
+
+
+def _summary(phase, result):
+    '''Resumen serializable del resultado de una fase'''
+    if phase == 'lexico':
+        return {'tokens': len(result), 'errores': result.count('ERROR')}
+    if phase == 'sintactico':
+        ast, errors = result
+        nodes = sum(1 for _ in arbol.walk(ast)) if ast is not None else 0
+        return {'nodos': nodes, 'errores': errors}
+    if phase == 'semantico':
+        table, errors, ast = result
+        return {'simbolos': len(table), 'errores': errors}
+    if phase == 'intermedio':
+        return {'cuadruplos': len(result), 'temporales': result.num_temps}
+    if phase == 'optimizado':
+        code, stats = result
+        return stats.as_dict()
+    return {}
+
+
+def compile_file(path):
+    '''Compila un archivo y devuelve su registro de resultados'''
+    record = {'archivo': path, 'ok': True, 'fases': {}}
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        record['ok'] = False
+        record['error'] = str(e)
+        return record
+
+    # Una sola compilación por archivo: las fases reutilizan los tokens
+    compilation = Compilation(text)
+    for phase, run in PHASES.items():
+        if phase in ('hash', 'perfil'):
+            # La tabla de símbolos ya se resume en la fase semántica; el
+            # perfil vuelve a compilar todo solo para medirlo
+            continue
+        info = {}
+        # Las fases imprimen sus errores: capturarlos en el registro
+        output = io.StringIO()
+        phase_start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = run(compilation)
+            info.update(_summary(phase, result))
+        except CompilationError:
+            # Los errores del programa ya quedan en las fases anteriores:
+            # no es una falla del compilador
+            info['omitida'] = "el programa tiene errores que impiden la fase"
+        except Exception as e:
+            record['ok'] = False
+            info['error'] = f"{type(e).__name__}: {e}"
+        info['ms'] = round((time.perf_counter() - phase_start) * 1000, 3)
+        if output.getvalue():
+            info['salida'] = output.getvalue().splitlines()
+        record['fases'][phase] = info
+
+    record['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def expand_inputs(inputs, pattern):
+    '''Convierte directorios, patrones glob y archivos en una lista de rutas'''
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, '**', pattern), recursive=True)))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+    return [path for path in paths if not os.path.isdir(path)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compilador por lotes (salida JSON Lines)")
+    parser.add_argument('entradas', nargs='+', help="archivos, directorios o patrones glob")
+    parser.add_argument('-p', '--patron', default='*.txt',
+                        help="patrón de archivos al recorrer directorios (por defecto *.txt)")
+    parser.add_argument('-j', '--procesos', type=int, default=os.cpu_count() or 1,
+                        help="número de procesos (1 = sin pool)")
+    parser.add_argument('-o', '--salida', help="archivo .jsonl de resultados (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.entradas, args.patron)
+    out = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    failures = 0
+    try:
+        if args.procesos > 1 and len(paths) > 1:
+            with multiprocessing.Pool(args.procesos) as pool:
+                records = pool.imap_unordered(compile_file, paths, chunksize=8)
+                for record in records:
+                    failures += not record['ok']
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            for path in paths:
+                record = compile_file(path)
+                failures += not record['ok']
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"{len(paths)} archivos compilados, {failures} con fallos", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+'''Registro de las ediciones del editor.
+
+CustomText anota en un EditJournal cada insert, delete y replace como la
+línea donde empezó y cuántas líneas agregó (o quitó, si es negativo). En
+lugar de avisar en cada llamada, el registro junta las ediciones de una
+vuelta del ciclo de eventos y, cuando Tk queda libre (after_idle), llama
+una sola vez a cada suscriptor con un EditBatch. Pegar un archivo o
+cargarlo por programa produce un solo aviso. Quien necesita el estado al
+día antes de esa vuelta (el resaltado, antes de leer el texto) llama a
+flush().
+
+Los rangos son de líneas y no de caracteres: en Tk, convertir un índice en
+desplazamiento desde el inicio recorre todo el texto hasta ese punto, y
+los suscriptores (resaltado, números de línea, compilador) trabajan por
+línea.
+'''
+from rendimiento import METRICS
+
+
+def shift_range(first, last, line, delta):
+    '''Rango first..last en la numeración que queda después de una edición en line.
+
+    Igual que en el texto, las líneas posteriores a line se desplazan delta
+    líneas y las que la edición borró quedan en line.
+    '''
+    if first > line:
+        first = max(first + delta, line)
+    if last > line:
+        last = max(last + delta, line)
+    return first, last
+
+
+def merge_ranges(ranges):
+    '''Une los rangos que se tocan o se solapan; devuelve una lista ordenada'''
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+class EditBatch:
+    '''Ediciones de una vuelta del ciclo de eventos.
+
+    edits son los pares (línea, delta) en el orden en que ocurrieron, para
+    quien guarda estado por línea y tiene que desplazarlo igual que el
+    texto. ranges son las líneas modificadas, ya combinadas y en la
+    numeración final. reset indica que el texto cambió de una forma que no
+    se describe con ediciones (deshacer, rehacer): edits está vacío y
+    ranges cubre todo el texto.
+    '''
+
+    __slots__ = ('edits', 'ranges', 'reset')
+
+    def __init__(self, edits, ranges, reset=False):
+        self.edits = edits
+        self.ranges = ranges
+        self.reset = reset
+
+    @property
+    def delta(self):
+        '''Cambio total en el número de líneas'''
+        return sum(delta for line, delta in self.edits)
+
+
+class EditJournal:
+    '''Ediciones pendientes de avisar y suscriptores que las reciben.
+
+    revision aumenta con cada edición registrada, aunque todavía no se haya
+    avisado.
+    '''
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.revision = 0
+        self._subscribers = []
+        self._edits = []
+        self._ranges = []
+        self._reset = False
+        self._idle_id = None
+
+    def subscribe(self, callback):
+        '''callback(EditBatch) se llama una vez por vuelta con ediciones'''
+        self._subscribers.append(callback)
+
+    def record(self, line, delta):
+        '''Una edición que empezó en line y cambió en delta el número de líneas'''
+        last = line + max(delta, 0)
+        edits = self._edits
+        if delta == 0 and edits:
+            previous, previous_delta = edits[-1]
+            if previous <= line <= previous + max(previous_delta, 0):
+                # Escribir dentro de lo que abarca la edición anterior no
+                # desplaza nada ni agrega líneas modificadas
+                self.revision += 1
+                return
+        if not self._reset:
+            edits.append((line, delta))
+        ranges = [shift_range(first, end, line, delta) for first, end in self._ranges]
+        ranges.append((line, last))
+        self._ranges = merge_ranges(ranges)
+        self.revision += 1
+        self._schedule()
+
+    def record_all(self, lines):
+        '''El texto de lines líneas cambió de una forma que no se puede describir'''
+        self._edits = []
+        self._ranges = [(1, lines)]
+        self._reset = True
+        self.revision += 1
+        self._schedule()
+
+    def _schedule(self):
+        if self._idle_id is None:
+            self._idle_id = self.widget.after_idle(self._on_idle)
+
+    def _on_idle(self):
+        self._idle_id = None
+        self.flush()
+
+    def flush(self):
+        '''Avisa ya a los suscriptores de las ediciones pendientes'''
+        if self._idle_id is not None:
+            self.widget.after_cancel(self._idle_id)
+            self._idle_id = None
+        if not self._ranges:
+            return
+        batch = EditBatch(self._edits, self._ranges, self._reset)
+        self._edits, self._ranges, self._reset = [], [], False
+        with METRICS.measure("Avisos de edición") as timer:
+            timer.count('ediciones', len(batch.edits) or 1)
+            for callback in self._subscribers:
+                callback(batch)
@@ -0,0 +1,301 @@
+'''Ejecución de programas en un proceso aparte.
+
+La interfaz no puede esperar a que el programa termine ni a que cin reciba
+datos, así que ProgramProcess lanza este mismo módulo como proceso hijo
+(python ejecucion.py --backend vm archivo) y se comunica con él por
+tuberías:
+
+- stdin del hijo recibe los datos de cin a medida que se escriben en la
+  consola.
+- stdout del hijo trae lo que escribe cout, una línea por valor. El hijo
+  lo envía por tandas y vacía su búfer antes de esperar datos de cin.
+- stderr del hijo trae mensajes de control (líneas que empiezan con
+  CONTROL) y cualquier otro error.
+
+Hilos lectores guardan las líneas de salida en un búfer circular de
+max_lines líneas y la interfaz las recoge con drain() cuando le conviene:
+un programa que escribe millones de líneas no llena la memoria ni bloquea
+la interfaz, solo se conservan las últimas y se cuentan las descartadas.
+'''
+import argparse
+import collections
+import contextlib
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+CONTROL = '\x00'
+# Mensajes de control del hijo
+WAITING = 'cin'    # va a esperar datos de cin
+RUNNING = 'run'    # recibió los datos y sigue
+FINISHED = 'fin'   # terminó; el texto es el resumen de la ejecución
+FAILED = 'error'   # el texto es el error que hay que mostrar
+
+
+def _control(kind, text=''):
+    sys.stderr.write(f"{CONTROL}{kind} {text}\n")
+    sys.stderr.flush()
+
+
+class _ChildIO:
+    '''read() y write() del programa dentro del proceso hijo.
+
+    write() solo agrega la línea a una deque; un hilo la envía por stdout
+    cada FLUSH_SECONDS, de modo que cout no hace una llamada al sistema
+    por valor y la salida sigue llegando aunque el programa deje de
+    escribir durante un rato.
+    '''
+
+    FLUSH_SECONDS = 0.05
+
+    def __init__(self):
+        self._stdin = sys.stdin.buffer
+        self._stdout = sys.stdout.buffer
+        self._tokens = collections.deque()
+        self._pending = collections.deque()
+        self._flush_lock = threading.Lock()
+        self._done = threading.Event()
+        # Segundos que el programa pasó esperando datos de cin
+        self.waited = 0.0
+        self.write = self._pending.append
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._done.wait(self.FLUSH_SECONDS):
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            pending = self._pending
+            lines = []
+            while pending:
+                lines.append(pending.popleft())
+            if lines:
+                self._stdout.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self._stdout.flush()
+
+    def read(self):
+        tokens = self._tokens
+        while not tokens:
+            self.flush()
+            _control(WAITING)
+            start = time.perf_counter()
+            line = self._stdin.readline()
+            self.waited += time.perf_counter() - start
+            _control(RUNNING)
+            if not line:
+                return None
+            tokens.extend(line.decode('utf-8', 'replace').split())
+        return tokens.popleft()
+
+    def close(self):
+        self._done.set()
+        self._flusher.join()
+        self.flush()
+
+
+def run_child(text, backend):
+    '''Compila y ejecuta text dentro del proceso hijo; devuelve el código de salida'''
+    from compilacion import Compilation, CompilationError
+    from maquina import ExecutionError, ExecutionResult, VirtualMachine
+    from codigo_python import run_python
+
+    compilation = Compilation(text)
+    try:
+        # Lo que impriman las fases no debe mezclarse con la salida de cout
+        with contextlib.redirect_stdout(sys.stderr):
+            program = compilation.python if backend == 'python' else compilation.bytecode
+    except (CompilationError, ExecutionError) as e:
+        for error in compilation.errors:
+            print(error, file=sys.stderr)
+        _control(FAILED, f"No se pudo ejecutar: {e}")
+        return 1
+
+    io = _ChildIO()
+    steps = error = None
+    if backend == 'python':
+        seconds, error = run_python(program, io.read, io.write)
+    else:
+        vm = VirtualMachine(program, io.read, io.write)
+        try:
+            vm.run()
+        except ExecutionError as e:
+            error = e
+        steps, seconds = vm.steps, vm.seconds
+    io.close()
+    if error is not None:
+        _control(FAILED, f"Error de ejecución: {error}")
+    _control(FINISHED, ExecutionResult([], 0, steps, seconds - io.waited).summary())
+    return 1 if error is not None else 0
+
+
+class ProgramProcess:
+    '''Un programa en ejecución en un proceso hijo.
+
+    Los métodos se llaman desde un solo hilo (el de Tk); los hilos lectores
+    solo tocan el búfer de salida y el estado de control, protegidos con un
+    candado. timeout limita los segundos de cómputo: el tiempo que el
+    programa pasa esperando datos de cin no cuenta. Se aplica en drain().
+    '''
+
+    def __init__(self, text, backend='vm', input_text='', timeout=None, max_lines=5000):
+        fd, self._path = tempfile.mkstemp(suffix='.txt', prefix='programa-')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+        self.timeout = timeout
+        self.timed_out = False
+        self.killed = False
+        self.waiting_input = False
+        self.summary = None
+        # Líneas que escribió el programa, incluidas las descartadas
+        self.lines = 0
+        self._lock = threading.Lock()
+        self._lines = collections.deque(maxlen=max_lines)
+        self._dropped = 0
+        self._errors = []
+        self._elapsed = 0.0
+        self._resumed = time.monotonic()
+        self._input = queue.Queue()
+
+        module = os.path.abspath(__file__)
+        self.process = subprocess.Popen(
+            [sys.executable, module, '--backend', backend, self._path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=os.path.dirname(module))
+        self._readers = [threading.Thread(target=self._read_output, daemon=True),
+                         threading.Thread(target=self._read_control, daemon=True)]
+        for thread in self._readers:
+            thread.start()
+        threading.Thread(target=self._write_input, daemon=True).start()
+        if input_text:
+            self.send(input_text + '\n')
+
+    # Hilos de las tuberías
+    def _read_output(self):
+        stream = self.process.stdout
+        partial = b''
+        while True:
+            chunk = stream.read1(65536)
+            if not chunk:
+                break
+            lines = (partial + chunk).split(b'\n')
+            partial = lines.pop()
+            with self._lock:
+                overflow = len(self._lines) + len(lines) - self._lines.maxlen
+                if overflow > 0:
+                    self._dropped += overflow
+                self._lines.extend(lines)
+                self.lines += len(lines)
+        if partial:
+            with self._lock:
+                self._lines.append(partial)
+                self.lines += 1
+
+    def _read_control(self):
+        for raw in self.process.stderr:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if not line.startswith(CONTROL):
+                with self._lock:
+                    self._errors.append(line)
+                continue
+            kind, _, text = line[1:].partition(' ')
+            now = time.monotonic()
+            with self._lock:
+                if kind == WAITING:
+                    self._elapsed += now - self._resumed
+                    self.waiting_input = True
+                elif kind == RUNNING:
+                    self._resumed = now
+                    self.waiting_input = False
+                elif kind == FAILED:
+                    self._errors.append(text)
+                elif kind == FINISHED:
+                    self.summary = text
+
+    def _write_input(self):
+        stdin = self.process.stdin
+        while True:
+            data = self._input.get()
+            try:
+                if data is None:
+                    stdin.close()
+                    break
+                stdin.write(data)
+                stdin.flush()
+            except (OSError, ValueError):
+                # El programa ya terminó o cerró su entrada
+                break
+
+    # Control desde la interfaz
+    def send(self, text):
+        '''Agrega text a la entrada de cin sin esperar a que el programa lo lea'''
+        self._input.put(text.encode('utf-8'))
+
+    def close_input(self):
+        '''Fin de la entrada: el siguiente cin sin datos termina en error'''
+        self._input.put(None)
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.killed = True
+            self.process.kill()
+
+    @property
+    def elapsed(self):
+        '''Segundos de cómputo, sin contar la espera de datos de cin'''
+        with self._lock:
+            if self.waiting_input:
+                return self._elapsed
+            return self._elapsed + time.monotonic() - self._resumed
+
+    @property
+    def finished(self):
+        '''El proceso terminó y ya se leyó toda su salida'''
+        return self.process.poll() is not None and not any(t.is_alive() for t in self._readers)
+
+    @property
+    def returncode(self):
+        return self.process.returncode
+
+    def drain(self):
+        '''(texto, líneas descartadas, errores) acumulados desde la última llamada'''
+        if self.timeout is not None and not self.timed_out and self.elapsed > self.timeout:
+            if self.process.poll() is None:
+                self.timed_out = True
+                self.kill()
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+            errors, self._errors = self._errors, []
+        text = (b'\n'.join(lines) + b'\n').decode('utf-8', 'replace') if lines else ''
+        return text, dropped, errors
+
+    def close(self):
+        '''Detiene el programa si sigue corriendo y borra el archivo temporal'''
+        self.kill()
+        self.close_input()
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta un programa leyendo cin de stdin")
+    parser.add_argument('archivo', help="programa fuente")
+    parser.add_argument('--backend', choices=('vm', 'python'), default='vm',
+                        help="máquina virtual o código Python (por defecto vm)")
+    args = parser.parse_args(argv)
+    with open(args.archivo, encoding='utf-8', newline='') as file:
+        text = file.read()
+    return run_child(text, args.backend)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,43 @@
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from lexico import test_lexer
-from sintactico import test_parser
-from semantico import test_semantics
-from codigo_intermedio import test_intermediate_code
+import arbol
+from compilacion import CompilationWorker
+from ejecucion import ProgramProcess
+from tabla_tokens import TokenTable
+from ediciones import EditJournal
+from rendimiento import METRICS, format_rate
 from tkinter import PhotoImage
-from pygments import lex
-from pygments.lexers import get_lexer_by_name
-from pygments.token import Token
-from pygments.style import Style
-from pygments.util import ClassNotFound
-import re
+from resaltado import HIGHLIGHT_TAGS, ends_in_comment, lex_region
 tk._default_root = None
 
+# Consola de ejecución: líneas que conserva y segundos de cómputo permitidos
+CONSOLE_LINES = 5000
+EXECUTION_TIMEOUT = 10.0
+# Columnas de la pestaña Rendimiento
+METRIC_COLUMNS = ("Medición", "Veces", "Total (ms)", "Media (ms)", "Máx (ms)", "Última (ms)", "Ritmo")
 
-# Palabras reservadas (deben coincidir con las definidas en lexico.py)
-reserved = {
-    'if': 'IF', 'else': 'ELSE', 'end': 'END', 'do': 'DO', 'while': 'WHILE', 'switch': 'SWITCH',
-    'case': 'CASE', 'int': 'INT', 'float': 'FLOAT', 'main': 'MAIN', 'cin': 'CIN', 'cout': 'COUT'
-}
 
 class TextLineNumbers(tk.Canvas):
+    '''Números de línea del editor.
+
+    Hay un elemento de texto del canvas por fila visible y se reutilizan:
+    cuando la vista se mueve solo cambian su texto y su posición, y si la
+    vista no se movió no se hace nada (escribir o pegar dentro de la región
+    visible no cambia qué número va en cada fila). Las peticiones de
+    redibujo se agrupan: como mucho un redibujo cada FRAME_MS.
+    '''
+
+    FRAME_MS = 16
+
     def __init__(self, *args, **kwargs):
         tk.Canvas.__init__(self, *args, **kwargs)
         self.textwidget = None
+        # Elementos del canvas y (línea, y) que muestra cada uno (None = oculto)
+        self._items = []
+        self._shown = []
+        self._view = None
+        self._pending = None
         self.bind("<Configure>", self._on_configure)
 
     def attach(self, text_widget):
@@ -35,46 +49,95 @@ class TextLineNumbers(tk.Canvas):
         self.textwidget.bind("<Button-5>", self._on_mousewheel)  # Para Linux
 
     def _on_configure(self, event=None):
-        self.redraw()
+        self.schedule_redraw()
 
     def _on_mousewheel(self, event):
-        # Programar redibujo después de un pequeño retraso para que el scroll tenga efecto
-        self.after(10, self.redraw)
+        # El desplazamiento ocurre después de este evento: el redibujo programado lo alcanza
+        self.schedule_redraw()
         return None  # Permitir que el evento continúe
 
+    def schedule_redraw(self, *args):
+        '''Pide un redibujo; las peticiones dentro de un mismo cuadro se atienden con uno solo'''
+        if self._pending is None:
+            self._pending = self.after(self.FRAME_MS, self._redraw_pending)
+
+    def _redraw_pending(self):
+        self._pending = None
+        self.redraw()
+
+    def _visible_rows(self):
+        '''(clave de la vista, [(línea, y)]) de las líneas visibles'''
+        text = self.textwidget
+        first = int(text.index("@0,0").split('.')[0])
+        last = int(text.index("@0,%d" % text.winfo_height()).split('.')[0]) + 1
+        last = min(last, int(text.index("end-1c").split('.')[0]))
+        dline = text.dlineinfo(f"{first}.0")
+        if dline is None:
+            return None, []
+        if text.cget("wrap") == tk.NONE:
+            # Sin ajuste de línea todas las filas miden lo mismo: basta la
+            # primera para ubicar las demás y la vista queda determinada por ella
+            y, height = dline[1], dline[3]
+            view = (first, last, y, height)
+            return view, [(line, y + (line - first) * height) for line in range(first, last + 1)]
+        rows = []
+        for line in range(first, last + 1):
+            dline = text.dlineinfo(f"{line}.0")
+            if dline is not None:
+                rows.append((line, dline[1]))
+        return tuple(rows), rows
+
     def redraw(self, *args):
-        '''Redibuja los números de línea para el texto visible'''
-        self.delete("all")
-        
+        '''Ubica los números de las líneas visibles, reutilizando los elementos del canvas'''
         if not self.textwidget:
             return
-            
-        # Obtener información sobre el texto visible
-        first_visible_line = int(self.textwidget.index("@0,0").split('.')[0])
-        last_visible_line = int(self.textwidget.index("@0,%d" % self.textwidget.winfo_height()).split('.')[0])
-        
-        # Ajustar para asegurarnos de cubrir todo el área visible
-        last_visible_line += 1
-        
-        # Dibujar solo las líneas visibles
-        for i in range(first_visible_line, last_visible_line + 1):
-            # Obtener posición y de la línea
-            dline = self.textwidget.dlineinfo(f"{i}.0")
-            if dline is None:  # Si la línea no existe
+        started = time.perf_counter()
+        view, rows = self._visible_rows()
+        if view is not None and view == self._view:
+            return
+        self._view = view
+
+        items, shown = self._items, self._shown
+        while len(items) < len(rows):
+            # Usar la misma fuente que el editor
+            items.append(self.create_text(2, 0, anchor="nw", text="", fill="#555", font=("Consolas", 10)))
+            shown.append(None)
+        changed = 0
+        for position, row in enumerate(rows):
+            previous = shown[position]
+            if previous == row:
                 continue
-            y = dline[1]
-            # Dibujar el número de línea
-            self.create_text(
-                2, y, 
-                anchor="nw", 
-                text=str(i), 
-                fill="#555",
-                font=("Consolas", 10)  # Usar la misma fuente que el editor
-            )
+            item = items[position]
+            if previous is None:
+                self.itemconfigure(item, text=str(row[0]), state=tk.NORMAL)
+            elif previous[0] != row[0]:
+                self.itemconfigure(item, text=str(row[0]))
+            if previous is None or previous[1] != row[1]:
+                self.coords(item, 2, row[1])
+            shown[position] = row
+            changed += 1
+        for position in range(len(rows), len(items)):
+            if shown[position] is not None:
+                self.itemconfigure(items[position], state=tk.HIDDEN)
+                shown[position] = None
+        METRICS.add("Números de línea", time.perf_counter() - started, {'líneas': changed})
 
 class CustomText(tk.Text):
+    # Resaltado diferido: a partir de cuántas líneas se resalta primero la
+    # región visible y cuántas líneas procesa cada bloque en segundo plano
+    lazy_threshold = 5000
+    chunk_lines = 500
+    chunk_delay = 1
+
     def __init__(self, *args, **kwargs):
         tk.Text.__init__(self, *args, **kwargs)
+
+        # Estado del resaltado incremental
+        self._line_states = []
+        self._dirty = None
+        self._fill_line = None
+        self._fill_id = None
+
         self._orig = self._w + "_orig"
         self.tk.call("rename", self._w, self._orig)
         self.tk.createcommand(self._w, self._proxy)
@@ -104,162 +167,232 @@ class CustomText(tk.Text):
         self.tag_config("ASSIGN", foreground="darkgreen")
         self.tag_config("ERROR", foreground="red", underline=True)
 
-        # Configurar eventos
-        self.bind("<<Modified>>", self._on_modified)
+        # Las ediciones se avisan una vez por vuelta del ciclo de eventos
+        self.journal = EditJournal(self)
+        self.journal.subscribe(self._on_edits)
         self.after_id = None
 
     def _proxy(self, *args):
+        edit = args[0] in ("insert", "replace", "delete")
+        if edit:
+            # Línea donde empieza la edición y número de líneas antes de aplicarla
+            before = self._line_count()
+            line = min(int(self.tk.call(self._orig, "index", args[1]).split('.')[0]), before)
+
         cmd = (self._orig,) + args
         result = self.tk.call(cmd)
-        
-        if args[0] in ("insert", "replace", "delete"):
-            self.event_generate("<<TextModified>>")
+
+        if edit:
+            self.journal.record(line, self._line_count() - before)
+        elif args[0] == "edit" and args[1:2] in (("undo",), ("redo",)):
+            # Deshacer/rehacer no pasan por insert/delete: re-tokenizar todo
+            self.journal.record_all(self._line_count())
         return result
-        
-    def _on_modified(self, event=None):
+
+    def _line_count(self):
+        return int(self.tk.call(self._orig, "index", "end-1c").split('.')[0])
+
+    def _mark_dirty(self, line, delta):
+        """Registra las líneas modificadas y desplaza el estado de las siguientes"""
+        # _line_states[i] es el estado del lexer al final de la línea i+1;
+        # el final de la línea editada pasa a ser el final de la línea line+delta
+        if delta > 0:
+            self._line_states[line - 1:line - 1] = [None] * delta
+        elif delta < 0:
+            del self._line_states[line - 1:line - 1 - delta]
+
+        # El relleno en segundo plano sigue a las líneas que aún no procesa
+        if self._fill_line and line < self._fill_line:
+            self._fill_line = max(self._fill_line + delta, line)
+
+        last = line + max(delta, 0)
+        if self._dirty:
+            first_dirty, last_dirty = self._dirty
+            if last_dirty > line:
+                last_dirty = max(last_dirty + delta, line)
+            self._dirty = (min(first_dirty, line), max(last_dirty, last))
+        else:
+            self._dirty = (line, last)
+
+    def _on_edits(self, batch):
+        """Desplaza el estado del resaltado según las ediciones y programa el re-resaltado"""
+        if batch.reset:
+            self._line_states = []
+            self._dirty = (1, self._line_count())
+        else:
+            for line, delta in batch.edits:
+                self._mark_dirty(line, delta)
         if self.after_id:
             self.after_cancel(self.after_id)
-        self.tk.call(self._orig, "edit", "modified", 0)
-        self.after_id = self.after(300, self.highlight_syntax)
+        self.after_id = self.after(300, self.highlight_dirty)
+
+    def _visible_lines(self):
+        """Primera y última línea visibles en el editor"""
+        first = int(self.index("@0,0").split('.')[0])
+        last = int(self.index("@0,%d" % self.winfo_height()).split('.')[0]) + 1
+        # Antes de mostrarse el widget mide 1px: usar la altura configurada
+        return first, max(last, first + int(self.cget("height")))
+
+    def _sync_line_states(self, last):
+        states = self._line_states
+        if len(states) < last:
+            states.extend([None] * (last - len(states)))
+        else:
+            del states[last:]
+        return states
+
+    def _apply_spans(self, ranges, first, stop):
+        """Reemplaza las etiquetas de las líneas first..stop con una llamada por etiqueta"""
+        for tag, indices in ranges.items():
+            self.tag_remove(tag, f"{first}.0", f"{stop}.end")
+            if indices:
+                self.tag_add(tag, *indices)
 
     def highlight_syntax(self):
-        """Resalta la sintaxis del texto en el editor"""
+        """Resalta la sintaxis de todo el texto del editor.
+
+        Con más de lazy_threshold líneas resalta primero la región visible y
+        completa el resto en segundo plano, en bloques de chunk_lines líneas
+        programados con after() para no bloquear el ciclo de eventos.
+        """
+        self.journal.flush()
+        if self._fill_id:
+            self.after_cancel(self._fill_id)
+            self._fill_id = None
+        self._fill_line = None
+        self._line_states = []
+        last = self._line_count()
+
+        if last <= self.lazy_threshold:
+            self._dirty = (1, last)
+            self.highlight_dirty()
+            return
+
+        first_visible, last_visible = self._visible_lines()
+        self._fill_line = 1
+        self._dirty = (first_visible, min(last_visible, last))
+        self.highlight_dirty()
+        self._fill_id = self.after(self.chunk_delay, self._fill_step)
+
+    def _fill_step(self):
+        """Resalta en segundo plano el siguiente bloque de líneas"""
+        # Las ediciones aún no avisadas desplazan las líneas por procesar
+        self.journal.flush()
+        self._fill_id = None
+        if not self._fill_line:
+            return
+        started = time.perf_counter()
         try:
-            # Limpiar todos los tags existentes primero
-            for tag in self.tag_names():
-                self.tag_remove(tag, "1.0", tk.END)
-            
-            # Obtener el texto completo
-            text = self.get("1.0", tk.END)
-            if not text.strip():
-                return
+            last = self._line_count()
+            start = min(self._fill_line, last)
+            end = min(start + self.chunk_lines - 1, last)
+            states = self._sync_line_states(last)
+            in_comment = bool(states[start - 2]) if start > 1 else False
+
+            text = self.get(f"{start}.0", f"{end}.end")
+            spans, line_states = lex_region(text, in_comment)
+            states[start - 1:end] = line_states
+
+            ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+            for tag, offset, col_start, col_end in spans:
+                ranges[tag].extend((f"{start + offset}.{col_start}", f"{start + offset}.{col_end}"))
+            self._apply_spans(ranges, start, end)
+            METRICS.add("Resaltado en segundo plano", time.perf_counter() - started,
+                        {'líneas': end - start + 1, 'etiquetas': len(spans)})
+
+            if end >= last:
+                self._fill_line = None
+            else:
+                self._fill_line = end + 1
+                self._fill_id = self.after(self.chunk_delay, self._fill_step)
 
-            # Primero procesar comentarios (para que tengan prioridad sobre operadores)
-            self._highlight_comments(text)
-            
-            # Luego procesar palabras reservadas exactas
-            for word in reserved:
-                start = "1.0"
-                while True:
-                    # Buscar usando regex para coincidencia exacta de palabra
-                    start = self.search(rf'\m{word}\M', start, stopindex=tk.END, regexp=True)
-                    if not start:
+        except Exception as e:
+            print(f"Error en el resaltado en segundo plano: {e}")
+            self._fill_line = None
+
+    def highlight_dirty(self):
+        """Re-tokeniza solo las líneas modificadas desde el último resaltado.
+
+        Tokeniza de una sola pasada las líneas sucias y, si el estado al final
+        de la última (dentro o fuera de un comentario /* */) no coincide con el
+        de la pasada anterior, continúa con bloques cada vez mayores hasta la
+        primera línea donde converge. Las etiquetas se aplican al final con
+        una llamada a tag_add por etiqueta. Mientras el relleno en segundo
+        plano está activo, las líneas que aún no alcanza quedan a su cargo.
+        """
+        self.journal.flush()
+        if self.after_id:
+            self.after_cancel(self.after_id)
+        self.after_id = None
+        if not self._dirty:
+            return
+        first, last_dirty = self._dirty
+        if last_dirty - first > self.lazy_threshold:
+            # Ediciones enormes (pegar un archivo completo): modo diferido
+            self.highlight_syntax()
+            return
+        self._dirty = None
+        started = time.perf_counter()
+        try:
+            last = self._line_count()
+            first = min(first, last)
+            last_dirty = min(max(last_dirty, first), last)
+            states = self._sync_line_states(last)
+
+            limit = last
+            if self._fill_line:
+                limit = min(last, max(last_dirty, self._fill_line - 1))
+
+            if first == 1:
+                in_comment = False
+            elif states[first - 2] is None:
+                # Estado aún desconocido: buscar solo comentarios hasta aquí
+                in_comment = ends_in_comment(self.get("1.0", f"{first}.0"))
+            else:
+                in_comment = states[first - 2]
+
+            ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+            start, end = first, last_dirty
+            extra = 64
+            stop = None
+            while stop is None:
+                # Una sola pasada del lexer por bloque de líneas
+                text = self.get(f"{start}.0", f"{end}.end")
+                spans, line_states = lex_region(text, in_comment)
+                for offset, state in enumerate(line_states):
+                    line = start + offset
+                    previous = states[line - 1]
+                    states[line - 1] = state
+                    if line >= last_dirty and previous == state:
+                        stop = line
+                        break
+                else:
+                    if end >= limit:
+                        stop = limit
+
+                for tag, offset, col_start, col_end in spans:
+                    line = start + offset
+                    if stop is not None and line > stop:
                         break
-                    end = f"{start}+{len(word)}c"
-                    # Verificar que los índices son válidos y que no está dentro de un comentario
-                    if (self._is_valid_index(start) and self._is_valid_index(end)
-                            and "COMMENT" not in self.tag_names(start)):
-                        self.tag_add("RESERVED", start, end)
-                    start = end
+                    ranges[tag].extend((f"{line}.{col_start}", f"{line}.{col_end}"))
 
-            # Finalmente procesar otros tokens
-            self._highlight_other_tokens(text)
+                # Si el estado no converge, seguir con bloques cada vez mayores
+                in_comment = line_states[-1]
+                start, end = end + 1, min(end + extra, limit)
+                extra *= 2
+
+            self._apply_spans(ranges, first, stop)
+            METRICS.add("Resaltado", time.perf_counter() - started,
+                        {'líneas': stop - first + 1,
+                         'etiquetas': sum(len(indices) for indices in ranges.values()) // 2})
 
         except Exception as e:
             print(f"Error general en highlight_syntax: {e}")
             # Limpiar tags en caso de error
-            for tag in self.tag_names():
+            for tag in HIGHLIGHT_TAGS:
                 self.tag_remove(tag, "1.0", tk.END)
+            self._line_states = []
 
-    def _highlight_comments(self, text):
-        """Resalta los comentarios en el texto, incluyendo los multi-línea"""
-        in_block_comment = False
-        block_start = None
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines, start=1):
-            if not in_block_comment:
-                # Buscar inicio de comentario de bloque
-                block_start_pos = line.find('/*')
-                line_comment_pos = line.find('//')
-                
-                # Comentario de línea tiene prioridad si aparece antes
-                if line_comment_pos != -1 and (block_start_pos == -1 or line_comment_pos < block_start_pos):
-                    start = f"{i}.{line_comment_pos}"
-                    end = f"{i}.{len(line)}"
-                    self.tag_add("COMMENT", start, end)
-                elif block_start_pos != -1:
-                    # Encontramos inicio de comentario de bloque
-                    block_end_pos = line.find('*/', block_start_pos + 2)
-                    if block_end_pos != -1:
-                        # Comentario de bloque completo en una línea
-                        start = f"{i}.{block_start_pos}"
-                        end = f"{i}.{block_end_pos + 2}"
-                        self.tag_add("COMMENT", start, end)
-                    else:
-                        # Comentario de bloque continúa en siguientes líneas
-                        in_block_comment = True
-                        block_start = f"{i}.{block_start_pos}"
-            else:
-                # Estamos dentro de un comentario de bloque, buscar el cierre
-                block_end_pos = line.find('*/')
-                if block_end_pos != -1:
-                    # Fin del comentario de bloque
-                    end = f"{i}.{block_end_pos + 2}"
-                    self.tag_add("COMMENT", block_start, end)
-                    in_block_comment = False
-                    block_start = None
-                else:
-                    # Toda la línea es parte del comentario de bloque
-                    start = f"{i}.0"
-                    end = f"{i}.{len(line)}"
-                    self.tag_add("COMMENT", start, end)
-
-    def _highlight_other_tokens(self, text):
-        """Resalta otros tokens (operadores, números, etc.)"""
-        try:
-            # Usar lexer C++ para otros tokens
-            lexer = get_lexer_by_name("cpp", stripall=True)
-            
-            for token_type, value in lex(text, lexer):
-                # Saltar si ya es palabra reservada o comentario
-                if value in reserved or token_type in Token.Comment:
-                    continue
-                
-                # Determinar el tag apropiado
-                tag = None
-                if token_type in Token.Name:
-                    tag = "ID"
-                elif token_type in Token.Literal.Number.Integer:
-                    tag = "NUMBER"
-                elif token_type in Token.Literal.Number.Float:
-                    tag = "REAL"
-                elif token_type in Token.Operator:
-                    tag = "OPERATOR"
-                elif token_type in Token.Operator.Word:
-                    tag = "LOGICAL"
-                elif token_type in Token.Punctuation:
-                    tag = "SYMBOL"
-                
-                if not tag:
-                    continue
-
-                # Buscar todas las ocurrencias del valor
-                start = "1.0"
-                while True:
-                    start = self.search(re.escape(value), start, stopindex=tk.END, regexp=True)
-                    if not start:
-                        break
-                    end = f"{start}+{len(value)}c"
-                    
-                    # Verificar índices y que no sea parte de una palabra reservada o comentario
-                    if (self._is_valid_index(start) and self._is_valid_index(end) and 
-                        "COMMENT" not in self.tag_names(start)):
-                        self.tag_add(tag, start, end)
-                    start = end
-
-        except ClassNotFound:
-            pass
-        except Exception as e:
-            print(f"Error en el lexer: {e}")
-
-    def _is_valid_index(self, index):
-        """Verifica si un índice de texto es válido"""
-        try:
-            self.index(index)
-            return True
-        except tk.TclError:
-            return False
 class IDE:
     def __init__(self, root):
         self.root = root
@@ -267,7 +400,7 @@ class IDE:
         self.filepath = None
         
         # Inicializar todos los atributos necesarios
-        self.token_tree = None
+        self.token_table = None
         self.output_errores = None
         self.output_lexico = None
         self.output_sintactico = None
@@ -275,6 +408,15 @@ class IDE:
         self.output_intermedio = None
         self.output_ejecucion = None
         self.output_hash = None
+
+        # Compilador en segundo plano para no bloquear la interfaz
+        self.worker = CompilationWorker()
+        # Programa en ejecución (ejecucion.ProgramProcess) o None
+        self.execution = None
+        # Último perfil de compilación (rendimiento.Capture) y versión de
+        # las mediciones que muestra la pestaña Rendimiento
+        self.capture = None
+        self._metrics_version = None
         
         # Crear componentes en orden correcto
         self.create_menu()
@@ -282,6 +424,8 @@ class IDE:
         self.create_editor_and_execution()
         self.create_cursor_indicator()
         self.create_error_window()
+        self.poll_worker()
+        self.poll_rendimiento()
 
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -303,7 +447,15 @@ class IDE:
         compilemenu.add_command(label="Compilar Sintáctico", command=self.compile_sintactico)
         compilemenu.add_command(label="Compilar Semántico", command=self.compile_semantico)
         compilemenu.add_command(label="Generar Intermedio", command=self.compile_intermedio)
+        compilemenu.add_command(label="Tabla de Símbolos", command=self.compile_hash)
         compilemenu.add_command(label="Ejecutar", command=self.compile_ejecucion)
+
+        # Backend con el que se ejecuta el programa
+        self.backend = tk.StringVar(value="vm")
+        backendmenu = tk.Menu(compilemenu, tearoff=0)
+        backendmenu.add_radiobutton(label="Máquina virtual", variable=self.backend, value="vm")
+        backendmenu.add_radiobutton(label="Código Python", variable=self.backend, value="python")
+        compilemenu.add_cascade(label="Ejecutar con", menu=backendmenu)
         menubar.add_cascade(label="Compilar", menu=compilemenu)
 
         self.root.config(menu=menubar)
@@ -444,18 +596,6 @@ class IDE:
         self.editor = CustomText(self.editor_frame, wrap=tk.NONE, width=80, height=20, bg="white", fg="black", insertbackground="black")
         self.editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Barra de desplazamiento vertical
-        scrollbar = ttk.Scrollbar(self.editor_frame, orient=tk.VERTICAL, command=self.editor.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.editor.config(yscrollcommand=scrollbar.set)
-
-        # Asociar el editor con los números de línea
-        self.linenumbers.attach(self.editor)
-
-        # Configurar eventos para redibujar los números de línea
-        self.editor.bind("<<TextModified>>", self._on_change)
-        self.editor.bind("<Configure>", self._on_change)
-        
         # Frame para la ventana de ejecución
         self.execution_frame = tk.Frame(self.main_frame)
         self.execution_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -467,39 +607,9 @@ class IDE:
         self.tab_lexico = ttk.Frame(self.execution_tabs)
         self.execution_tabs.add(self.tab_lexico, text="Léxico")
         
-        # Frame contenedor para la tabla
-        token_frame = tk.Frame(self.tab_lexico)
-        token_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        self.token_tree = ttk.Treeview(
-        token_frame, 
-        columns=("Lexema", "Token", "Subtokens"), 
-        show="headings",
-        selectmode="extended"
-     )
-
-        # Configurar columnas
-        self.token_tree.column("Lexema", width=150, anchor=tk.W, stretch=tk.YES)
-        self.token_tree.column("Token", width=120, anchor=tk.W, stretch=tk.YES)
-        # self.token_tree.column("Subtokens", width=200, anchor=tk.W, stretch=tk.YES)
-
-        # Configurar encabezados
-        self.token_tree.heading("Lexema", text="LEXEMA", anchor=tk.W)
-        self.token_tree.heading("Token", text="TOKEN", anchor=tk.W)
-        # self.token_tree.heading("Subtokens", text="SUBTOKEN", anchor=tk.W)
-        
-        # Scrollbars
-        vsb = ttk.Scrollbar(token_frame, orient="vertical", command=self.token_tree.yview)
-        hsb = ttk.Scrollbar(token_frame, orient="horizontal", command=self.token_tree.xview)
-        self.token_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # Diseño con grid
-        self.token_tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-        
-        token_frame.grid_rowconfigure(0, weight=1)
-        token_frame.grid_columnconfigure(0, weight=1)
+        # Tabla virtualizada: solo dibuja las filas visibles del TokenBuffer
+        self.token_table = TokenTable(self.tab_lexico, on_activate=self.goto_token)
+        self.token_table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # ------------------------- Pestaña SINTÁCTICO -------------------------
         self.tab_sintactico = ttk.Frame(self.execution_tabs)
@@ -535,20 +645,52 @@ class IDE:
         self.tab_intermedio = ttk.Frame(self.execution_tabs)
         self.execution_tabs.add(self.tab_intermedio, text="Intermedio")
         
+        # Estadísticas del optimizador a la derecha del código intermedio
+        stats_frame = tk.Frame(self.tab_intermedio)
+        stats_frame.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.optimize_ir = tk.BooleanVar(value=True)
+        tk.Checkbutton(stats_frame, text="Optimizar", variable=self.optimize_ir,
+                       command=self.compile_intermedio).pack(anchor=tk.W)
+
+        self.output_optimizacion = tk.Text(
+            stats_frame,
+            wrap=tk.NONE,
+            width=52,
+            height=10,
+            bg="#f7f7f7",
+            fg="black",
+            font=("Consolas", 9)
+        )
+        self.output_optimizacion.pack(fill=tk.BOTH, expand=True)
+
         self.output_intermedio = tk.Text(
             self.tab_intermedio, 
-            wrap=tk.WORD, 
+            wrap=tk.NONE, 
             width=80, 
             height=10,
             bg="white",
             fg="black",
             font=("Consolas", 10)
         )
-        self.output_intermedio.pack(fill=tk.BOTH, expand=True)
+        self.output_intermedio.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # ------------------------- Pestaña EJECUCIÓN -------------------------
         self.tab_ejecucion = ttk.Frame(self.execution_tabs)
         self.execution_tabs.add(self.tab_ejecucion, text="Ejecución")
+
+        # Datos que lee cin, separados por espacios: lo escrito antes de
+        # ejecutar es la entrada inicial y cada Enter envía una línea más
+        input_frame = tk.Frame(self.tab_ejecucion)
+        input_frame.pack(fill=tk.X)
+        tk.Label(input_frame, text="Entrada (cin):").pack(side=tk.LEFT, padx=2)
+        self.input_ejecucion = tk.Entry(input_frame, font=("Consolas", 10))
+        self.input_ejecucion.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2, pady=2)
+        self.input_ejecucion.bind("<Return>", self.send_input)
+        tk.Button(input_frame, text="Fin de entrada", command=self.close_input).pack(side=tk.LEFT, padx=2)
+        tk.Button(input_frame, text="Detener", command=self.stop_ejecucion).pack(side=tk.LEFT, padx=2)
+        self.status_ejecucion = tk.Label(input_frame, text="", width=40, anchor=tk.W)
+        self.status_ejecucion.pack(side=tk.LEFT, padx=2)
         
         self.output_ejecucion = tk.Text(
             self.tab_ejecucion, 
@@ -560,6 +702,9 @@ class IDE:
             font=("Consolas", 10)
         )
         self.output_ejecucion.pack(fill=tk.BOTH, expand=True)
+        self.output_ejecucion.tag_config("entrada", foreground="blue")
+        self.output_ejecucion.tag_config("error", foreground="red")
+        self.output_ejecucion.tag_config("aviso", foreground="gray")
         
         # ------------------------- Pestaña HASH -------------------------
         self.tab_hash = ttk.Frame(self.execution_tabs)
@@ -576,6 +721,42 @@ class IDE:
         )
         self.output_hash.pack(fill=tk.BOTH, expand=True)
         
+        # ------------------------- Pestaña RENDIMIENTO -------------------------
+        self.tab_rendimiento = ttk.Frame(self.execution_tabs)
+        self.execution_tabs.add(self.tab_rendimiento, text="Rendimiento")
+
+        metrics_bar = tk.Frame(self.tab_rendimiento)
+        metrics_bar.pack(fill=tk.X)
+        self.metrics_enabled = tk.BooleanVar(value=METRICS.enabled)
+        tk.Checkbutton(metrics_bar, text="Medir", variable=self.metrics_enabled,
+                       command=self.toggle_metrics).pack(side=tk.LEFT, padx=2)
+        tk.Button(metrics_bar, text="Reiniciar", command=METRICS.reset).pack(side=tk.LEFT, padx=2)
+        tk.Button(metrics_bar, text="Perfilar compilación",
+                  command=self.profile_compilation).pack(side=tk.LEFT, padx=2)
+        self.btn_export_profile = tk.Button(metrics_bar, text="Exportar .prof", state=tk.DISABLED,
+                                            command=self.export_profile)
+        self.btn_export_profile.pack(side=tk.LEFT, padx=2)
+
+        self.metrics_table = ttk.Treeview(self.tab_rendimiento, columns=METRIC_COLUMNS,
+                                          show="headings", height=10)
+        for name, width in zip(METRIC_COLUMNS, (170, 60, 80, 80, 80, 80, 260)):
+            self.metrics_table.column(name, width=width, anchor=tk.W, stretch=tk.YES)
+            self.metrics_table.heading(name, text=name, anchor=tk.W)
+        self.metrics_table.pack(fill=tk.BOTH, expand=True)
+
+        # Informe del perfil de cProfile y tracemalloc
+        self.output_perfil = tk.Text(
+            self.tab_rendimiento,
+            wrap=tk.NONE,
+            width=80,
+            height=10,
+            bg="white",
+            fg="black",
+            font=("Consolas", 9)
+        )
+        self.output_perfil.pack(fill=tk.BOTH, expand=True)
+        self.execution_tabs.bind("<<NotebookTabChanged>>", self.refresh_rendimiento)
+        
         # Mostrar todas las pestañas
         self.execution_tabs.pack(fill=tk.BOTH, expand=True)
         
@@ -583,15 +764,16 @@ class IDE:
         self.execution_frame.grid_rowconfigure(0, weight=1)
         self.execution_frame.grid_columnconfigure(0, weight=1)
         
-        scrollbar = ttk.Scrollbar(self.editor_frame, orient=tk.VERTICAL, command=self._on_scroll)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.editor.config(yscrollcommand=scrollbar.set)
+        self.editor_scrollbar = ttk.Scrollbar(self.editor_frame, orient=tk.VERTICAL, command=self._on_scroll)
+        self.editor_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # El editor avisa cada vez que su vista se mueve (barra, rueda, cursor, edición)
+        self.editor.config(yscrollcommand=self._on_yscroll)
         
         # Asociar el editor con los números de línea
         self.linenumbers.attach(self.editor)
         
         # Configurar eventos para redibujar los números de línea
-        self.editor.bind("<<TextModified>>", self._on_change)
+        self.editor.journal.subscribe(self._on_edits)
         self.editor.bind("<Configure>", self._on_change)
         self.editor.bind("<MouseWheel>", self._on_mousewheel)
         
@@ -602,18 +784,27 @@ class IDE:
         # Primero ejecutar el scroll normal
         self.editor.yview(*args)
         # Luego actualizar los números de línea
-        self.linenumbers.redraw()
+        self.linenumbers.schedule_redraw()
+
+    def _on_yscroll(self, first, last):
+        self.editor_scrollbar.set(first, last)
+        self.linenumbers.schedule_redraw()
 
     def _on_mousewheel(self, event):
         """Maneja el evento de la rueda del mouse"""
         # Permitir que el evento de scroll se procese normalmente
         self.editor.yview_scroll(-1 * (event.delta // 120), "units")
         # Programar una actualización de los números de línea
-        self.linenumbers.after(10, self.linenumbers.redraw)
+        self.linenumbers.schedule_redraw()
         return "break"
 
     def _on_change(self, event=None):
-        self.linenumbers.redraw()
+        self.linenumbers.schedule_redraw()
+
+    def _on_edits(self, batch):
+        # El texto cambió: los resultados en curso ya no corresponden
+        self.worker.cancel()
+        self.linenumbers.schedule_redraw()
 
     def create_cursor_indicator(self):
         # Frame para el indicador de cursor
@@ -696,7 +887,7 @@ class IDE:
     def clear_all_panels(self):
         """Limpia todos los paneles de resultados y errores"""
         # Limpiar tabla de tokens
-        self.token_tree.delete(*self.token_tree.get_children())
+        self.token_table.clear()
         
         # Limpiar paneles de texto
         panels = [
@@ -704,6 +895,7 @@ class IDE:
             self.output_sintactico,
             self.output_semantico,
             self.output_intermedio,
+            self.output_optimizacion,
             self.output_ejecucion,
             self.output_hash
         ]
@@ -722,9 +914,11 @@ class IDE:
         )
         if filepath:
             try:
-                with open(filepath, "r") as file:
+                with open(filepath, "r") as file, METRICS.measure("Abrir archivo") as timer:
+                    text = file.read()
                     self.editor.delete(1.0, tk.END)
-                    self.editor.insert(tk.END, file.read())
+                    self.editor.insert(tk.END, text)
+                    timer.count('caracteres', len(text))
                     self.filepath = filepath
                     # Programar el resaltado después de un pequeño retraso
                     self.editor.after(100, self.safe_highlight)
@@ -776,81 +970,79 @@ class IDE:
         except tk.TclError:
             pass
 
+    def editor_text(self):
+        '''Texto del editor, después de avisar las ediciones pendientes'''
+        # El aviso cancela los trabajos en curso: tiene que llegar antes de encolar
+        self.editor.journal.flush()
+        return self.editor.get(1.0, tk.END)
+
+    def poll_worker(self):
+        '''Muestra los resultados que entregó el compilador en segundo plano'''
+        for phase, input_text, result, error in self.worker.poll():
+            with METRICS.measure(f"Panel {phase}"):
+                getattr(self, f"show_{phase}")(input_text, result, error)
+        self.root.after(50, self.poll_worker)
+
     def compile_lexico(self):
+        self.worker.submit("lexico", self.editor_text())
+
+    def show_lexico(self, input_text, tokens, error=None):
         try:
             # Limpiar resultados anteriores
-            self.token_tree.delete(*self.token_tree.get_children())
+            self.token_table.clear()
             self.output_errores.config(state=tk.NORMAL)
             self.output_errores.delete(1.0, tk.END)
             
-            # Obtener texto actual
-            input_text = self.editor.get(1.0, tk.END)
-            lines = input_text.split('\n')
-            
             if not input_text.strip():
                 self.output_errores.insert(tk.END, "El editor está vacío.\n", "no_errors")
                 self.output_errores.config(state=tk.DISABLED)
                 return
+
+            if error is not None:
+                raise error
                 
-            # Procesar análisis léxico
-            tokens = test_lexer(input_text)
+            # La tabla lee las filas visibles directamente del buffer
+            self.token_table.set_tokens(tokens)
+
+            # Procesar análisis léxico: solo hace falta recorrer los errores
             error_count = 0
             self.output_errores.insert(tk.END, "=== ERRORES LÉXICOS ===\n", "error_header")
             
-            # Nueva estrategia para calcular posiciones
-            current_pos = 0
-            line_num = 1
-            line_start_pos = 0
-            
-            for tok in tokens:
-                # Calcular línea y columna basado en el texto
-                while current_pos < tok.lexpos and line_num <= len(lines):
-                    line_end = line_start_pos + len(lines[line_num-1])
-                    if tok.lexpos >= line_end:
-                        current_pos = line_end + 1  # +1 por el \n
-                        line_start_pos = current_pos
-                        line_num += 1
-                    else:
-                        current_pos = tok.lexpos
-                
-                col_num = tok.lexpos - line_start_pos
+            for index in tokens.indices_of('ERROR'):
+                tok = tokens[index]
+                # Línea y columna calculadas por el lexer con su SourceMap
+                line_num = tok.lineno
+                col_num = tok.column - 1
                 
-                # Mostrar tokens válidos
-                if hasattr(tok, 'type') and tok.type != 'ERROR':
-                    self.token_tree.insert("", tk.END, values=(tok.value, tok.type, getattr(tok, 'subtoken', '')))
-                    continue
-                    
                 # Procesar errores
-                if getattr(tok, 'type', '') == 'ERROR':
-                    error_count += 1
-                    
-                    if line_num > len(lines):
-                        continue
-                        
-                    current_line = lines[line_num-1] if line_num <= len(lines) else ""
-                    
-                    # Ajustar para errores específicos
-                    error_value = str(tok.value)
-                    error_length = len(error_value)
-                    error_start = col_num
-                    
-                    if '@' in error_value:  # Caso sum@r
-                        error_start += error_value.index('@')
-                        error_length = 1
-                    elif error_value.count('.') > 1:  # Caso 34.34.34.34
-                        first_dot = error_value.index('.')
-                        error_start += error_value.index('.', first_dot + 1)
-                        error_length = 1
-                    elif '.' in error_value and any(c.isalpha() for c in error_value):  # Caso 32.algo
-                        error_start += error_value.index('.')
-                        error_length = len(error_value) - error_value.index('.')
-                    
-                    # Mostrar información del error
-                    error_msg = (f"Error {error_count}: '{tok.value}'\n"
-                                f"Línea: {line_num}, Columna: {error_start + 1}\n"
-                                f"Contexto: {current_line[:error_start]}>>>{current_line[error_start:error_start+error_length]}<<<{current_line[error_start+error_length:]}\n\n")
-                    
-                    self.output_errores.insert(tk.END, error_msg, "error_detail")
+                error_count += 1
+                
+                line_start = tok.lexpos - col_num
+                line_end = input_text.find('\n', line_start)
+                current_line = input_text[line_start:line_end if line_end != -1 else None]
+                
+                # Ajustar para errores específicos
+                error_value = str(tok.value)
+                error_length = len(error_value)
+                error_start = col_num
+                
+                if '@' in error_value:  # Caso sum@r
+                    error_start += error_value.index('@')
+                    error_length = 1
+                elif error_value.count('.') > 1:  # Caso 34.34.34.34
+                    first_dot = error_value.index('.')
+                    error_start += error_value.index('.', first_dot + 1)
+                    error_length = 1
+                elif '.' in error_value and any(c.isalpha() for c in error_value):  # Caso 32.algo
+                    error_start += error_value.index('.')
+                    error_length = len(error_value) - error_value.index('.')
+                
+                # Mostrar información del error
+                error_msg = (f"Error {error_count}: '{tok.value}'\n"
+                            f"Línea: {line_num}, Columna: {error_start + 1}\n"
+                            f"Contexto: {current_line[:error_start]}>>>{current_line[error_start:error_start+error_length]}<<<{current_line[error_start+error_length:]}\n\n")
+                
+                self.output_errores.insert(tk.END, error_msg, "error_detail")
             
             # Mostrar resumen
             if error_count == 0:
@@ -868,42 +1060,226 @@ class IDE:
                 
 
     
+    def goto_token(self, index):
+        '''Lleva el cursor del editor al token index de la tabla léxica'''
+        offset = self.token_table.data.buffer.offsets[index]
+        self.editor.mark_set(tk.INSERT, f"1.0 + {offset} chars")
+        self.editor.see(tk.INSERT)
+        self.editor.focus_set()
+
     def compile_sintactico(self):
+        self.worker.submit("sintactico", self.editor_text())
+
+    def show_sintactico(self, input_text, result, error=None):
+        self.output_sintactico.config(state=tk.NORMAL)
+        self.output_errores.config(state=tk.NORMAL)
         self.output_sintactico.delete(1.0, tk.END)
         self.output_errores.delete(1.0, tk.END)
-        input_text = self.editor.get(1.0, tk.END)
-        try:
-            result = test_parser(input_text)
-            self.output_sintactico.insert(tk.END, f"Resultado: {result}\n")
-        except Exception as e:
-            self.output_errores.insert(tk.END, f"Error sintáctico: {e}\n")
+        if error is not None:
+            self.output_errores.insert(tk.END, f"Error sintáctico: {error}\n")
+        else:
+            ast, errors = result
+            if ast is not None:
+                self.output_sintactico.insert(tk.END, arbol.dump(ast) + "\n")
+            if errors:
+                self.output_errores.insert(tk.END, "\n".join(errors) + "\n")
+        self.output_sintactico.config(state=tk.DISABLED)
+        self.output_errores.config(state=tk.DISABLED)
 
     def compile_semantico(self):
+        self.worker.submit("semantico", self.editor_text())
+
+    def show_semantico(self, input_text, result, error=None):
+        self.output_semantico.config(state=tk.NORMAL)
+        self.output_errores.config(state=tk.NORMAL)
         self.output_semantico.delete(1.0, tk.END)
         self.output_errores.delete(1.0, tk.END)
-        input_text = self.editor.get(1.0, tk.END)
-        errors = test_semantics(input_text)
+        if error is not None:
+            errors = [f"Error semántico: {error}"]
+        else:
+            table, errors, ast = result
+            self.show_hash(input_text, table)
+            if not errors:
+                self.output_semantico.insert(tk.END, f"Análisis semántico correcto: {len(table)} símbolos\n")
         for error in errors:
             self.output_semantico.insert(tk.END, f"{error}\n")
-            self.output_errores.insert(tk.END, f"Error semántico: {error}\n")
+            self.output_errores.insert(tk.END, f"{error}\n")
+        self.output_semantico.config(state=tk.DISABLED)
+        self.output_errores.config(state=tk.DISABLED)
 
     def compile_intermedio(self):
+        phase = "optimizado" if self.optimize_ir.get() else "intermedio"
+        self.worker.submit(phase, self.editor_text())
+
+    def show_intermedio(self, input_text, code, error=None, stats=None):
+        self.output_intermedio.config(state=tk.NORMAL)
+        self.output_optimizacion.config(state=tk.NORMAL)
         self.output_intermedio.delete(1.0, tk.END)
-        input_text = self.editor.get(1.0, tk.END)
-        ast = test_intermediate_code(input_text)
-        self.output_intermedio.insert(tk.END, f"Código intermedio generado: {ast}\n")
+        self.output_optimizacion.delete(1.0, tk.END)
+        if error is not None:
+            self.output_intermedio.insert(tk.END, f"Error al generar código intermedio: {error}\n")
+        else:
+            self.output_intermedio.insert(tk.END, code.dump() + "\n")
+            self.output_optimizacion.insert(tk.END, stats.format() if stats else "Sin optimizar\n")
+        self.output_intermedio.config(state=tk.DISABLED)
+        self.output_optimizacion.config(state=tk.DISABLED)
+
+    def show_optimizado(self, input_text, result, error=None):
+        if error is not None:
+            self.show_intermedio(input_text, None, error)
+        else:
+            self.show_intermedio(input_text, *result)
         
     def compile_hash(self):
+        self.worker.submit("hash", self.editor_text())
+
+    def show_hash(self, input_text, table, error=None):
+        self.output_hash.config(state=tk.NORMAL)
         self.output_hash.delete(1.0, tk.END)
-        input_text = self.editor.get(1.0, tk.END)
-        self.output_hash.insert(tk.END, "Hash generado.\n")
+        if error is not None:
+            self.output_hash.insert(tk.END, f"Error al generar la tabla de símbolos: {error}\n")
+        else:
+            self.output_hash.insert(tk.END, table.dump() + "\n")
+        self.output_hash.config(state=tk.DISABLED)
 
     def compile_ejecucion(self):
+        '''Ejecuta el programa en un proceso aparte; la salida llega por flush_ejecucion'''
+        if self.execution is not None:
+            self.execution.close()
+        self.output_ejecucion.config(state=tk.NORMAL)
         self.output_ejecucion.delete(1.0, tk.END)
-        input_text = self.editor.get(1.0, tk.END)
-        self.output_ejecucion.insert(tk.END, "Ejecución completada.\n")
+        self.execution = ProgramProcess(self.editor.get(1.0, tk.END), self.backend.get(),
+                                        self.input_ejecucion.get(), EXECUTION_TIMEOUT, CONSOLE_LINES)
+        self.input_ejecucion.delete(0, tk.END)
+        self.status_ejecucion.config(text="Ejecutando...")
+        self.root.after(50, self.flush_ejecucion, self.execution)
+
+    def send_input(self, event=None):
+        '''Envía la línea escrita a cin del programa en ejecución'''
+        if self.execution is None:
+            return None
+        line = self.input_ejecucion.get()
+        self.input_ejecucion.delete(0, tk.END)
+        # Mostrar antes la salida pendiente para que el eco quede en orden
+        self.show_console_output(self.execution)
+        self.output_ejecucion.insert(tk.END, line + "\n", "entrada")
+        self.output_ejecucion.see(tk.END)
+        self.execution.send(line + "\n")
+        return "break"
+
+    def close_input(self):
+        if self.execution is not None:
+            self.execution.close_input()
+
+    def stop_ejecucion(self):
+        if self.execution is not None:
+            self.execution.kill()
+
+    def show_console_output(self, execution):
+        '''Agrega a la consola, de una vez, la salida acumulada del programa'''
+        text, dropped, errors = execution.drain()
+        if not (text or dropped or errors):
+            return
+        console = self.output_ejecucion
+        with METRICS.measure("Consola") as timer:
+            if dropped:
+                console.insert(tk.END, f"... {dropped} líneas omitidas\n", "aviso")
+            if text:
+                console.insert(tk.END, text)
+                timer.count('líneas', text.count("\n"))
+            if errors:
+                console.insert(tk.END, "\n".join(errors) + "\n", "error")
+            # La consola conserva solo las últimas CONSOLE_LINES líneas
+            lines = int(console.index("end-1c").split(".")[0])
+            if lines > CONSOLE_LINES:
+                console.delete("1.0", f"{lines - CONSOLE_LINES + 1}.0")
+            console.see(tk.END)
+
+    def flush_ejecucion(self, execution):
+        '''Pasa la salida del programa a la consola como mucho cada 50 ms'''
+        if execution is not self.execution:
+            return
+        # Consultar antes de vaciar: si ya terminó, este es el último lote
+        finished = execution.finished
+        self.show_console_output(execution)
+        if not finished:
+            status = "Esperando entrada (cin)" if execution.waiting_input else "Ejecutando..."
+            self.status_ejecucion.config(text=status)
+            self.root.after(50, self.flush_ejecucion, execution)
+            return
+        if execution.timed_out:
+            self.output_ejecucion.insert(
+                tk.END, f"Ejecución detenida: superó {EXECUTION_TIMEOUT:g} s de cómputo\n", "error")
+        elif execution.killed:
+            self.output_ejecucion.insert(tk.END, "Ejecución detenida\n", "error")
+        elif execution.returncode == 0:
+            self.output_ejecucion.insert(tk.END, "Ejecución completada.\n", "aviso")
+            METRICS.add("Ejecución", execution.elapsed, {'líneas': execution.lines})
+        if execution.summary:
+            # Tiempo e instrucciones también en la consola, donde quedan tras la salida
+            self.output_ejecucion.insert(tk.END, execution.summary + "\n", "aviso")
+        self.output_ejecucion.see(tk.END)
+        self.status_ejecucion.config(text=execution.summary or "")
+        execution.close()
+        self.execution = None
+
+    def toggle_metrics(self):
+        METRICS.enabled = self.metrics_enabled.get()
+
+    def poll_rendimiento(self):
+        self.refresh_rendimiento()
+        self.root.after(1000, self.poll_rendimiento)
+
+    def refresh_rendimiento(self, event=None):
+        '''Actualiza la tabla de mediciones si la pestaña está a la vista y hubo cambios'''
+        if self.execution_tabs.select() != str(self.tab_rendimiento):
+            return
+        if METRICS.version == self._metrics_version:
+            return
+        self._metrics_version = METRICS.version
+        table = self.metrics_table
+        table.delete(*table.get_children())
+        for measure in METRICS.snapshot():
+            rates = ", ".join(f"{format_rate(rate)} {counter}/s" for counter, rate in measure.rates().items())
+            table.insert("", tk.END, values=(
+                measure.name, measure.calls, f"{measure.total * 1000:.1f}", f"{measure.mean * 1000:.2f}",
+                f"{measure.max * 1000:.2f}", f"{measure.last * 1000:.2f}", rates))
+
+    def profile_compilation(self):
+        '''Compila el texto completo bajo cProfile y tracemalloc en el hilo del compilador'''
+        phase = "optimizado" if self.optimize_ir.get() else "intermedio"
+        self.output_perfil.delete(1.0, tk.END)
+        self.output_perfil.insert(tk.END, "Perfilando la compilación...\n")
+        self.worker.submit("perfil", self.editor_text(), phase)
+
+    def show_perfil(self, input_text, capture, error=None):
+        self.output_perfil.delete(1.0, tk.END)
+        if error is not None:
+            self.output_perfil.insert(tk.END, f"No se pudo perfilar la compilación: {error}\n")
+            return
+        self.capture = capture
+        self.output_perfil.insert(tk.END, capture.report())
+        self.btn_export_profile.config(state=tk.NORMAL)
+
+    def export_profile(self):
+        '''Guarda el último perfil en un .prof y su memoria en un .tracemalloc'''
+        if self.capture is None:
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".prof",
+            filetypes=[("Perfil de cProfile", "*.prof"), ("Todos los archivos", "*.*")]
+        )
+        if filepath:
+            try:
+                memory_path = self.capture.dump(filepath)
+            except OSError as e:
+                messagebox.showerror("Error", f"No se pudo guardar el perfil: {str(e)}")
+                return
+            self.output_perfil.insert("1.0", f"Perfil guardado en {filepath} (memoria en {memory_path})\n\n")
 
 if __name__ == "__main__":
     root = tk.Tk()
     ide = IDE(root)
     root.mainloop()
+    if ide.execution is not None:
+        ide.execution.close()
@@ -1,4 +1,8 @@
+import codecs
+import os
+import re
 import ply.lex as lex
+from mapa_fuente import SourceMap
 
 reserved = {
     'if': 'IF', 'else': 'ELSE', 'end': 'END', 'do': 'DO', 'while': 'WHILE',
@@ -75,7 +79,16 @@ def t_ERROR_AT(t):
 # Comentarios (ignorados)
 def t_COMMENT(t):
     r'//.*|/\*[\s\S]*?\*/'
-    pass
+    t.lexer.lineno += t.value.count('\n')
+
+# /* sin cerrar: el resto de la entrada queda dentro del comentario. Se
+# entrega como ERROR de dos caracteres y el análisis termina, igual que en
+# automata.scan e iter_tokens
+def t_ERROR_COMMENT(t):
+    r'/\*'
+    t.type = 'ERROR'
+    t.lexer.lexlen = t.lexer.lexpos
+    return t
 
 # Ignorar espacios y tabs
 t_ignore = ' \t'
@@ -95,17 +108,164 @@ def t_error(t):
 # Construcción del lexer
 lexer = lex.lex()
 
+# Backend del análisis léxico: 'ply' (expresiones regulares de este módulo)
+# o 'dfa' (autómata de matriz_transicion.py, ver automata.py)
+BACKEND = os.environ.get('COMPILADOR_LEXER', 'ply')
+
 # Función de prueba
-def test_lexer(input_text):
-    lexer.input(input_text)
+def test_lexer(input_text, backend=None):
+    # Línea y columna de cada token a partir de un único índice de líneas
+    source_map = SourceMap(input_text)
     tokens = []
+    if (backend or BACKEND) == 'dfa':
+        from automata import scan
+        for type, start, end in scan(input_text):
+            tok = lex.LexToken()
+            tok.type, tok.lexpos = type, start
+            tok.value = input_text[start:end]
+            if type == 'NUMBER':
+                tok.value = int(tok.value)
+            elif type == 'REAL':
+                tok.value = float(tok.value)
+            tok.lineno, tok.column = source_map.position(start)
+            tokens.append(tok)
+        return tokens
+
+    lexer.input(input_text)
+    lexer.lineno = 1
     while True:
         tok = lexer.token()
         if not tok:
             break
+        tok.lineno, tok.column = source_map.position(tok.lexpos)
         tokens.append(tok)
     return tokens
 
+# Comentarios para el análisis por fragmentos; el tercer grupo es un /* sin cerrar
+_comment_re = re.compile(r'(//[^\n]*)|(/\*[\s\S]*?\*/)|(/\*)')
+
+def _read_chunks(source, chunk_size):
+    '''Lee fragmentos de texto de una ruta, un archivo (texto o binario) o un mmap'''
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as file:
+            yield from _read_chunks(file, chunk_size)
+        return
+    decoder = None
+    while True:
+        data = source.read(chunk_size)
+        if not data:
+            break
+        if isinstance(data, bytes):
+            # mmap y archivos binarios: decodificar sin partir caracteres UTF-8
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            data = decoder.decode(data)
+        if data:
+            yield data
+    if decoder is not None:
+        data = decoder.decode(b'', final=True)
+        if data:
+            yield data
+
+def iter_tokens(source, chunk_size=1 << 16):
+    '''Genera los tokens de una ruta, un archivo o un mmap sin cargarlo completo.
+
+    La entrada se lee en fragmentos de chunk_size y se tokeniza hasta el
+    último salto de línea de cada uno; el resto se une al siguiente. Los
+    comentarios /* */ que cruzan fragmentos se descartan sin acumularlos.
+    Cada token lleva lexpos absoluto, lineno y column (desde 1) correctos
+    aunque haya comentarios de varias líneas. Los tokens son los mismos que
+    los de test_lexer sobre el texto completo; en particular, un /* sin
+    cerrar produce un ERROR y termina el análisis.
+    '''
+    lexer_copy = lexer.clone()
+    pending = ''        # texto leído y aún no tokenizado
+    base = 0            # posición absoluta de pending[0]
+    line = 1            # línea de la posición base
+    line_start = 0      # posición absoluta donde empieza esa línea
+    comment = None      # (lexpos, línea, columna) de un /* aún sin cerrar
+    search_from = 0
+
+    def advance(text, start, end):
+        # Cuenta los saltos de línea de text[start:end] y mueve base hasta end
+        nonlocal base, line, line_start
+        newlines = text.count('\n', start, end)
+        if newlines:
+            line += newlines
+            line_start = base + text.rfind('\n', start, end) + 1 - start
+        base += end - start
+
+    chunks = _read_chunks(source, chunk_size)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+        else:
+            pending += chunk
+
+        while pending or final:
+            if comment is not None:
+                end = pending.find('*/', search_from)
+                if end == -1:
+                    if final:
+                        tok = lex.LexToken()
+                        tok.type, tok.value = 'ERROR', '/*'
+                        tok.lexpos, tok.lineno, tok.column = comment
+                        yield tok
+                        pending = ''
+                        break
+                    # Conservar el último carácter por si es el '*' de '*/'
+                    # (sin tomar el '*' del propio '/*')
+                    keep = max(len(pending) - 1, search_from)
+                    advance(pending, 0, keep)
+                    pending = pending[keep:]
+                    search_from = 0
+                    break
+                advance(pending, 0, end + 2)
+                pending = pending[end + 2:]
+                comment = None
+
+            # Tokenizar hasta el último salto de línea (o todo al final)
+            cut = len(pending) if final else pending.rfind('\n') + 1
+            open_at = None
+            for m in _comment_re.finditer(pending):
+                if m.lastindex == 3:
+                    open_at = m.start()
+                    break
+                if m.start() < cut < m.end():
+                    cut = m.end()
+            if open_at is not None:
+                cut = open_at
+            if cut == 0 and open_at is None:
+                break
+
+            piece = pending[:cut]
+            lexer_copy.input(piece)
+            scanned = 0
+            while True:
+                tok = lexer_copy.token()
+                if not tok:
+                    break
+                advance(piece, scanned, tok.lexpos)
+                scanned = tok.lexpos
+                tok.lexpos = base
+                tok.lineno = line
+                tok.column = base - line_start + 1
+                yield tok
+            advance(piece, scanned, cut)
+            pending = pending[cut:]
+
+            if open_at is not None:
+                # Comentario /* que continúa en los siguientes fragmentos
+                comment = (base, line, base - line_start + 1)
+                search_from = 2
+            elif final:
+                pending = ''
+                break
+            else:
+                break
+
 # Ejemplo de prueba
 if __name__ == "__main__":
     entrada = '''main sum@r 3.14+main)if{32.algo
@@ -114,4 +274,4 @@ if __name__ == "__main__":
     salida = test_lexer(entrada)
     print("TOKENS DETECTADOS:")
     for tok in salida:
-        print(f"{tok.type:<10} {tok.value:<10} linea {tok.lineno} pos {tok.lexpos}")
+        print(f"{tok.type:<10} {tok.value:<10} linea {tok.lineno} col {tok.column} pos {tok.lexpos}")
@@ -0,0 +1,37 @@
+import re
+from array import array
+from bisect import bisect_right
+
+_newline_re = re.compile(r'\n')
+
+
+class SourceMap:
+    '''Índice de los inicios de línea de un texto.
+
+    Se construye una sola vez por fuente y convierte cualquier posición
+    (lexpos) en (línea, columna), ambas desde 1, con búsqueda binaria.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = array('I', [0])
+        self.starts.extend(m.end() for m in _newline_re.finditer(text))
+
+    def __len__(self):
+        '''Número de líneas del texto'''
+        return len(self.starts)
+
+    def line(self, offset):
+        '''Línea (desde 1) que contiene la posición offset'''
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset):
+        '''Devuelve (línea, columna) de la posición offset'''
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line_text(self, line):
+        '''Texto de la línea indicada (desde 1), sin el salto de línea'''
+        start = self.starts[line - 1]
+        end = self.starts[line] - 1 if line < len(self.starts) else len(self.text)
+        return self.text[start:end]
@@ -0,0 +1,395 @@
+'''Máquina virtual de registros para ejecutar el código intermedio.
+
+Bytecode ensambla los cuádruplos optimizados en un array 'i' de cuatro
+palabras por instrucción (op, a, b, r) donde a, b y r son índices de
+registro o, en los saltos, la instrucción destino. Los registros son una
+sola lista preasignada: primero las variables, luego los temporales y al
+final las constantes.
+
+Para ejecutar, cada instrucción se decodifica una vez en una función que
+hace su trabajo y devuelve el índice de la siguiente; el ciclo de despacho
+queda en pc = handlers[pc](), sin cadena de comparaciones por opcode.
+'''
+import time
+from array import array
+from codigo_intermedio import (
+    ADD, SUB, MUL, DIV, IDIV, MOD, POW, IPOW, LT, LE, GT, GE, NE, EQ,
+    NEG, NOT, ITOF, COPY, LABEL, GOTO, IFFALSE, IFTRUE, READ, WRITE,
+    VAR, TEMP, NONE, INT, UNKNOWN, kind_of, index_of,
+)
+from tipos import INT_MIN, INT_MAX, int_div
+
+# Sin límite práctico de instrucciones
+UNLIMITED = 1 << 62
+
+
+class ExecutionError(Exception):
+    '''Error en tiempo de ejecución del programa'''
+
+
+class _Halt(Exception):
+    pass
+
+
+class IntegerOverflow(ArithmeticError):
+    '''Resultado int fuera del rango de 32 bits que acepta el analizador de tipos'''
+
+
+def format_value(value):
+    '''Texto que escribe cout para un valor'''
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return format(value, 'g')
+    return str(value)
+
+
+class Bytecode:
+    '''Programa ensamblado para la máquina virtual'''
+
+    def __init__(self, code):
+        self.var_names = list(code.var_names)
+        self.var_types = list(code.var_types)
+        num_vars = len(code.var_types)
+        temp_base = num_vars
+        const_base = num_vars + code.num_temps
+
+        def register(value):
+            if value == NONE:
+                return 0
+            kind, index = kind_of(value), index_of(value)
+            if kind == VAR:
+                return index
+            if kind == TEMP:
+                return temp_base + index
+            return const_base + index
+
+        # Las etiquetas desaparecen: cada una apunta a la instrucción que la sigue
+        targets = {}
+        count = 0
+        for i, op in enumerate(code.ops):
+            if op == LABEL:
+                targets[code.result[i]] = count
+            else:
+                count += 1
+
+        self.instructions = array('i')
+        emit = self.instructions.extend
+        for i, op in enumerate(code.ops):
+            if op == LABEL:
+                continue
+            a, b, r = code.arg1[i], code.arg2[i], code.result[i]
+            if op in (GOTO, IFFALSE, IFTRUE):
+                emit((op, register(a), 0, targets[r]))
+            elif op == READ:
+                # a indica el tipo de la variable leída (1 = float)
+                emit((op, self.var_types[index_of(r)] == 'float', 0, register(r)))
+            else:
+                emit((op, register(a), register(b), register(r)))
+
+        self.registers = [0.0 if type == 'float' else 0 for type in self.var_types]
+        self.registers += [0] * code.num_temps
+        self.registers += code.constants
+        # Tipo del resultado de cada instrucción (ver IntermediateCode.int_results)
+        self.int_results = bytearray(kind for op, kind in zip(code.ops, code.int_results()) if op != LABEL)
+
+    def __len__(self):
+        return len(self.instructions) // 4
+
+
+def read_value(read, is_float):
+    token = read()
+    if token is None:
+        raise ExecutionError("cin: no hay más datos de entrada")
+    try:
+        value = float(token) if is_float else int(token)
+    except ValueError:
+        raise ExecutionError(f"cin: '{token}' no es un {'float' if is_float else 'int'}") from None
+    if not is_float and not INT_MIN <= value <= INT_MAX:
+        raise ExecutionError(f"cin: '{token}' está fuera del rango de int")
+    return value
+
+
+def int_mod(x, y):
+    return x - y * int_div(x, y)
+
+
+def int_pow(x, y):
+    if y > 64 and x not in (-1, 0, 1):
+        # Sin calcular enteros enormes: |x| ** 65 ya no cabe en 32 bits
+        raise IntegerOverflow
+    result = x ** y if y >= 0 else int(x ** y)
+    if not INT_MIN <= result <= INT_MAX:
+        raise IntegerOverflow
+    return result
+
+
+def check_int(x):
+    '''x si es un int de 32 bits; si no, IntegerOverflow'''
+    if INT_MIN <= x <= INT_MAX:
+        return x
+    raise IntegerOverflow
+
+
+def float_pow(x, y):
+    result = float(x) ** y
+    if isinstance(result, complex):
+        raise ExecutionError("potencia sin resultado real")
+    return result
+
+
+def _decode(bytecode, regs, read, write):
+    '''Una función por instrucción; cada una devuelve el siguiente pc'''
+    words = bytecode.instructions
+    int_results = bytecode.int_results
+    handlers = []
+    for pc in range(len(bytecode)):
+        op, a, b, r = words[4 * pc:4 * pc + 4]
+        n = pc + 1
+        checked = int_results[pc] == INT
+        if op == COPY:
+            def f(a=a, r=r, n=n, regs=regs):
+                regs[r] = regs[a]
+                return n
+        elif op == ADD and checked:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                x = regs[a] + regs[b]
+                if INT_MIN <= x <= INT_MAX:
+                    regs[r] = x
+                    return n
+                raise IntegerOverflow
+        elif op == SUB and checked:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                x = regs[a] - regs[b]
+                if INT_MIN <= x <= INT_MAX:
+                    regs[r] = x
+                    return n
+                raise IntegerOverflow
+        elif op == MUL and checked:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                x = regs[a] * regs[b]
+                if INT_MIN <= x <= INT_MAX:
+                    regs[r] = x
+                    return n
+                raise IntegerOverflow
+        elif op == ADD:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] + regs[b]
+                return n
+        elif op == SUB:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] - regs[b]
+                return n
+        elif op == MUL:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] * regs[b]
+                return n
+        elif op == DIV:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] / regs[b]
+                return n
+        elif op == LT:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] < regs[b]
+                return n
+        elif op == LE:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] <= regs[b]
+                return n
+        elif op == GT:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] > regs[b]
+                return n
+        elif op == GE:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] >= regs[b]
+                return n
+        elif op == NE:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] != regs[b]
+                return n
+        elif op == EQ:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                regs[r] = regs[a] == regs[b]
+                return n
+        elif op == IDIV:
+            # Con operandos no negativos la división de Python ya trunca como C
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                x = regs[a]
+                y = regs[b]
+                regs[r] = x // y if x >= 0 < y else int_div(x, y)
+                return n
+        elif op == MOD:
+            def f(a=a, b=b, r=r, n=n, regs=regs):
+                x = regs[a]
+                y = regs[b]
+                regs[r] = x % y if x >= 0 < y else int_mod(x, y)
+                return n
+        elif op in (IPOW, POW):
+            function = int_pow if op == IPOW else float_pow
+
+            def f(a=a, b=b, r=r, n=n, regs=regs, function=function):
+                regs[r] = function(regs[a], regs[b])
+                return n
+        elif op == NEG:
+            def f(a=a, r=r, n=n, regs=regs):
+                regs[r] = -regs[a]
+                return n
+        elif op == NOT:
+            def f(a=a, r=r, n=n, regs=regs):
+                regs[r] = not regs[a]
+                return n
+        elif op == ITOF:
+            def f(a=a, r=r, n=n, regs=regs):
+                regs[r] = float(regs[a])
+                return n
+        elif op == GOTO:
+            def f(r=r):
+                return r
+        elif op == IFFALSE:
+            def f(a=a, r=r, n=n, regs=regs):
+                return n if regs[a] else r
+        elif op == IFTRUE:
+            def f(a=a, r=r, n=n, regs=regs):
+                return r if regs[a] else n
+        elif op == READ:
+            def f(a=a, r=r, n=n, regs=regs, read=read):
+                regs[r] = read_value(read, a)
+                return n
+        elif op == WRITE:
+            def f(a=a, n=n, regs=regs, write=write):
+                write(format_value(regs[a]))
+                return n
+        else:
+            raise ValueError(f"opcode desconocido {op}")
+        if op in (NEG, IDIV) and checked or int_results[pc] == UNKNOWN and op in (ADD, SUB, MUL, NEG):
+            # -INT_MIN e INT_MIN / -1; o un resultado de tipo desconocido
+            f = _checked(f, r, regs)
+        handlers.append(f)
+
+    def halt():
+        raise _Halt
+    handlers.append(halt)
+    return handlers
+
+
+def _checked(handler, r, regs):
+    '''handler seguido de la comprobación de rango de regs[r] si es un int'''
+    def f(handler=handler, r=r, regs=regs):
+        n = handler()
+        x = regs[r]
+        if x.__class__ is int and not INT_MIN <= x <= INT_MAX:
+            raise IntegerOverflow
+        return n
+    return f
+
+
+class VirtualMachine:
+    '''Ejecuta un Bytecode con funciones de entrada y salida.
+
+    read() devuelve el siguiente dato de entrada como texto (o None si ya
+    no hay) y write(texto) recibe cada valor que escribe cout. Tras run()
+    quedan disponibles steps (instrucciones ejecutadas), seconds y los
+    valores finales de las variables.
+    '''
+
+    def __init__(self, bytecode, read, write):
+        self.bytecode = bytecode
+        self.registers = list(bytecode.registers)
+        self.handlers = _decode(bytecode, self.registers, read, write)
+        self.steps = 0
+        self.seconds = 0.0
+
+    def run(self, max_steps=None):
+        handlers = self.handlers
+        limit = max_steps or UNLIMITED
+        pc = steps = 0
+        start = time.perf_counter()
+        try:
+            while steps < limit:
+                pc = handlers[pc]()
+                steps += 1
+            raise ExecutionError(f"se alcanzó el límite de {limit} instrucciones")
+        except _Halt:
+            pass
+        except ZeroDivisionError:
+            raise ExecutionError(f"división entre cero (instrucción {pc})") from None
+        except IntegerOverflow:
+            raise ExecutionError(f"desbordamiento de entero (instrucción {pc})") from None
+        except OverflowError:
+            raise ExecutionError(f"desbordamiento de real (instrucción {pc})") from None
+        finally:
+            self.steps = steps
+            self.seconds = time.perf_counter() - start
+
+    def variables(self):
+        '''(nombre, tipo, valor) de cada variable'''
+        bytecode = self.bytecode
+        return [(name, type, self.registers[i])
+                for i, (name, type) in enumerate(zip(bytecode.var_names, bytecode.var_types))]
+
+
+class ExecutionResult:
+    '''Salida de una ejecución; steps es None si el backend no cuenta instrucciones'''
+
+    def __init__(self, output, dropped, steps, seconds, error=None):
+        self.output = output
+        self.dropped = dropped
+        self.steps = steps
+        self.seconds = seconds
+        self.error = error
+
+    def summary(self):
+        if self.steps is None:
+            return f"{self.seconds * 1000:.1f} ms (código Python)"
+        rate = self.steps / self.seconds / 1e6 if self.seconds else 0.0
+        return (f"{self.steps} instrucciones en {self.seconds * 1000:.1f} ms "
+                f"({rate:.2f} M instrucciones/s)")
+
+
+class OutputBuffer:
+    '''Líneas que escribe cout; conserva solo las últimas max_lines'''
+
+    def __init__(self, max_lines=10000):
+        self.max_lines = max_lines
+        self.lines = []
+        self.dropped = 0
+
+    def write(self, text):
+        lines = self.lines
+        lines.append(text)
+        # Recortar por tandas y no en cada línea
+        if len(lines) > 2 * self.max_lines:
+            self.trim()
+
+    def trim(self):
+        extra = len(self.lines) - self.max_lines
+        if extra > 0:
+            self.dropped += extra
+            del self.lines[:extra]
+
+    def result(self, steps, seconds, error=None):
+        self.trim()
+        return ExecutionResult(self.lines, self.dropped, steps, seconds, error)
+
+
+def input_reader(input_text):
+    '''Función read() que entrega los datos de input_text separados por espacios'''
+    tokens = iter(input_text.split())
+    return lambda: next(tokens, None)
+
+
+def execute(bytecode, input_text='', max_steps=None, max_output=10000):
+    '''Ejecuta el programa con la entrada dada (datos separados por espacios).
+
+    Guarda a lo sumo max_output líneas de salida, las últimas; dropped
+    cuenta las descartadas. Los errores de ejecución quedan en error.
+    '''
+    output = OutputBuffer(max_output)
+    vm = VirtualMachine(bytecode, input_reader(input_text), output.write)
+    error = None
+    try:
+        vm.run(max_steps)
+    except ExecutionError as e:
+        error = e
+    return output.result(vm.steps, vm.seconds, error)
@@ -0,0 +1,548 @@
+'''Optimización del código intermedio.
+
+Las pasadas trabajan sobre los arreglos de IntermediateCode: marcan las
+instrucciones a eliminar en un bytearray y después se compactan los
+arreglos de una sola vez. optimize() repite la secuencia completa hasta que
+ninguna pasada cambia nada y registra por pasada las instrucciones
+eliminadas, los cambios y el tiempo.
+'''
+import heapq
+import time
+from array import array
+from itertools import compress
+from codigo_intermedio import (
+    ADD, SUB, MUL, DIV, IDIV, MOD, POW, IPOW, LT, LE, GT, GE, NE, EQ,
+    NEG, NOT, ITOF, COPY, LABEL, GOTO, IFFALSE, IFTRUE, READ, WRITE,
+    VAR, TEMP, CONST, NONE, operand, kind_of, index_of,
+)
+from tipos import INT_MIN, ConstantError, evaluate
+
+BINARY = frozenset((ADD, SUB, MUL, DIV, IDIV, MOD, POW, IPOW, LT, LE, GT, GE, NE, EQ))
+UNARY = frozenset((NEG, NOT, ITOF, COPY))
+JUMPS = frozenset((GOTO, IFFALSE, IFTRUE))
+COMMUTATIVE = frozenset((ADD, MUL, NE, EQ))
+# Instrucciones que solo calculan un valor: se pueden eliminar si no se usa
+PURE = BINARY | UNARY
+# Las que además pueden detener la ejecución (división entre cero,
+# desbordamiento); ADD, SUB, MUL y NEG solo si su resultado es int
+TRAPPING = frozenset((DIV, IDIV, MOD, POW, IPOW, ADD, SUB, MUL, NEG))
+
+_OPERATORS = {
+    ADD: '+', SUB: '-', MUL: '*', DIV: '/', IDIV: '/', MOD: '%', POW: '^', IPOW: '^',
+    LT: '<', LE: '<=', GT: '>', GE: '>=', NE: '!=', EQ: '==',
+}
+_MISSING = object()
+
+
+def _is_value(value):
+    '''Operando que guarda un valor en tiempo de ejecución (variable o temporal)'''
+    return value != NONE and kind_of(value) <= TEMP
+
+
+def _compact(code, removed):
+    '''Quita las instrucciones marcadas; devuelve cuántas se quitaron'''
+    if not any(removed):
+        return 0
+    keep = removed.translate(bytes([1, 0]) + bytes(254))
+    before = len(code.ops)
+    for name in ('ops', 'arg1', 'arg2', 'result'):
+        values = getattr(code, name)
+        setattr(code, name, array(values.typecode, compress(values, keep)))
+    return before - len(code.ops)
+
+
+class FlowGraph:
+    '''Bloques básicos y grafo de flujo de control del código.
+
+    starts tiene el índice de la primera instrucción de cada bloque (más
+    uno final igual a la longitud del código); succ y preds son listas de
+    bloques sucesores y predecesores.
+    '''
+
+    def __init__(self, code):
+        ops, result = code.ops, code.result
+        n = len(ops)
+        leaders = bytearray(n + 1)
+        leaders[0] = 1
+        for i, op in enumerate(ops):
+            if op == LABEL:
+                leaders[i] = 1
+            elif op in JUMPS:
+                leaders[i + 1] = 1
+        starts = array('i', (i for i in range(n) if leaders[i]))
+        starts.append(n)
+        self.starts = starts
+        count = len(starts) - 1
+        block_of_label = {}
+        for block in range(count):
+            if ops[starts[block]] == LABEL:
+                block_of_label[result[starts[block]]] = block
+        self.succ = [[] for _ in range(count)]
+        self.preds = [[] for _ in range(count)]
+        for block in range(count):
+            last = starts[block + 1] - 1
+            op = ops[last]
+            targets = []
+            if op != GOTO and block + 1 < count:
+                targets.append(block + 1)
+            if op in JUMPS:
+                target = block_of_label[result[last]]
+                if target not in targets:
+                    targets.append(target)
+            self.succ[block] = targets
+            for target in targets:
+                self.preds[target].append(block)
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def range(self, block):
+        return range(self.starts[block], self.starts[block + 1])
+
+    def reachable(self):
+        '''bytearray con 1 en los bloques alcanzables desde la entrada'''
+        seen = bytearray(len(self))
+        if not len(self):
+            return seen
+        stack = [0]
+        seen[0] = 1
+        while stack:
+            for target in self.succ[stack.pop()]:
+                if not seen[target]:
+                    seen[target] = 1
+                    stack.append(target)
+        return seen
+
+
+def _evaluate(op, a, b):
+    '''Valor constante de la instrucción o None si no se puede calcular'''
+    try:
+        if op == COPY:
+            return a
+        if op == NEG:
+            # -INT_MIN no cabe en un int: queda para la ejecución
+            return -a if a.__class__ is not int or a != INT_MIN else None
+        if op == NOT:
+            return not a
+        if op == ITOF:
+            return float(a)
+        if op in (IDIV, IPOW, MOD):
+            type = 'int'
+        elif op in (DIV, POW):
+            type = 'float'
+        elif op in (LT, LE, GT, GE, NE, EQ):
+            type = 'bool'
+        else:
+            type = 'float' if isinstance(a, float) or isinstance(b, float) else 'int'
+        return evaluate(_OPERATORS[op], a, b, type)
+    except ConstantError:
+        return None
+
+
+def _identical(a, b):
+    '''Mismo valor y tipo: 1, 1.0 y True difieren, y también 0.0 y -0.0'''
+    if type(a) is not type(b):
+        return False
+    return repr(a) == repr(b) if type(a) is float else a == b
+
+
+def _meet(states):
+    '''Constantes en las que coinciden todos los estados'''
+    states = iter(states)
+    result = dict(next(states))
+    for state in states:
+        for key, value in list(result.items()):
+            if not _identical(state.get(key, _MISSING), value):
+                del result[key]
+    return result
+
+
+def _same(a, b):
+    if b is None or len(a) != len(b):
+        return False
+    return all(_identical(b.get(key, _MISSING), value) for key, value in a.items())
+
+
+def propagate_constants(code):
+    '''Propagación global de constantes con plegado y saltos condicionales.
+
+    Análisis hacia adelante sobre el grafo de flujo: el estado de cada
+    bloque asocia variables y temporales con su valor constante. Las
+    variables empiezan en 0 (o 0.0), como al iniciar la ejecución.
+    '''
+    graph = FlowGraph(code)
+    if not len(graph):
+        return 0
+    constants = code.constants
+    entry = {operand(VAR, address): (0.0 if type == 'float' else 0)
+             for address, type in enumerate(code.var_types)}
+
+    def value_of(value, state):
+        if value == NONE:
+            return None
+        if kind_of(value) == CONST:
+            return constants[index_of(value)]
+        return state.get(value)
+
+    def transfer(block, state, rewrite=None):
+        ops, arg1, arg2, result = code.ops, code.arg1, code.arg2, code.result
+        for i in graph.range(block):
+            op = ops[i]
+            if op == LABEL or op == GOTO:
+                continue
+            a = arg1[i]
+            av = value_of(a, state)
+            if op == READ:
+                state.pop(result[i], None)
+                continue
+            if op in (IFFALSE, IFTRUE, WRITE):
+                if rewrite is not None and av is not None:
+                    rewrite(i, op, av)
+                continue
+            bv = value_of(arg2[i], state) if op in BINARY else None
+            value = None
+            if av is not None and (bv is not None or op not in BINARY):
+                value = _evaluate(op, av, bv)
+            if rewrite is not None:
+                rewrite(i, op, av, bv, value)
+            if value is None:
+                state.pop(result[i], None)
+            else:
+                state[result[i]] = value
+        return state
+
+    # Punto fijo: OUT[b] None significa que b todavía no se visitó. Los
+    # bloques pendientes se procesan en orden del código (montículo), que en
+    # código estructurado converge en pocas vueltas
+    count = len(graph)
+    outs = [None] * count
+    pending = bytearray(count)
+    worklist = [0]
+    pending[0] = 1
+    while worklist:
+        block = heapq.heappop(worklist)
+        pending[block] = 0
+        states = [outs[p] for p in graph.preds[block] if outs[p] is not None]
+        if block == 0:
+            states.append(entry)
+        state = transfer(block, _meet(states) if states else {})
+        if not _same(state, outs[block]):
+            outs[block] = state
+            for target in graph.succ[block]:
+                if not pending[target]:
+                    pending[target] = 1
+                    heapq.heappush(worklist, target)
+
+    removed = bytearray(len(code))
+    changes = 0
+
+    def rewrite(i, op, av, bv=None, value=None):
+        nonlocal changes
+        if op in (IFFALSE, IFTRUE):
+            taken = bool(av) == (op == IFTRUE)
+            if taken:
+                code.ops[i] = GOTO
+                code.arg1[i] = NONE
+            else:
+                removed[i] = 1
+            changes += 1
+        elif op == WRITE:
+            if kind_of(code.arg1[i]) != CONST:
+                code.arg1[i] = code.constant(av)
+                changes += 1
+        elif value is not None:
+            if op != COPY or kind_of(code.arg1[i]) != CONST:
+                code.ops[i] = COPY
+                code.arg1[i] = code.constant(value)
+                code.arg2[i] = NONE
+                changes += 1
+        else:
+            if av is not None and kind_of(code.arg1[i]) != CONST:
+                code.arg1[i] = code.constant(av)
+                changes += 1
+            if bv is not None and kind_of(code.arg2[i]) != CONST:
+                code.arg2[i] = code.constant(bv)
+                changes += 1
+
+    for block in range(count):
+        if outs[block] is None:
+            continue
+        states = [outs[p] for p in graph.preds[block] if outs[p] is not None]
+        if block == 0:
+            states.append(entry)
+        transfer(block, _meet(states) if states else {}, rewrite)
+    _compact(code, removed)
+    return changes
+
+
+class _LocalTable:
+    '''Valores conocidos dentro de un bloque básico.
+
+    copies asocia un destino con el operando copiado y available una
+    expresión (op, a, b) con el operando que ya la contiene. deps indica qué
+    entradas dejan de valer cuando se redefine cada operando.
+    '''
+
+    def __init__(self):
+        self.copies = {}
+        self.available = {}
+        self.deps = {}
+
+    def kill(self, value):
+        self.copies.pop(value, None)
+        for kind, key in self.deps.pop(value, ()):
+            if kind == 'c':
+                self.copies.pop(key, None)
+            else:
+                self.available.pop(key, None)
+
+    def add_copy(self, target, source):
+        self.copies[target] = source
+        self.deps.setdefault(source, []).append(('c', target))
+
+    def add_expression(self, key, target):
+        self.available[key] = target
+        for value in (key[1], key[2], target):
+            self.deps.setdefault(value, []).append(('a', key))
+
+
+def propagate_copies(code):
+    '''Propagación local de copias: tras x = y, los usos de x leen y'''
+    graph = FlowGraph(code)
+    ops, arg1, arg2, result = code.ops, code.arg1, code.arg2, code.result
+    removed = bytearray(len(code))
+    changes = 0
+    for block in range(len(graph)):
+        table = _LocalTable()
+        copies = table.copies
+        for i in graph.range(block):
+            op = ops[i]
+            if op == LABEL or op == GOTO:
+                continue
+            for args in (arg1, arg2):
+                source = copies.get(args[i])
+                if source is not None:
+                    args[i] = source
+                    changes += 1
+            if op in (IFFALSE, IFTRUE, WRITE):
+                continue
+            target = result[i]
+            table.kill(target)
+            if op == COPY:
+                if arg1[i] == target:
+                    removed[i] = 1
+                    changes += 1
+                else:
+                    table.add_copy(target, arg1[i])
+    _compact(code, removed)
+    return changes
+
+
+def eliminate_common_subexpressions(code):
+    '''Subexpresiones comunes locales: t = a op b ya calculado se copia'''
+    graph = FlowGraph(code)
+    ops, arg1, arg2, result = code.ops, code.arg1, code.arg2, code.result
+    changes = 0
+    for block in range(len(graph)):
+        table = _LocalTable()
+        available = table.available
+        for i in graph.range(block):
+            op = ops[i]
+            if op not in PURE and op != READ:
+                continue
+            target = result[i]
+            if op == COPY or op == READ:
+                table.kill(target)
+                continue
+            a, b = arg1[i], arg2[i]
+            if op in COMMUTATIVE and b < a:
+                a, b = b, a
+            key = (op, a, b)
+            previous = available.get(key)
+            table.kill(target)
+            if previous is not None and previous != target:
+                ops[i] = COPY
+                arg1[i] = previous
+                arg2[i] = NONE
+                changes += 1
+            elif target != a and target != b:
+                table.add_expression(key, target)
+    return changes
+
+
+def _traps(code, i, int_results):
+    '''Verdadero si la instrucción i puede fallar al ejecutarse.
+
+    Tras la propagación de constantes, un divisor constante distinto de 0
+    (y de -1 en la división entera, por INT_MIN / -1) ya no puede fallar;
+    una operación con ambos operandos constantes que siguió sin plegar es
+    justamente porque falla.
+    '''
+    op = code.ops[i]
+    if op in (DIV, IDIV, MOD):
+        b = code.arg2[i]
+        if kind_of(b) != CONST:
+            return True
+        divisor = code.constants[index_of(b)]
+        return divisor == 0 or op == IDIV and divisor == -1
+    if op in (POW, IPOW):
+        return True
+    return int_results[i] != 0
+
+
+def eliminate_dead_code(code):
+    '''Quita los cálculos cuyo resultado no se usa (análisis de vida global).
+
+    Los que pueden fallar (TRAPPING) se conservan aunque no se usen, para
+    que el programa optimizado falle igual que el original.
+    '''
+    graph = FlowGraph(code)
+    ops, arg1, arg2, result = code.ops, code.arg1, code.arg2, code.result
+    count = len(graph)
+    uses, defs = [], []
+    for block in range(count):
+        use, define = set(), set()
+        for i in reversed(graph.range(block)):
+            op = ops[i]
+            if op in PURE or op == READ:
+                define.add(result[i])
+                use.discard(result[i])
+            for value in (arg1[i], arg2[i]):
+                if _is_value(value):
+                    use.add(value)
+        uses.append(use)
+        defs.append(define)
+
+    live_in = [set() for _ in range(count)]
+    live_out = [set() for _ in range(count)]
+    worklist = list(range(count))
+    pending = bytearray([1]) * count
+    while worklist:
+        block = worklist.pop()
+        pending[block] = 0
+        out = set()
+        for target in graph.succ[block]:
+            out |= live_in[target]
+        live_out[block] = out
+        new_in = uses[block] | (out - defs[block])
+        if new_in != live_in[block]:
+            live_in[block] = new_in
+            for source in graph.preds[block]:
+                if not pending[source]:
+                    pending[source] = 1
+                    worklist.append(source)
+
+    int_results = code.int_results()
+    removed = bytearray(len(code))
+    for block in range(count):
+        live = set(live_out[block])
+        for i in reversed(graph.range(block)):
+            op = ops[i]
+            if op in PURE:
+                if result[i] not in live and not (op in TRAPPING and _traps(code, i, int_results)):
+                    removed[i] = 1
+                    continue
+                live.discard(result[i])
+            elif op == READ:
+                live.discard(result[i])
+            for value in (arg1[i], arg2[i]):
+                if _is_value(value):
+                    live.add(value)
+    return _compact(code, removed)
+
+
+def simplify_jumps(code):
+    '''Quita el código inalcanzable, los saltos a la instrucción siguiente y
+    las etiquetas que ningún salto usa'''
+    graph = FlowGraph(code)
+    reachable = graph.reachable()
+    removed = bytearray(len(code))
+    for block in range(len(graph)):
+        if not reachable[block]:
+            for i in graph.range(block):
+                removed[i] = 1
+    changes = _compact(code, removed)
+
+    ops, result = code.ops, code.result
+    removed = bytearray(len(code))
+    next_labels = set()
+    # De atrás hacia adelante: next_labels son las etiquetas que están justo
+    # después de la instrucción actual
+    for i in range(len(code) - 1, -1, -1):
+        op = ops[i]
+        if op == LABEL:
+            next_labels.add(result[i])
+            continue
+        if op in JUMPS and result[i] in next_labels:
+            removed[i] = 1
+            continue
+        next_labels = set()
+    changes += _compact(code, removed)
+
+    ops, result = code.ops, code.result
+    targets = {result[i] for i, op in enumerate(ops) if op in JUMPS}
+    removed = bytearray(op == LABEL and result[i] not in targets for i, op in enumerate(ops))
+    return changes + _compact(code, removed)
+
+
+PASSES = [
+    ('Propagación de constantes', propagate_constants),
+    ('Propagación de copias', propagate_copies),
+    ('Subexpresiones comunes', eliminate_common_subexpressions),
+    ('Código muerto', eliminate_dead_code),
+    ('Saltos e inalcanzable', simplify_jumps),
+]
+
+
+class OptimizationStats:
+    '''Totales por pasada: instrucciones eliminadas, cambios y tiempo'''
+
+    def __init__(self, before):
+        self.before = before
+        self.after = before
+        self.rounds = 0
+        self.blocks = 0
+        self.passes = {name: [0, 0, 0.0] for name, _ in PASSES}
+
+    def record(self, name, removed, changes, seconds):
+        totals = self.passes[name]
+        totals[0] += removed
+        totals[1] += changes
+        totals[2] += seconds
+
+    def as_dict(self):
+        return {
+            'antes': self.before, 'despues': self.after, 'rondas': self.rounds, 'bloques': self.blocks,
+            'pasadas': {name: {'eliminadas': removed, 'cambios': changes, 'ms': round(seconds * 1000, 3)}
+                        for name, (removed, changes, seconds) in self.passes.items()},
+        }
+
+    def format(self):
+        lines = [f"{'Pasada':<26}{'Elim.':>7}{'Cambios':>9}{'ms':>9}"]
+        for name, (removed, changes, seconds) in self.passes.items():
+            lines.append(f"{name:<26}{removed:>7}{changes:>9}{seconds * 1000:>9.2f}")
+        reduction = 100 * (self.before - self.after) / self.before if self.before else 0
+        lines.append("")
+        lines.append(f"Cuádruplos: {self.before} -> {self.after} ({reduction:.1f}% menos)")
+        lines.append(f"Bloques básicos: {self.blocks}   Rondas: {self.rounds}")
+        return '\n'.join(lines)
+
+
+def optimize(code, max_rounds=8):
+    '''Optimiza una copia del código; devuelve (código, OptimizationStats)'''
+    code = code.copy()
+    stats = OptimizationStats(len(code))
+    for _ in range(max_rounds):
+        stats.rounds += 1
+        changed = False
+        for name, run in PASSES:
+            before = len(code)
+            start = time.perf_counter()
+            changes = run(code)
+            stats.record(name, before - len(code), changes, time.perf_counter() - start)
+            changed = changed or changes or len(code) != before
+        if not changed:
+            break
+    stats.after = len(code)
+    stats.blocks = len(FlowGraph(code))
+    return code, stats
@@ -0,0 +1,215 @@
+'''Mediciones de rendimiento del compilador y del IDE.
+
+METRICS acumula por nombre cuántas veces se ejecutó una operación, su
+tiempo total, máximo y último, y contadores propios (tokens, etiquetas,
+líneas) de los que se calcula un ritmo por segundo. Cada medición cuesta
+dos llamadas a perf_counter y un candado, así que está activa siempre;
+las fases del compilador miden desde el hilo del compilador y el IDE
+desde el de Tk. La pestaña "Rendimiento" del IDE las muestra.
+
+capture() es la medición detallada, a pedido: ejecuta una función bajo
+cProfile y tracemalloc, y Capture.dump() exporta el perfil a un .prof
+(que se abre con python -m pstats o snakeviz) y la memoria a un
+.tracemalloc (tracemalloc.Snapshot.load).
+'''
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Marcos de pila que guarda tracemalloc por asignación en capture()
+TRACE_FRAMES = 10
+
+
+class Measure:
+    '''Estadísticas acumuladas de una operación'''
+
+    __slots__ = ('name', 'calls', 'total', 'last', 'max', 'counters')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self.counters = {}
+
+    @property
+    def mean(self):
+        return self.total / self.calls if self.calls else 0.0
+
+    def rates(self):
+        '''{contador: cantidad por segundo}'''
+        if not self.total:
+            return {}
+        return {name: value / self.total for name, value in self.counters.items()}
+
+    def copy(self):
+        other = Measure(self.name)
+        other.calls, other.total, other.last, other.max = self.calls, self.total, self.last, self.max
+        other.counters = dict(self.counters)
+        return other
+
+
+class _Timer:
+    '''Contexto de METRICS.measure(): mide el bloque y junta sus contadores.
+
+    Si el bloque termina con una excepción no se registra nada.
+    '''
+
+    __slots__ = ('metrics', 'name', 'counters', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.counters = {}
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.metrics.add(self.name, time.perf_counter() - self.start, self.counters)
+        return False
+
+
+class _NullTimer:
+    '''Contexto que no mide nada, para cuando las mediciones están desactivadas'''
+
+    def count(self, counter, amount=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    '''Mediciones por nombre, en el orden en que aparecen por primera vez.
+
+    version cambia con cada medición, para que quien las muestra sepa si
+    hay algo nuevo sin copiarlas.
+    '''
+
+    def __init__(self):
+        self.enabled = True
+        self.version = 0
+        self._lock = threading.Lock()
+        self._measures = {}
+
+    def measure(self, name):
+        '''with METRICS.measure(nombre) as timer: ...; timer.count('tokens', n)'''
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def add(self, name, seconds, counters=None):
+        '''Registra una ejecución de seconds segundos medida por fuera'''
+        if not self.enabled:
+            return
+        with self._lock:
+            measure = self._measures.get(name)
+            if measure is None:
+                measure = self._measures[name] = Measure(name)
+            measure.calls += 1
+            measure.total += seconds
+            measure.last = seconds
+            if seconds > measure.max:
+                measure.max = seconds
+            if counters:
+                totals = measure.counters
+                for counter, value in counters.items():
+                    totals[counter] = totals.get(counter, 0) + value
+            self.version += 1
+
+    def snapshot(self):
+        '''Copia de las mediciones, para leerlas sin el candado'''
+        with self._lock:
+            return [measure.copy() for measure in self._measures.values()]
+
+    def reset(self):
+        with self._lock:
+            self._measures.clear()
+            self.version += 1
+
+
+METRICS = Metrics()
+
+
+def format_rate(value):
+    '''1234567 -> "1.23 M"'''
+    for unit, size in (('G', 1e9), ('M', 1e6), ('K', 1e3)):
+        if value >= size:
+            return f"{value / size:.2f} {unit}"
+    return f"{value:.0f}"
+
+
+class Capture:
+    '''Perfil de cProfile y memoria de tracemalloc de una ejecución'''
+
+    def __init__(self, name, profile, snapshot, seconds, peak):
+        self.name = name
+        self.profile = profile
+        self.snapshot = snapshot
+        self.seconds = seconds
+        self.peak = peak
+
+    def report(self, limit=25):
+        '''Texto con las funciones más costosas y las líneas que más memoria asignaron'''
+        stream = io.StringIO()
+        stream.write(f"Perfil de {self.name}: {self.seconds * 1000:.1f} ms, "
+                     f"pico de memoria {self.peak // 1024} KB\n\n")
+        stream.write("=== Funciones por tiempo acumulado ===\n")
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        stream.write("=== Memoria asignada por línea ===\n")
+        for statistic in self.snapshot.statistics('lineno')[:limit // 2]:
+            stream.write(f"{statistic}\n")
+        return stream.getvalue()
+
+    def dump(self, path):
+        '''Guarda el perfil en path y la memoria junto a él; devuelve la ruta de la memoria'''
+        self.profile.dump_stats(path)
+        memory_path = os.path.splitext(path)[0] + '.tracemalloc'
+        self.snapshot.dump(memory_path)
+        return memory_path
+
+
+def capture(name, function, *args):
+    '''Ejecuta function(*args) bajo cProfile y tracemalloc y devuelve un Capture.
+
+    cProfile solo perfila el hilo que llama; tracemalloc es global, así que
+    la memoria incluye lo que otros hilos asignen mientras tanto.
+    '''
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    try:
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            function(*args)
+        finally:
+            profile.disable()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ))
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return Capture(name, profile, snapshot, seconds, peak)
@@ -0,0 +1,98 @@
+import re
+from bisect import bisect_right
+from lexico import lexer, reserved
+from mapa_fuente import SourceMap
+
+# Etiqueta del editor que corresponde a cada tipo de token de lexico.py
+TAGS = {
+    'NUMBER': 'NUMBER', 'REAL': 'REAL', 'ID': 'ID', 'ERROR': 'ERROR',
+    'PLUS': 'OPERATOR', 'MINUS': 'OPERATOR', 'TIMES': 'OPERATOR', 'DIVIDE': 'OPERATOR',
+    'MODULO': 'OPERATOR', 'POWER': 'OPERATOR', 'INCREMENT': 'OPERATOR', 'DECREMENT': 'OPERATOR',
+    'LT': 'RELATIONAL', 'LE': 'RELATIONAL', 'GT': 'RELATIONAL', 'GE': 'RELATIONAL',
+    'NE': 'RELATIONAL', 'EEQ': 'RELATIONAL',
+    'AND': 'LOGICAL', 'OR': 'LOGICAL', 'NOT': 'LOGICAL',
+    'LPAREN': 'SYMBOL', 'RPAREN': 'SYMBOL', 'LBRACE': 'SYMBOL', 'RBRACE': 'SYMBOL',
+    'COMMA': 'SYMBOL', 'SEMICOLON': 'SYMBOL',
+    'EQ': 'ASSIGN', 'ASSIGN': 'ASSIGN',
+}
+for _type in reserved.values():
+    TAGS[_type] = 'RESERVED'
+
+# Todas las etiquetas que maneja el resaltador
+HIGHLIGHT_TAGS = ('NUMBER', 'REAL', 'ID', 'COMMENT', 'RESERVED', 'OPERATOR',
+                  'RELATIONAL', 'LOGICAL', 'SYMBOL', 'ASSIGN', 'ERROR')
+
+# Comentarios: de línea, de bloque cerrado y de bloque sin cerrar
+_comment_re = re.compile(r'(//[^\n]*)|(/\*[\s\S]*?\*/)|(/\*[\s\S]*)')
+
+# Copia propia del lexer para no alterar el estado del lexer del compilador
+_lexer = lexer.clone()
+
+
+def lex_region(text, in_comment=False):
+    '''Tokeniza un bloque de líneas en una sola pasada del lexer.
+
+    in_comment indica si el bloque empieza dentro de un comentario /* */.
+    Devuelve (spans, states): spans es una lista de
+    (etiqueta, línea, columna_inicio, columna_fin) con la línea relativa al
+    bloque (desde 0) y states indica, por línea, si termina dentro de un
+    comentario /* */.
+    '''
+    starts = SourceMap(text).starts
+    states = [False] * len(starts)
+    spans = []
+
+    def add_comment(start, end, closed):
+        first = bisect_right(starts, start) - 1
+        if closed:
+            last = bisect_right(starts, end - 1) - 1
+        else:
+            last = len(starts) - 1
+        for line in range(first, last + 1):
+            line_end = starts[line + 1] - 1 if line + 1 < len(starts) else len(text)
+            col_start = start - starts[line] if line == first else 0
+            col_end = end - starts[line] if line == last else line_end - starts[line]
+            if col_end > col_start:
+                spans.append(('COMMENT', line, col_start, col_end))
+            if line < last or not closed:
+                states[line] = True
+
+    def lex_segment(start, end):
+        if start >= end or text[start:end].isspace():
+            return
+        _lexer.input(text[start:end])
+        line = bisect_right(starts, start) - 1
+        while True:
+            tok = _lexer.token()
+            if not tok:
+                break
+            tag = TAGS.get(tok.type)
+            if not tag:
+                continue
+            # Los tokens nunca cruzan un salto de línea; avanzar la línea
+            pos = start + tok.lexpos
+            while line + 1 < len(starts) and starts[line + 1] <= pos:
+                line += 1
+            # lexpos del lexer queda justo al final del token
+            spans.append((tag, line, pos - starts[line], start + _lexer.lexpos - starts[line]))
+
+    pos = 0
+    if in_comment:
+        end = text.find('*/')
+        pos = len(text) if end == -1 else end + 2
+        add_comment(0, pos, end != -1)
+
+    for m in _comment_re.finditer(text, pos):
+        lex_segment(pos, m.start())
+        add_comment(m.start(), m.end(), m.lastindex != 3)
+        pos = m.end()
+    lex_segment(pos, len(text))
+    return spans, states
+
+
+def ends_in_comment(text):
+    '''Indica si el texto termina dentro de un comentario /* */ sin cerrar'''
+    m = None
+    for m in _comment_re.finditer(text):
+        pass
+    return m is not None and m.lastindex == 3
@@ -1,25 +1,201 @@
 # semantico.py
-symbol_table = {}
-
-def check_semantics(tokens):
-    errors = []
-    for token in tokens:
-        if token.type == 'ID':
-            if token.value not in symbol_table:
-                errors.append(f"Error semántico: Variable '{token.value}' no declarada")
-            else:
-                print(f"Variable '{token.value}' declarada correctamente")
-    return errors
+import arbol
+from tipos import check_types
+
+
+class Symbol:
+    __slots__ = ('name', 'type', 'level', 'address', 'lineno', 'lines')
+
+    def __init__(self, name, type, level, address, lineno):
+        self.name = name
+        self.type = type
+        self.level = level
+        self.address = address
+        self.lineno = lineno
+        self.lines = []
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.type!r}, nivel={self.level}, dir={self.address})"
+
+
+class SymbolTable:
+    '''Tabla de símbolos con ámbitos anidados.
+
+    _index asocia cada nombre con la pila de sus declaraciones visibles (la
+    más interna al final), así que lookup() es una sola consulta al dict sin
+    recorrer la cadena de ámbitos. Al cerrar un ámbito se quitan de esas
+    pilas los nombres que declaró. symbols conserva todas las declaraciones
+    en orden para mostrarlas al terminar el análisis.
+    '''
+
+    def __init__(self):
+        self._index = {}
+        self._scopes = [[]]
+        self.symbols = []
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    @property
+    def level(self):
+        return len(self._scopes) - 1
+
+    def enter_scope(self):
+        self._scopes.append([])
+
+    def exit_scope(self):
+        for name in self._scopes.pop():
+            stack = self._index[name]
+            stack.pop()
+            if not stack:
+                del self._index[name]
+
+    def lookup(self, name):
+        '''Declaración visible de name o None'''
+        stack = self._index.get(name)
+        return stack[-1] if stack else None
+
+    def declare(self, name, type, lineno):
+        '''Declara name en el ámbito actual.
+
+        Devuelve (símbolo, nuevo); si ya estaba declarado en este mismo
+        ámbito se devuelve la declaración anterior y nuevo es False.
+        '''
+        current = self.lookup(name)
+        if current is not None and current.level == self.level:
+            return current, False
+        symbol = Symbol(name, type, self.level, len(self.symbols), lineno)
+        self.symbols.append(symbol)
+        self._index.setdefault(name, []).append(symbol)
+        self._scopes[-1].append(name)
+        return symbol, True
+
+    def dump(self):
+        '''Texto de la tabla con una fila por declaración'''
+        rows = [f"{'Nombre':<16}{'Tipo':<8}{'Nivel':>6}{'Dir':>6}{'Decl':>7}  Usos"]
+        for symbol in self.symbols:
+            lines = ', '.join(map(str, symbol.lines))
+            rows.append(f"{symbol.name:<16}{symbol.type:<8}{symbol.level:>6}{symbol.address:>6}"
+                        f"{symbol.lineno:>7}  {lines}")
+        return '\n'.join(rows)
+
+
+class SemanticChecker:
+    '''Recorre el AST una sola vez llenando la tabla de símbolos.
+
+    Los bloques abren ámbitos, las declaraciones agregan símbolos y cada uso
+    de una variable se resuelve en el punto donde aparece.
+    '''
+
+    def __init__(self):
+        self.table = SymbolTable()
+        self.errors = []
+
+    def check(self, node):
+        getattr(self, f"_{type(node).__name__}")(node)
+
+    def _use(self, node):
+        '''Resuelve el nombre de node y lo enlaza con su Symbol'''
+        symbol = node.symbol = self.table.lookup(node.name)
+        if symbol is None:
+            self.errors.append(f"Error semántico: Variable '{node.name}' no declarada (línea {node.lineno})")
+        else:
+            symbol.lines.append(node.lineno)
+
+    def _expr(self, node):
+        # Las expresiones se recorren sin recursión: pueden ser muy profundas
+        for child in arbol.walk(node):
+            if type(child) is arbol.Var:
+                self._use(child)
+
+    def _Program(self, node):
+        # El bloque de main es el ámbito global (nivel 0)
+        for statement in node.body.statements:
+            self.check(statement)
+
+    def _Block(self, node):
+        self.table.enter_scope()
+        for statement in node.statements:
+            self.check(statement)
+        self.table.exit_scope()
+
+    def _Declaration(self, node):
+        for name in node.names:
+            symbol, new = self.table.declare(name, node.type, node.lineno)
+            if not new:
+                self.errors.append(f"Error semántico: Variable '{name}' ya declarada en la línea "
+                                   f"{symbol.lineno} (línea {node.lineno})")
+
+    def _Assign(self, node):
+        self._expr(node.expr)
+        self._use(node)
+
+    def _IncDec(self, node):
+        self._use(node)
+
+    def _Cin(self, node):
+        self._use(node)
+
+    def _Cout(self, node):
+        self._expr(node.expr)
+
+    def _If(self, node):
+        self._expr(node.cond)
+        self.check(node.then)
+        if node.orelse is not None:
+            self.check(node.orelse)
+
+    def _While(self, node):
+        self._expr(node.cond)
+        self.check(node.body)
+
+    def _DoUntil(self, node):
+        self.check(node.body)
+        self._expr(node.cond)
+
+    def _Switch(self, node):
+        self._expr(node.expr)
+        for case in node.cases:
+            self.check(case.body)
+        if node.default is not None:
+            self.check(node.default)
+
+
+def check_semantics(ast):
+    '''Analiza una copia del AST; devuelve (tabla de símbolos, errores, AST comprobado).
+
+    Primero se resuelven los nombres y después tipos.check_types comprueba
+    los tipos y pliega las constantes de la copia. El árbol del parser no
+    se modifica, así que se puede mostrar o volver a analizar.
+    '''
+    checker = SemanticChecker()
+    if ast is None:
+        return checker.table, checker.errors, None
+    ast = arbol.copy(ast)
+    checker.check(ast)
+    type_errors, folded = check_types(ast)
+    return checker.table, checker.errors + type_errors, ast
 
 # Función para probar el análisis semántico
 def test_semantics(input_text):
-    from lexico import test_lexer
-    tokens = test_lexer(input_text)
-    return check_semantics(tokens)
-# 
+    from sintactico import parse
+    ast, errors = parse(input_text)
+    return check_semantics(ast)
+#
 # Prueba del análisis semántico
 if __name__ == "__main__":
-    data = "x + y * (10 - 4)"
-    errors = test_semantics(data)
+    data = """main {
+  int x, y;
+  x = y * (10 - 4);
+  { float x; x = z; }
+  int x;
+  x = 2 * 3 + y / (4 - 4);
+  if x then cout 1.5 * 2; end
+}"""
+    table, errors, ast = test_semantics(data)
+    print(table.dump())
     for error in errors:
-        print(error)
\ No newline at end of file
+        print(error)
@@ -1,59 +1,265 @@
+import hashlib
+import os
+import sys
+import threading
 import ply.yacc as yacc
-from lexico import tokens, lexer
+from lexico import tokens
+from buffer_tokens import TokenBuffer
+import arbol
+
+# Precedencia de operadores, de menor a mayor
+precedence = (
+    ('left', 'OR'),
+    ('left', 'AND'),
+    ('right', 'NOT'),
+    ('nonassoc', 'LT', 'LE', 'GT', 'GE', 'NE', 'EEQ'),
+    ('left', 'PLUS', 'MINUS'),
+    ('left', 'TIMES', 'DIVIDE', 'MODULO'),
+    ('right', 'UMINUS'),
+    ('right', 'POWER'),
+)
 
 # Definición de la gramática
-def p_expression_plus(p):
-    'expression : expression PLUS term'
-    p[0] = p[1] + p[3]
+def p_program(p):
+    'program : MAIN LBRACE stmt_list RBRACE'
+    p[0] = arbol.Program(arbol.Block(p[3], p.lineno(2)), p.lineno(1))
+
+def p_program_error(p):
+    'program : MAIN LBRACE stmt_list error RBRACE'
+    p[0] = arbol.Program(arbol.Block(p[3], p.lineno(2)), p.lineno(1))
+
+def p_stmt_list(p):
+    'stmt_list : stmt_list stmt'
+    p[0] = p[1]
+    if p[2] is not None:
+        p[0].append(p[2])
 
-def p_expression_minus(p):
-    'expression : expression MINUS term'
-    p[0] = p[1] - p[3]
+def p_stmt_list_empty(p):
+    'stmt_list : '
+    p[0] = []
 
-def p_expression_term(p):
-    'expression : term'
+def p_stmt(p):
+    '''stmt : declaration
+            | assignment
+            | if_stmt
+            | while_stmt
+            | do_stmt
+            | switch_stmt
+            | cin_stmt
+            | cout_stmt
+            | block'''
     p[0] = p[1]
 
-def p_term_times(p):
-    'term : term TIMES factor'
-    p[0] = p[1] * p[3]
+def p_stmt_error(p):
+    'stmt : error SEMICOLON'
+    # Recuperación: se descarta la sentencia hasta el siguiente ';'
+    p[0] = None
 
-def p_term_div(p):
-    'term : term DIVIDE factor'
-    if p[3] == 0:
-        raise ValueError("División por cero")
-    p[0] = p[1] / p[3]
+def p_block(p):
+    'block : LBRACE stmt_list RBRACE'
+    p[0] = arbol.Block(p[2], p.lineno(1))
 
-def p_term_factor(p):
-    'term : factor'
+def p_block_error(p):
+    'block : LBRACE stmt_list error RBRACE'
+    p[0] = arbol.Block(p[2], p.lineno(1))
+
+def p_declaration(p):
+    '''declaration : INT id_list SEMICOLON
+                   | FLOAT id_list SEMICOLON'''
+    p[0] = arbol.Declaration(p[1], p[2], p.lineno(1))
+
+def p_id_list(p):
+    'id_list : id_list COMMA ID'
     p[0] = p[1]
+    p[0].append(p[3])
+
+def p_id_list_single(p):
+    'id_list : ID'
+    p[0] = [p[1]]
+
+def p_assignment(p):
+    '''assignment : ID EQ expr SEMICOLON
+                  | ID ASSIGN expr SEMICOLON'''
+    p[0] = arbol.Assign(p[1], p[3], p.lineno(1))
 
-def p_factor_num(p):
-    'factor : NUMBER'
+def p_assignment_incdec(p):
+    '''assignment : ID INCREMENT SEMICOLON
+                  | ID DECREMENT SEMICOLON'''
+    p[0] = arbol.IncDec(p[1], p[2], p.lineno(1))
+
+def p_if(p):
+    'if_stmt : IF expr THEN stmt_list END'
+    p[0] = arbol.If(p[2], arbol.Block(p[4], p.lineno(3)), None, p.lineno(1))
+
+def p_if_else(p):
+    'if_stmt : IF expr THEN stmt_list ELSE stmt_list END'
+    p[0] = arbol.If(p[2], arbol.Block(p[4], p.lineno(3)), arbol.Block(p[6], p.lineno(5)), p.lineno(1))
+
+def p_while(p):
+    'while_stmt : WHILE expr block'
+    p[0] = arbol.While(p[2], p[3], p.lineno(1))
+
+def p_do(p):
+    '''do_stmt : DO stmt_list UNTIL expr
+               | DO stmt_list UNTIL expr SEMICOLON'''
+    p[0] = arbol.DoUntil(arbol.Block(p[2], p.lineno(1)), p[4], p.lineno(1))
+
+def p_switch(p):
+    'switch_stmt : SWITCH expr LBRACE case_list RBRACE'
+    p[0] = arbol.Switch(p[2], p[4], None, p.lineno(1))
+
+def p_switch_default(p):
+    'switch_stmt : SWITCH expr LBRACE case_list ELSE stmt_list RBRACE'
+    p[0] = arbol.Switch(p[2], p[4], arbol.Block(p[6], p.lineno(5)), p.lineno(1))
+
+def p_case_list(p):
+    'case_list : case_list case'
     p[0] = p[1]
+    p[0].append(p[2])
+
+def p_case_list_empty(p):
+    'case_list : '
+    p[0] = []
 
-def p_factor_expr(p):
-    'factor : LPAREN expression RPAREN'
+def p_case(p):
+    '''case : CASE NUMBER stmt_list
+            | CASE REAL stmt_list'''
+    p[0] = arbol.Case(arbol.Num(p[2], p.lineno(2)), arbol.Block(p[3], p.lineno(1)), p.lineno(1))
+
+def p_cin(p):
+    'cin_stmt : CIN ID SEMICOLON'
+    p[0] = arbol.Cin(p[2], p.lineno(1))
+
+def p_cout(p):
+    'cout_stmt : COUT expr SEMICOLON'
+    p[0] = arbol.Cout(p[2], p.lineno(1))
+
+def p_expr_binop(p):
+    '''expr : expr PLUS expr
+            | expr MINUS expr
+            | expr TIMES expr
+            | expr DIVIDE expr
+            | expr MODULO expr
+            | expr POWER expr
+            | expr LT expr
+            | expr LE expr
+            | expr GT expr
+            | expr GE expr
+            | expr NE expr
+            | expr EEQ expr
+            | expr AND expr
+            | expr OR expr'''
+    p[0] = arbol.BinOp(p[2], p[1], p[3], p.lineno(2))
+
+def p_expr_not(p):
+    'expr : NOT expr'
+    p[0] = arbol.UnaryOp(p[1], p[2], p.lineno(1))
+
+def p_expr_sign(p):
+    '''expr : MINUS expr %prec UMINUS
+            | PLUS expr %prec UMINUS'''
+    p[0] = arbol.UnaryOp(p[1], p[2], p.lineno(1))
+
+def p_expr_group(p):
+    'expr : LPAREN expr RPAREN'
     p[0] = p[2]
 
-def p_factor_id(p):
-    'factor : ID'
-    # Aquí podrías buscar el valor de la variable en la tabla de símbolos
-    p[0] = 0  # Valor por defecto para identificadores no declarados
+def p_expr_number(p):
+    '''expr : NUMBER
+            | REAL'''
+    p[0] = arbol.Num(p[1], p.lineno(1))
+
+def p_expr_id(p):
+    'expr : ID'
+    p[0] = arbol.Var(p[1], p.lineno(1))
+
+# Manejo de errores sintácticos: se acumulan en la lista del análisis en curso
+_errors = []
 
-# Manejo de errores sintácticos
 def p_error(p):
-    print(f"Error de sintaxis en '{p.value}'")
+    if p is None:
+        _errors.append("Error de sintaxis: fin de archivo inesperado")
+    else:
+        _errors.append(f"Error de sintaxis en '{p.value}' (línea {p.lineno})")
+
+# Tablas LALR en caché: se generan una vez por versión de la gramática y se
+# cargan sin regenerarlas ni escribir parsetab.py/parser.out
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'compilador')
+
+def grammar_hash():
+    '''Huella de la gramática: tokens, precedencia y reglas p_*'''
+    module = sys.modules[__name__]
+    digest = hashlib.sha256(yacc.__version__.encode())
+    digest.update(' '.join(tokens).encode())
+    digest.update(repr(getattr(module, 'precedence', ())).encode())
+    for name in sorted(dir(module)):
+        func = getattr(module, name)
+        if name.startswith('p_') and name != 'p_error' and callable(func):
+            digest.update(f"{name}:{func.__doc__}".encode())
+    return digest.hexdigest()[:16]
+
+def table_path():
+    return os.path.join(cache_dir(), f"parsetab-{grammar_hash()}.pickle")
+
+def build_tables(path=None):
+    '''Genera las tablas LALR y las guarda en la caché (escritura atómica)'''
+    path = path or table_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    built = yacc.yacc(module=sys.modules[__name__], debug=False, picklefile=tmp)
+    os.replace(tmp, path)
+    return built
+
+def load_parser():
+    '''Carga el parser desde la caché o, si no existe, genera las tablas'''
+    path = table_path()
+    if os.path.exists(path):
+        try:
+            return yacc.yacc(module=sys.modules[__name__], debug=False, picklefile=path)
+        except Exception:
+            pass
+    try:
+        return build_tables(path)
+    except OSError:
+        # Caché no disponible: usar las tablas solo en memoria
+        return yacc.yacc(module=sys.modules[__name__], debug=False, write_tables=False)
 
 # Construir el parser
-parser = yacc.yacc()
+parser = load_parser()
+
+# El parser de PLY guarda su estado en la instancia: un análisis a la vez
+_lock = threading.Lock()
+
+def parse(source):
+    '''Analiza un texto o un TokenBuffer y devuelve (ast, errores).
+
+    ast es None si el programa no pudo reconocerse; los errores son
+    mensajes con la línea del token donde se detectaron.
+    '''
+    buffer = source if isinstance(source, TokenBuffer) else TokenBuffer.from_text(source)
+    with _lock:
+        del _errors[:]
+        ast = parser.parse(lexer=buffer.lexer())
+        return ast, list(_errors)
 
 # Función para probar el parser
 def test_parser(input_text):
-    return parser.parse(input_text)
+    return parse(input_text)
 
 # Prueba del parser
 if __name__ == "__main__":
-    data = "3 + 5 * (10 - 4)"
-    result = test_parser(data)
-    print(f"Resultado: {result}")
\ No newline at end of file
+    if '--generar-tablas' in sys.argv:
+        build_tables()
+        print(f"Tablas generadas en {table_path()}")
+        sys.exit(0)
+    data = """main {
+  int x, y;
+  x = 3 + 5 * (10 - 4);
+  while x > 0 { cout x; x--; }
+}"""
+    ast, errors = test_parser(data)
+    print(arbol.dump(ast) if ast else "Sin árbol")
+    for error in errors:
+        print(error)
@@ -0,0 +1,315 @@
+'''Tabla de tokens virtualizada para el panel léxico.
+
+Un ttk.Treeview con un elemento por token tarda segundos en llenarse con
+decenas de miles de tokens y guarda una copia de cada valor. TokenTable
+solo crea tantas filas como caben en pantalla y, al desplazarse, les
+cambia los valores leyéndolos del TokenBuffer; la barra de desplazamiento
+representa la lista completa. Con un millón de tokens mostrar el
+resultado, filtrar por tipo o saltar a un token no depende del total.
+'''
+import bisect
+import collections
+import tkinter as tk
+from tkinter import ttk
+from lexico import tokens as TOKEN_TYPES
+
+ALL = "Todos"
+COLUMNS = ("N°", "Lexema", "Token", "Línea", "Columna")
+
+
+class TokenRows:
+    '''Filas visibles según el filtro: posición en la tabla -> índice de token.
+
+    Sin filtro las filas son range(len(buffer)) y no se guarda nada; con
+    filtro se calcula una vez el array de índices de ese tipo.
+    '''
+
+    def __init__(self, buffer=None):
+        self.buffer = buffer
+        self.type = None
+        self.rows = range(len(buffer) if buffer is not None else 0)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, position):
+        return self.rows[position]
+
+    def counts(self):
+        '''[(tipo, cantidad)] de los tipos presentes, en orden de lexico.tokens'''
+        if self.buffer is None:
+            return []
+        counter = collections.Counter(self.buffer.kinds)
+        return [(TOKEN_TYPES[code], counter[code]) for code in sorted(counter)]
+
+    def filter(self, type_name=None):
+        self.type = type_name
+        if self.buffer is None:
+            self.rows = range(0)
+        elif type_name is None:
+            self.rows = range(len(self.buffer))
+        else:
+            rows = self._cache.get(type_name)
+            if rows is None:
+                rows = self._cache[type_name] = self.buffer.indices_of(type_name)
+            self.rows = rows
+
+    def position(self, index):
+        '''Fila del token index, o None si el filtro no lo incluye'''
+        if isinstance(self.rows, range):
+            return index if 0 <= index < len(self.rows) else None
+        position = bisect.bisect_left(self.rows, index)
+        if position < len(self.rows) and self.rows[position] == index:
+            return position
+        return None
+
+    def values(self, position):
+        '''Valores de las columnas para una fila'''
+        buffer = self.buffer
+        index = self.rows[position]
+        line, column = buffer.source_map.position(buffer.offsets[index])
+        return (index + 1, buffer.lexeme(index), buffer.type(index), line, column)
+
+
+class TokenTable(tk.Frame):
+    '''Tabla de tokens que solo dibuja las filas visibles.
+
+    El Treeview tiene un conjunto fijo de elementos, uno por fila en
+    pantalla, y first es la fila de la lista que ocupa el primero. La
+    selección se guarda como posición en la lista (selected) para que
+    sobreviva al desplazamiento. on_activate(índice) se llama con doble
+    clic o Enter sobre un token.
+    '''
+
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, on_activate=None, **kwargs):
+        tk.Frame.__init__(self, parent, **kwargs)
+        self.on_activate = on_activate
+        self.data = TokenRows()
+        self.first = 0
+        self.selected = None
+        self._items = []
+        self._syncing = False
+        self._row_height = 20
+        self._header_height = 25
+
+        # Filtro por tipo y salto a un número de token
+        bar = tk.Frame(self)
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew")
+        tk.Label(bar, text="Tipo:").pack(side=tk.LEFT, padx=2)
+        self.type_filter = ttk.Combobox(bar, state="readonly", width=22, values=(ALL,))
+        self.type_filter.set(ALL)
+        self.type_filter.pack(side=tk.LEFT, padx=2, pady=2)
+        self.type_filter.bind("<<ComboboxSelected>>", self._on_filter)
+        tk.Label(bar, text="Ir al token:").pack(side=tk.LEFT, padx=2)
+        self.jump_entry = tk.Entry(bar, width=10)
+        self.jump_entry.pack(side=tk.LEFT, padx=2)
+        self.jump_entry.bind("<Return>", self._on_jump)
+        self.count_label = tk.Label(bar, text="", anchor=tk.W)
+        self.count_label.pack(side=tk.LEFT, padx=6)
+
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", selectmode="browse")
+        for name, width in zip(COLUMNS, (70, 150, 120, 60, 70)):
+            self.tree.column(name, width=width, anchor=tk.W, stretch=tk.YES)
+            self.tree.heading(name, text=name.upper(), anchor=tk.W)
+        self.tree.tag_configure("ERROR", foreground="red")
+
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.vsb.grid(row=1, column=1, sticky="ns")
+        hsb.grid(row=2, column=0, sticky="ew")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Double-1>", self._on_activate)
+        self.tree.bind("<Return>", self._on_activate)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_mousewheel)
+        for key, delta in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                           ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda event, delta=delta: self._on_key(delta))
+
+    # Datos
+    def set_tokens(self, buffer):
+        '''Muestra los tokens de un TokenBuffer; conserva el filtro si el tipo sigue presente'''
+        self.data = TokenRows(buffer)
+        counts = self.data.counts()
+        self.type_filter.configure(values=[ALL] + [f"{name} ({count})" for name, count in counts])
+        previous = self._type_of_choice(self.type_filter.get())
+        if previous is not None and previous in dict(counts):
+            self.data.filter(previous)
+            self.type_filter.set(f"{previous} ({dict(counts)[previous]})")
+        else:
+            self.type_filter.set(ALL)
+        self.first = 0
+        self.selected = None
+        self.refresh()
+
+    def clear(self):
+        self.data = TokenRows()
+        self.type_filter.configure(values=(ALL,))
+        self.type_filter.set(ALL)
+        self.first = 0
+        self.selected = None
+        self.refresh()
+
+    @staticmethod
+    def _type_of_choice(choice):
+        '''Tipo de token de una opción del filtro ("ERROR (3)" -> "ERROR")'''
+        return None if choice == ALL else choice.split(" ", 1)[0]
+
+    def filter(self, type_name=None):
+        '''Muestra solo los tokens de type_name (None = todos)'''
+        index = self.data[self.selected] if self.selected is not None else None
+        self.data.filter(type_name)
+        self.first = 0
+        self.selected = None
+        if index is not None:
+            position = self.data.position(index)
+            if position is not None:
+                self.selected = position
+                self.first = position
+        self.refresh()
+
+    def jump(self, index):
+        '''Selecciona el token index (desde 0) y lo deja a la vista'''
+        if self.data.buffer is None or not 0 <= index < len(self.data.buffer):
+            return False
+        position = self.data.position(index)
+        if position is None:
+            # El filtro lo oculta: volver a mostrar todos los tokens
+            self.type_filter.set(ALL)
+            self.data.filter(None)
+            position = index
+        self.selected = position
+        self.first = position - len(self._items) // 2
+        self.refresh()
+        return True
+
+    # Desplazamiento
+    @property
+    def visible_rows(self):
+        return len(self._items)
+
+    def _clamp(self):
+        self.first = max(0, min(self.first, len(self.data) - self.visible_rows))
+
+    def yview(self, *args):
+        '''Comando de la barra de desplazamiento sobre la lista virtual'''
+        total = len(self.data)
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.first += step * max(1, self.visible_rows - 1) if args[2] == "pages" else step
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.first -= self.WHEEL_ROWS
+        else:
+            self.first += self.WHEEL_ROWS
+        self.refresh()
+        return "break"
+
+    def _on_key(self, delta):
+        total = len(self.data)
+        if not total:
+            return "break"
+        current = self.selected if self.selected is not None else self.first
+        page = max(1, self.visible_rows - 1)
+        target = {"page": current + page, "-page": current - page, "home": 0, "end": total - 1}.get(delta)
+        if target is None:
+            target = current + delta
+        self.selected = max(0, min(total - 1, target))
+        # Desplazar lo justo para que la selección quede a la vista
+        if self.selected < self.first:
+            self.first = self.selected
+        elif self.selected >= self.first + self.visible_rows:
+            self.first = self.selected - self.visible_rows + 1
+        self.refresh()
+        return "break"
+
+    def _on_configure(self, event=None):
+        items = self.tree.get_children()
+        if items:
+            box = self.tree.bbox(items[0])
+            if box:
+                self._header_height, self._row_height = box[1], box[3]
+        rows = max(1, (self.tree.winfo_height() - self._header_height) // self._row_height)
+        if rows != len(self._items):
+            self._resize(rows)
+            self.refresh()
+
+    def _resize(self, rows):
+        while len(self._items) < rows:
+            self._items.append(self.tree.insert("", tk.END, values=("",) * len(COLUMNS)))
+        if len(self._items) > rows:
+            self.tree.delete(*self._items[rows:])
+            del self._items[rows:]
+
+    # Dibujo
+    def refresh(self):
+        '''Escribe en las filas del Treeview los tokens de first en adelante'''
+        self._clamp()
+        data, tree = self.data, self.tree
+        total = len(data)
+        selected_item = None
+        for offset, item in enumerate(self._items):
+            position = self.first + offset
+            if position < total:
+                values = data.values(position)
+                tree.item(item, values=values, tags=(values[2],))
+                if position == self.selected:
+                    selected_item = item
+            else:
+                tree.item(item, values=("",) * len(COLUMNS), tags=())
+        # Reflejar self.selected sin que _on_select lo vuelva a cambiar
+        self._syncing = True
+        if selected_item:
+            tree.selection_set(selected_item)
+            tree.focus(selected_item)
+        else:
+            tree.selection_set(())
+        self._syncing = False
+        if total:
+            self.vsb.set(self.first / total, min(1.0, (self.first + self.visible_rows) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+        shown = f"{total} de {len(data.buffer)} tokens" if data.type else f"{total} tokens"
+        self.count_label.config(text=shown if data.buffer is not None else "")
+
+    # Eventos
+    def _on_filter(self, event=None):
+        self.filter(self._type_of_choice(self.type_filter.get()))
+
+    def _on_jump(self, event=None):
+        try:
+            number = int(self.jump_entry.get())
+        except ValueError:
+            self.bell()
+            return "break"
+        if not self.jump(number - 1):
+            self.bell()
+        return "break"
+
+    def _on_select(self, event=None):
+        if self._syncing:
+            return
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            position = self.first + self._items.index(selection[0])
+            if position < len(self.data):
+                self.selected = position
+
+    def _on_activate(self, event=None):
+        if self.on_activate is not None and self.selected is not None:
+            self.on_activate(self.data[self.selected])
+        return "break"
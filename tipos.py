@@ -0,0 +1,288 @@
+'''Comprobación de tipos y plegado de constantes sobre el AST.
+
+Se ejecuta después de resolver los nombres (semantico.SemanticChecker), así
+que cada Var ya tiene su Symbol. Anota el tipo de cada expresión ('int',
+'float' o 'bool') y reemplaza las subexpresiones constantes por su valor,
+de modo que el código intermedio y la ejecución no las recalculan.
+'''
+import math
+import arbol
+
+# Rango de int: entero con signo de 32 bits
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+ARITHMETIC = {'+', '-', '*', '/', '%', '^'}
+RELATIONAL = {'<', '<=', '>', '>=', '!=', '=='}
+LOGICAL = {'&&', '||'}
+NUMERIC = {'int', 'float'}
+
+
+class ConstantError(Exception):
+    '''Error al evaluar una expresión constante'''
+
+
+def int_div(a, b):
+    '''División entera truncada hacia cero, como en C'''
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def evaluate(op, a, b, type):
+    '''Resultado de a op b con la semántica del lenguaje para el tipo dado.
+
+    Lanza ConstantError con el motivo si la operación no tiene resultado
+    representable (división entre cero o desbordamiento).
+    '''
+    try:
+        if op == '+':
+            result = a + b
+        elif op == '-':
+            result = a - b
+        elif op == '*':
+            result = a * b
+        elif op == '/':
+            if b == 0:
+                raise ConstantError("división entre cero")
+            result = int_div(a, b) if type == 'int' else a / b
+        elif op == '%':
+            if b == 0:
+                raise ConstantError("módulo entre cero")
+            result = a - b * int_div(a, b)
+        elif op == '^':
+            if type == 'int':
+                if b < 0:
+                    if a == 0:
+                        raise ConstantError("división entre cero")
+                    result = int(a ** b)
+                elif abs(a) > 1 and b > 64:
+                    raise ConstantError("desbordamiento de entero")
+                else:
+                    result = a ** b
+            else:
+                result = float(a) ** b
+                if isinstance(result, complex):
+                    raise ConstantError("potencia sin resultado real")
+        elif op == '<':
+            return a < b
+        elif op == '<=':
+            return a <= b
+        elif op == '>':
+            return a > b
+        elif op == '>=':
+            return a >= b
+        elif op == '!=':
+            return a != b
+        elif op == '==':
+            return a == b
+        elif op == '&&':
+            return a and b
+        else:
+            return a or b
+    except (OverflowError, ZeroDivisionError) as e:
+        raise ConstantError("desbordamiento de real" if isinstance(e, OverflowError) else "división entre cero")
+    if type == 'int' and not INT_MIN <= result <= INT_MAX:
+        raise ConstantError("desbordamiento de entero")
+    if type == 'float' and math.isinf(result):
+        raise ConstantError("desbordamiento de real")
+    return result
+
+
+class TypeChecker:
+    '''Infiere tipos, informa incompatibilidades y pliega constantes.
+
+    Las sentencias se visitan una vez; las expresiones se recorren en
+    postorden con una pila explícita, ya que una suma de miles de términos
+    produce un árbol tan profundo como largo.
+    '''
+
+    def __init__(self):
+        self.errors = []
+        self.folded = 0
+
+    def error(self, message, lineno):
+        self.errors.append(f"Error semántico: {message} (línea {lineno})")
+
+    def check(self, node):
+        getattr(self, f"_{type(node).__name__}")(node)
+
+    # Sentencias
+    def _Program(self, node):
+        self.check(node.body)
+
+    def _Block(self, node):
+        for statement in node.statements:
+            self.check(statement)
+
+    def _Declaration(self, node):
+        pass
+
+    def _Cin(self, node):
+        pass
+
+    def _Assign(self, node):
+        node.expr = self.expr(node.expr)
+        symbol, type = node.symbol, node.expr.type
+        if symbol is None or type is None:
+            return
+        if type == 'bool' or (symbol.type == 'int' and type == 'float'):
+            self.error(f"no se puede asignar un valor {type} a la variable {symbol.type} '{node.name}'",
+                       node.lineno)
+
+    def _IncDec(self, node):
+        pass
+
+    def _Cout(self, node):
+        node.expr = self.expr(node.expr)
+
+    def _condition(self, node, statement):
+        node = self.expr(node)
+        if node.type is not None and node.type != 'bool':
+            self.error(f"la condición de {statement} debe ser lógica, no {node.type}", node.lineno)
+        return node
+
+    def _If(self, node):
+        node.cond = self._condition(node.cond, 'if')
+        self.check(node.then)
+        if node.orelse is not None:
+            self.check(node.orelse)
+
+    def _While(self, node):
+        node.cond = self._condition(node.cond, 'while')
+        self.check(node.body)
+
+    def _DoUntil(self, node):
+        self.check(node.body)
+        node.cond = self._condition(node.cond, 'until')
+
+    def _Switch(self, node):
+        node.expr = self.expr(node.expr)
+        if node.expr.type not in ('int', None):
+            self.error(f"la expresión de switch debe ser int, no {node.expr.type}", node.lineno)
+        seen = set()
+        for case in node.cases:
+            if case.value.type != 'int':
+                self.error(f"la etiqueta case {case.value.value} debe ser int", case.lineno)
+            elif case.value.value in seen:
+                self.error(f"etiqueta case {case.value.value} repetida", case.lineno)
+            seen.add(case.value.value)
+            self.check(case.body)
+        if node.default is not None:
+            self.check(node.default)
+
+    # Expresiones
+    def expr(self, root):
+        '''Tipa y pliega una expresión; devuelve el nodo que la reemplaza'''
+        results = []
+        stack = [(root, False)]
+        while stack:
+            node, visited = stack.pop()
+            kind = type(node)
+            if kind is arbol.Num:
+                results.append(node)
+            elif kind is arbol.Var:
+                node.type = node.symbol.type if node.symbol is not None else None
+                results.append(node)
+            elif not visited:
+                stack.append((node, True))
+                if kind is arbol.BinOp:
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    stack.append((node.operand, False))
+            elif kind is arbol.BinOp:
+                node.right = results.pop()
+                node.left = results.pop()
+                results.append(self._binop(node))
+            else:
+                node.operand = results.pop()
+                results.append(self._unary(node))
+        result = results.pop()
+        self._check_literal(result)
+        return result
+
+    def _check_literal(self, node):
+        if type(node) is arbol.Num and node.type == 'int' and not INT_MIN <= node.value <= INT_MAX:
+            self.error(f"la constante {node.value} no cabe en un int", node.lineno)
+            node.type = None
+
+    def _fold(self, node, value, type):
+        self.folded += 1
+        return arbol.Num(value, node.lineno, type)
+
+    def _binop(self, node):
+        op, left, right = node.op, node.left, node.right
+        self._check_literal(left)
+        self._check_literal(right)
+        lt, rt = left.type, right.type
+        if lt is None or rt is None:
+            node.type = None
+            return node
+        if op in ARITHMETIC:
+            if lt not in NUMERIC or rt not in NUMERIC:
+                self.error(f"el operador '{op}' requiere operandos numéricos", node.lineno)
+                node.type = None
+                return node
+            if op == '%' and (lt != 'int' or rt != 'int'):
+                self.error("el operador '%' requiere operandos int", node.lineno)
+                node.type = None
+                return node
+            node.type = 'float' if 'float' in (lt, rt) else 'int'
+        elif op in RELATIONAL:
+            if (lt in NUMERIC) != (rt in NUMERIC) or (lt == 'bool' and op not in ('==', '!=')):
+                self.error(f"no se pueden comparar {lt} y {rt} con '{op}'", node.lineno)
+                node.type = None
+                return node
+            node.type = 'bool'
+        else:
+            if lt != 'bool' or rt != 'bool':
+                self.error(f"el operador '{op}' requiere operandos lógicos", node.lineno)
+                node.type = None
+                return node
+            node.type = 'bool'
+
+        if op in ('/', '%') and type(right) is arbol.Num and right.value == 0:
+            self.error("división entre cero", node.lineno)
+            return node
+        if type(left) is arbol.Num and type(right) is arbol.Num:
+            try:
+                value = evaluate(op, left.value, right.value, node.type)
+            except ConstantError as e:
+                self.error(f"{e} al evaluar la expresión constante", node.lineno)
+                return node
+            if node.type == 'float':
+                value = float(value)
+            return self._fold(node, value, node.type)
+        return node
+
+    def _unary(self, node):
+        operand = node.operand
+        if operand.type is None:
+            node.type = None
+            return node
+        if node.op == '!':
+            if operand.type != 'bool':
+                self.error(f"el operador '!' requiere un operando lógico, no {operand.type}", node.lineno)
+                node.type = None
+                return node
+            node.type = 'bool'
+            if type(operand) is arbol.Num:
+                return self._fold(node, not operand.value, 'bool')
+            return node
+        if operand.type not in NUMERIC:
+            self.error(f"el operador '{node.op}' requiere un operando numérico", node.lineno)
+            node.type = None
+            return node
+        node.type = operand.type
+        if type(operand) is arbol.Num:
+            value = -operand.value if node.op == '-' else operand.value
+            return self._fold(node, value, operand.type)
+        return node
+
+
+def check_types(ast):
+    '''Comprueba y pliega el AST en su lugar; devuelve (errores, nodos plegados)'''
+    checker = TypeChecker()
+    if ast is not None:
+        checker.check(ast)
+    return checker.errors, checker.folded